@@ -8,10 +8,21 @@ by parsing SQL text using SQLGlot. Populates OL_COLUMN_LINEAGE table.
 This module provides the core extraction logic used by populate_lineage.py --dbql.
 
 Key Features:
-  - Extracts SQL from DBC.DBQLogTbl + DBC.DBQLSQLTbl
-  - Parses SQL using SQLGlot with Teradata dialect
+  - Extracts SQL from DBC.DBQLogTbl + DBC.DBQLSQLTbl, optionally one row per
+    distinct statement, grouped inside Teradata
+  - Pipelined: DBQL fetch, SQL parsing and lineage loads overlap, joined by
+    bounded queues, with per-stage throughput and queue depth statistics
+  - Streams queries from DBQL in bounded chunks, on a connection of its own
+  - Parses SQL using SQLGlot with Teradata dialect, on a pool of processes
+  - Parses each distinct statement shape once, caching results by normalized
+    SQL fingerprint (parse_cache.py), optionally across runs in a SQLite file
   - Maps column dependencies to OL_COLUMN_LINEAGE records
-  - Supports incremental extraction via watermark tracking
+  - Incremental, resumable extraction: a watermark in OL_DBQL_WATERMARK is
+    advanced to (StartTime, QueryID) as each chunk of lineage is committed;
+    queries younger than settle_minutes, whose DBQL rows may not be written
+    yet, are left for a later run
+  - Staged bulk load and set-based MERGE into OL_COLUMN_LINEAGE (lineage_loader.py),
+    through FastLoad for full extractions, committed every flush_every records
   - Graceful error handling with detailed logging
 
 Usage:
@@ -32,20 +43,35 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 import hashlib
 import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Tuple
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import teradatasql
 
 from db_config import CONFIG
 
-# Import the SQL parser
+# Import the SQL parser, its result cache and the staged lineage loader
 try:
-    from sql_parser import TeradataSQLParser
+    from lineage_loader import DEFAULT_FASTLOAD_CHUNK, fastload_lineage, load_lineage
+    from parse_cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, ParseCache, fingerprint
+    from sql_parser import TeradataSQLParser, parser_version
 except ImportError:
     # Fallback for direct script execution
-    from scripts.populate.sql_parser import TeradataSQLParser
+    from scripts.populate.lineage_loader import (
+        DEFAULT_FASTLOAD_CHUNK, fastload_lineage, load_lineage)
+    from scripts.populate.parse_cache import (
+        DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, ParseCache, fingerprint)
+    from scripts.populate.sql_parser import TeradataSQLParser, parser_version
 
 
 # Module-level logger
@@ -58,6 +84,42 @@ DATABASE = CONFIG.get('database', 'demo_user')
 # Default lookback period for initial extraction
 DEFAULT_LOOKBACK_DAYS = 30
 
+# Lineage rows staged per executemany() round trip and committed together
+DEFAULT_BATCH_SIZE = 5000
+
+# Queries handed to a parse worker process at a time
+DEFAULT_PARSE_CHUNK = 200
+
+# DBQL rows per fetchmany() call (SQL text is up to 32000 characters per row)
+DEFAULT_FETCH_SIZE = 1000
+
+# Lineage records buffered before they are loaded and committed
+DEFAULT_FLUSH_RECORDS = 50000
+
+# Fetched chunks / lineage batches queued between pipeline stages
+DEFAULT_QUEUE_SIZE = 4
+
+# Pipeline stages, in order
+STAGES = ("fetch", "parse", "load")
+
+# Marks the end of a pipeline queue
+_END = object()
+
+# Queries after which a checkpoint is committed even if they yielded little lineage
+CHECKPOINT_QUERIES = 10000
+
+# Row of OL_DBQL_WATERMARK tracking this extraction
+WATERMARK_SOURCE = "DBQL_LINEAGE_EXTRACTION"
+
+# DBQL writes a query's row when the query completes and the DBQL cache is
+# flushed (every 10 minutes by default), so recent StartTimes may still be
+# missing. Queries that started within this many minutes are left for a later
+# run: the watermark never passes a query whose row can still arrive.
+DEFAULT_SETTLE_MINUTES = 60
+
+# Last committed (StartTime, QueryID) and whether the run that wrote it finished
+Watermark = namedtuple("Watermark", "start_time query_id status")
+
 # OpenLineage transformation type mapping
 # Maps SQL operation types to (OL_type, OL_subtype, default_confidence)
 TRANSFORMATION_MAPPING = {
@@ -70,6 +132,32 @@ TRANSFORMATION_MAPPING = {
 }
 
 
+@dataclass
+class StageStats:
+    """Throughput of one pipeline stage and the depth of its input queue."""
+    items: int = 0
+    busy_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    queue_samples: int = 0
+    queue_depth_total: int = 0
+    queue_depth_max: int = 0
+
+    def sample_queue(self, depth: int):
+        """Record the input queue depth seen when taking an item."""
+        self.queue_samples += 1
+        self.queue_depth_total += depth
+        self.queue_depth_max = max(self.queue_depth_max, depth)
+
+    @property
+    def rate(self) -> float:
+        """Items per busy second."""
+        return self.items / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+    @property
+    def mean_queue_depth(self) -> float:
+        return self.queue_depth_total / self.queue_samples if self.queue_samples else 0.0
+
+
 @dataclass
 class ExtractionStats:
     """Track extraction outcomes for summary reporting."""
@@ -78,7 +166,10 @@ class ExtractionStats:
     queries_failed: int = 0
     queries_skipped: int = 0
     lineage_records: int = 0
+    occurrences: int = 0
     errors: List[Dict] = field(default_factory=list)
+    stages: Dict[str, StageStats] = field(
+        default_factory=lambda: {name: StageStats() for name in STAGES})
 
     def record_success(self, lineage_count: int = 0):
         """Record a successfully processed query."""
@@ -109,6 +200,46 @@ class ExtractionStats:
         return (f"{self.queries_succeeded} succeeded, {self.queries_failed} failed, "
                 f"{self.queries_skipped} skipped, {self.lineage_records} lineage records")
 
+    def bottleneck(self) -> Optional[str]:
+        """The pipeline stage that spent the most time working, if any ran."""
+        busiest = max(STAGES, key=lambda name: self.stages[name].busy_seconds)
+        return busiest if self.stages[busiest].busy_seconds > 0 else None
+
+
+class _PipelineStopped(Exception):
+    """Raised in a pipeline stage when another stage has failed."""
+
+
+def _put(q: queue.Queue, item, stats: StageStats, stop: threading.Event):
+    """Put item on a bounded queue, waiting for room unless the pipeline stops."""
+    start = time.perf_counter()
+    try:
+        while True:
+            if stop.is_set():
+                raise _PipelineStopped()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+    finally:
+        stats.blocked_seconds += time.perf_counter() - start
+
+
+def _get(q: queue.Queue, stats: StageStats, stop: threading.Event):
+    """Take the next item from a queue; queued items are drained even after a stop."""
+    stats.sample_queue(q.qsize())
+    start = time.perf_counter()
+    try:
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():
+                    raise _PipelineStopped()
+    finally:
+        stats.blocked_seconds += time.perf_counter() - start
+
 
 def generate_lineage_id(source: str, target: str) -> str:
     """Generate a deterministic lineage ID from source and target column paths."""
@@ -124,6 +255,43 @@ def map_transformation_type(sql_type: str) -> Tuple[str, str, float]:
     )
 
 
+# Parser of a parse worker process (see _init_parse_worker)
+_worker_parser: Optional[TeradataSQLParser] = None
+
+
+def _init_parse_worker(default_database: str):
+    """Process pool initializer: one parser per worker process."""
+    global _worker_parser
+    _worker_parser = TeradataSQLParser(default_database=default_database)
+
+
+def _parse_query(parser: TeradataSQLParser, stmt_type: str, query_text: str,
+                 default_db: Optional[str]) -> Tuple[Optional[List[dict]], Optional[Tuple[str, str]]]:
+    """
+    Parse one DBQL statement in the context of its session's default database.
+
+    Returns:
+        (records, None) on success, (None, (error_type, error_message)) on failure
+    """
+    try:
+        return parser.extract_column_lineage(
+            query_text, stmt_type,
+            default_database=default_db.strip() if default_db else None
+        ), None
+    except Exception as e:
+        return None, (type(e).__name__, str(e))
+
+
+def _parse_args(query: Tuple) -> Tuple:
+    """(stmt_type, query_text, default_db) of a DBQL query row."""
+    return query[1], query[2], query[4]
+
+
+def _parse_chunk(chunk: List[Tuple]) -> List[Tuple]:
+    """Parse a chunk of (stmt_type, query_text, default_db) in a worker process."""
+    return [_parse_query(_worker_parser, *item) for item in chunk]
+
+
 class DBQLExtractor:
     """Extracts column-level lineage from DBQL tables."""
 
@@ -132,7 +300,21 @@ class DBQLExtractor:
         cursor,
         namespace_uri: str,
         verbose: bool = False,
-        dry_run: bool = False
+        dry_run: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        fastload: bool = True,
+        parse_workers: Optional[int] = None,
+        parse_chunk_size: int = DEFAULT_PARSE_CHUNK,
+        fetch_size: int = DEFAULT_FETCH_SIZE,
+        flush_every: int = DEFAULT_FLUSH_RECORDS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        distinct: bool = False,
+        watermark: bool = True,
+        settle_minutes: int = DEFAULT_SETTLE_MINUTES,
+        parse_cache_size: int = DEFAULT_MAX_ENTRIES,
+        parse_cache_path: Optional[str] = None,
+        parse_cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        connect: Optional[Callable] = None
     ):
         """
         Initialize the DBQL extractor.
@@ -142,12 +324,59 @@ class DBQLExtractor:
             namespace_uri: OpenLineage namespace URI (e.g., teradata://host:port)
             verbose: Enable verbose logging
             dry_run: Preview mode, don't write to database
+            batch_size: Lineage rows staged per round trip and transaction
+            fastload: Stage full extractions through FastLoad (falls back to
+                batched inserts where FastLoad is unavailable)
+            parse_workers: Processes parsing SQL in parallel (default: one per
+                CPU; 1 parses in this process)
+            parse_chunk_size: Queries sent to a parse worker at a time
+            fetch_size: DBQL rows fetched per round trip
+            flush_every: Lineage records loaded and committed at a time (full
+                extractions through FastLoad flush at least a FastLoad chunk)
+            queue_size: Fetched chunks and lineage batches queued between
+                pipeline stages before the upstream stage waits
+            distinct: Fetch each distinct statement once (grouped inside
+                Teradata), with its latest QueryID, occurrence count and first
+                seen time, instead of every logged query
+            watermark: Resume from, and advance, the watermark in
+                OL_DBQL_WATERMARK when no since/full is given
+            settle_minutes: Leave queries that started within this many
+                minutes for a later run, until their DBQL rows have been
+                written (0 fetches up to now); must exceed the DBQL flush
+                interval plus the longest running query worth its lineage.
+                Only applies to runs without since/full
+            parse_cache_size: Parse results kept by SQL fingerprint (0 disables)
+            parse_cache_path: SQLite file keeping parse results across runs,
+                for the current parser version (default: memory only)
+            parse_cache_max_bytes: Size bound of parse_cache_path
+            connect: Opens the connection DBQL is read on, so that loads on
+                cursor can run while the query result is still open
+                (default: teradatasql.connect(**CONFIG))
         """
         self.cursor = cursor
         self.namespace_uri = namespace_uri
         self.verbose = verbose
         self.dry_run = dry_run
+        self.batch_size = max(1, batch_size)
+        self.fastload = fastload
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.parse_chunk_size = max(1, parse_chunk_size)
+        self.fetch_size = max(1, fetch_size)
+        self.flush_every = max(1, flush_every)
+        self.queue_size = max(1, queue_size)
+        self.distinct = distinct
+        self.watermark = watermark
+        # Teradata MINUTE(4) intervals go up to 9999 minutes
+        self.settle_minutes = min(max(0, settle_minutes), 9999)
+        self._checkpoint: Optional[Tuple] = None
+        self._tracking = False
+        self.connect = connect or (lambda: teradatasql.connect(**CONFIG))
         self.parser = TeradataSQLParser(default_database=DATABASE)
+        self.parse_cache = ParseCache(parse_cache_size, path=parse_cache_path,
+                                      version=parser_version(), max_bytes=parse_cache_max_bytes)
+        if self.parse_cache.store is not None and self.parse_cache.store.invalidated:
+            logger.info("Parse cache: discarded %d results of other parser versions",
+                        self.parse_cache.store.invalidated)
         self.stats = ExtractionStats()
 
     def check_dbql_access(self) -> Tuple[bool, str]:
@@ -183,21 +412,140 @@ class DBQLExtractor:
                 logger.error("DBQL check failed: %s", e)
                 return False, f"DBQL check failed: {e}"
 
+    def get_watermark(self) -> Optional[Watermark]:
+        """
+        Read the last committed checkpoint from OL_DBQL_WATERMARK.
+
+        Returns:
+            Watermark, or None if there is none (or the table is missing)
+        """
+        try:
+            self.cursor.execute(f"""
+                SELECT last_start_time, last_query_id, status
+                FROM {DATABASE}.OL_DBQL_WATERMARK
+                WHERE source_name = ?
+            """, (WATERMARK_SOURCE,))
+            row = self.cursor.fetchone()
+        except teradatasql.DatabaseError as e:
+            if "3807" not in str(e):
+                raise
+            logger.warning("OL_DBQL_WATERMARK does not exist (run setup_lineage_schema.py); "
+                           "extracting without a watermark")
+            self.watermark = False
+            return None
+        if not row or row[0] is None:
+            return None
+        return Watermark(*row)
+
+    def update_watermark(self, start_time: datetime, query_id, processed: int, status: str):
+        """
+        Record (start_time, query_id) as committed in OL_DBQL_WATERMARK.
+
+        Args:
+            start_time: StartTime of the last query whose lineage is committed
+            query_id: QueryID of that query
+            processed: Queries processed by this run so far
+            status: RUNNING while the run goes on, COMPLETE once it finished
+        """
+        if self.dry_run or not self.watermark:
+            return
+        params = (start_time, query_id, processed, status, WATERMARK_SOURCE)
+        try:
+            self.cursor.execute(f"""
+                UPDATE {DATABASE}.OL_DBQL_WATERMARK
+                SET last_start_time = ?,
+                    last_query_id = ?,
+                    queries_processed = ?,
+                    status = ?,
+                    updated_at = CURRENT_TIMESTAMP(0)
+                WHERE source_name = ?
+            """, params)
+            if self.cursor.rowcount == 0:
+                self.cursor.execute(f"""
+                    INSERT INTO {DATABASE}.OL_DBQL_WATERMARK
+                        (last_start_time, last_query_id, queries_processed, status,
+                         updated_at, source_name)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP(0), ?)
+                """, params)
+        except teradatasql.DatabaseError as e:
+            if "3807" not in str(e):
+                raise
+            logger.warning("OL_DBQL_WATERMARK does not exist (run setup_lineage_schema.py); "
+                           "progress is not checkpointed")
+            self.watermark = False
+
+    def iter_queries(self, since: Optional[datetime] = None,
+                     after: Optional[Tuple] = None, settle: bool = False) -> Iterator[Tuple]:
+        """
+        Stream INSERT/UPDATE/MERGE queries from DBQL, fetch_size rows at a time.
+
+        The query runs on a connection of its own (see connect), which is
+        closed once the rows are exhausted or the iterator is closed.
+
+        Args:
+            since: Only fetch queries after this timestamp
+            after: Only fetch queries after this (StartTime, QueryID)
+            settle: Leave queries started within settle_minutes for a later run
+
+        Yields:
+            (QueryID, StatementType, SQLText, StartTime, DefaultDatabase) tuples;
+            with distinct, StartTime is the last time the statement was seen and
+            (occurrences, first_seen) follow
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        try:
+            self._execute_fetch(cursor, since, after, settle)
+            while True:
+                rows = cursor.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+            conn.close()
+
     def fetch_queries(self, since: Optional[datetime] = None) -> List[Tuple]:
         """
         Fetch INSERT/UPDATE/MERGE queries from DBQL.
 
+        Holds the whole window in memory; extract_lineage() streams it with
+        iter_queries() instead.
+
         Args:
             since: Only fetch queries after this timestamp
 
         Returns:
             List of (QueryID, StatementType, SQLText, StartTime, DefaultDatabase) tuples
         """
-        if since:
+        queries = list(self.iter_queries(since))
+        logger.info("Found %d queries to process", len(queries))
+        return queries
+
+    def _execute_fetch(self, cursor, since: Optional[datetime], after: Optional[Tuple] = None,
+                       settle: bool = False):
+        """Run the DBQL query on cursor (rows ordered by StartTime, QueryID)."""
+        params = []
+        if after:
+            start, query_id = after
+            logger.info("Fetching queries after: %s (QueryID %s)", start, query_id)
+            since_filter = "AND (q.StartTime > ? OR (q.StartTime = ? AND q.QueryID > ?))"
+            params = [start, start, query_id]
+        elif since:
             since_str = since.strftime('%Y-%m-%d %H:%M:%S')
             logger.info("Fetching queries since: %s", since_str)
-
-            self.cursor.execute(f"""
+            since_filter = f"AND q.StartTime > CAST('{since_str}' AS TIMESTAMP(0))"
+        else:
+            logger.info("Fetching ALL queries (full extraction)...")
+            since_filter = ""
+        if settle and self.settle_minutes:
+            logger.info("Leaving queries started in the last %d minutes for a later run",
+                        self.settle_minutes)
+            since_filter += (f"\n                  AND q.StartTime < CURRENT_TIMESTAMP(6) - "
+                             f"INTERVAL '{self.settle_minutes}' MINUTE(4)")
+
+        if not self.distinct:
+            cursor.execute(f"""
                 SELECT DISTINCT
                     q.QueryID,
                     q.StatementType,
@@ -210,33 +558,48 @@ class DBQLExtractor:
                     AND q.ProcID = s.ProcID
                 WHERE q.StatementType IN ('Insert', 'Merge Into', 'Create Table', 'Create View', 'Update')
                   AND q.ErrorCode = 0
-                  AND q.StartTime > CAST('{since_str}' AS TIMESTAMP(0))
+                  {since_filter}
                   AND s.SQLRowNo = 1
-                ORDER BY q.StartTime
-            """)
-        else:
-            logger.info("Fetching ALL queries (full extraction)...")
-
-            self.cursor.execute("""
-                SELECT DISTINCT
+                ORDER BY q.StartTime, q.QueryID
+            """, params)
+            return
+
+        # One row per distinct statement: grouped inside Teradata on a row hash
+        # of text, default database and statement type (with the text length,
+        # which makes a 32-bit hash collision merging two statements unlikely),
+        # keeping the latest occurrence's QueryID and text
+        logger.info("Fetching distinct statements (grouped in Teradata)")
+        cursor.execute(f"""
+            SELECT
+                d.QueryID,
+                d.StatementType,
+                d.query_text,
+                d.StartTime,
+                d.DefaultDatabase,
+                COUNT(*) OVER (PARTITION BY d.stmt_hash, d.stmt_length) AS occurrences,
+                MIN(d.StartTime) OVER (PARTITION BY d.stmt_hash, d.stmt_length) AS first_seen
+            FROM (
+                SELECT
                     q.QueryID,
                     q.StatementType,
                     CAST(s.SQLTextInfo AS VARCHAR(32000)) as query_text,
                     q.StartTime,
-                    q.DefaultDatabase
+                    q.DefaultDatabase,
+                    HASHROW(s.SQLTextInfo, q.DefaultDatabase, q.StatementType) AS stmt_hash,
+                    CHARACTER_LENGTH(s.SQLTextInfo) AS stmt_length
                 FROM DBC.DBQLogTbl q
                 JOIN DBC.DBQLSQLTbl s
                     ON q.QueryID = s.QueryID
                     AND q.ProcID = s.ProcID
                 WHERE q.StatementType IN ('Insert', 'Merge Into', 'Create Table', 'Create View', 'Update')
                   AND q.ErrorCode = 0
+                  {since_filter}
                   AND s.SQLRowNo = 1
-                ORDER BY q.StartTime
-            """)
-
-        queries = self.cursor.fetchall()
-        logger.info("Found %d queries to process", len(queries))
-        return queries
+            ) d
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY d.stmt_hash, d.stmt_length
+                                       ORDER BY d.StartTime DESC, d.QueryID DESC) = 1
+            ORDER BY d.StartTime, d.QueryID
+        """, params)
 
     def _extract_target_table(self, query_text: str) -> str:
         """Extract target table name from query text for error context."""
@@ -256,6 +619,11 @@ class DBQLExtractor:
         """
         Extract column lineage from DBQL and insert into OL_COLUMN_LINEAGE.
 
+        Without since or full, extraction continues after the watermark in
+        OL_DBQL_WATERMARK, which also resumes an interrupted run from its last
+        checkpoint, and advances it as chunks are committed. Runs with since
+        or full fetch an explicit window and leave the watermark alone.
+
         Args:
             since: Extract queries since this timestamp
             full: If True, extract all history (no time filter)
@@ -264,49 +632,175 @@ class DBQLExtractor:
             Number of lineage records inserted
         """
         # Determine extraction start time
+        after = None
+        watermark = None if full or since or not self.watermark else self.get_watermark()
         if full:
             extraction_since = None
             logger.info("Mode: FULL extraction (all history)")
         elif since:
             extraction_since = since
             logger.info("Mode: Extract since %s", since)
+        elif watermark:
+            extraction_since = None
+            after = (watermark.start_time, watermark.query_id)
+            logger.info("Mode: %s after watermark %s (QueryID %s)",
+                        "Resuming interrupted run" if watermark.status != "COMPLETE"
+                        else "Incremental", watermark.start_time, watermark.query_id)
         else:
             # Default: last 30 days
             extraction_since = datetime.now() - timedelta(days=DEFAULT_LOOKBACK_DAYS)
             logger.info("Mode: Default (last %d days)", DEFAULT_LOOKBACK_DAYS)
+        # Only watermark-driven runs settle, and only they move the watermark:
+        # an explicit window may end before (or skip past) what it records
+        self._tracking = not (full or since)
 
-        # Fetch queries from DBQL
-        queries = self.fetch_queries(extraction_since)
+        if self.dry_run:
+            queries = self.iter_queries(extraction_since, after, self._tracking)
+            count = sum(1 for _ in queries)
+            logger.info("[DRY RUN] Would process %d queries", count)
+            return 0
+
+        # Three overlapping stages joined by bounded queues: a thread fetches
+        # DBQL on its own connection, this thread parses (on a process pool
+        # when enabled), and a thread loads lineage on the extractor's cursor
+        # every flush_every records, then checkpoints the watermark. A full
+        # queue holds its producer back, so memory stays bounded; a failure
+        # only loses the work since the last checkpoint.
+        self._checkpoint = None
+        # FastLoad starts a utility job per load and only pays off for large
+        # loads: full extractions through it flush once per FastLoad chunk,
+        # not every CHECKPOINT_QUERIES queries
+        bulk = full and self.fastload
+        flush_every = max(self.flush_every, DEFAULT_FASTLOAD_CHUNK) if bulk else self.flush_every
+        checkpoint_queries = None if bulk else CHECKPOINT_QUERIES
+        fetched: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        batches: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        failures: List[BaseException] = []
+        inserted: List[int] = []
+
+        def run_stage(target, *args):
+            try:
+                target(*args)
+            except _PipelineStopped:
+                pass
+            except BaseException as e:
+                failures.append(e)
+                stop.set()
+
+        threads = [
+            threading.Thread(target=run_stage, name="dbql-fetch", daemon=True,
+                             args=(self._fetch_stage, extraction_since, after, self._tracking,
+                                   fetched, stop)),
+            threading.Thread(target=run_stage, name="dbql-load", daemon=True,
+                             args=(self._load_stage, batches, full, stop, inserted)),
+        ]
+        for thread in threads:
+            thread.start()
 
-        if not queries:
+        try:
+            self._parse_stage(fetched, batches, stop, flush_every, checkpoint_queries)
+        except _PipelineStopped:
+            pass
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if failures:
+            raise failures[0]
+
+        if self._checkpoint:
+            self.update_watermark(*self._checkpoint, status="COMPLETE")
+            logger.info("Watermark: %s (QueryID %s)", self._checkpoint[0], self._checkpoint[1])
+        if not self.stats.queries_processed:
             logger.info("No queries to process")
-            return 0
+        self._log_stages()
 
-        if self.dry_run:
-            logger.info("[DRY RUN] Would process %d queries", len(queries))
-            return 0
+        return sum(inserted)
 
-        # Process each query
-        lineage_records: List[Dict] = []
+    def _fetch_stage(self, since: Optional[datetime], after: Optional[Tuple], settle: bool,
+                     out: queue.Queue, stop: threading.Event):
+        """Pipeline stage: put chunks of fetch_size DBQL rows on out."""
+        stats = self.stats.stages["fetch"]
+        queries = self.iter_queries(since, after, settle)
+        try:
+            while True:
+                start = time.perf_counter()
+                chunk = list(islice(queries, self.fetch_size))
+                stats.busy_seconds += time.perf_counter() - start
+                if not chunk:
+                    break
+                stats.items += len(chunk)
+                _put(out, chunk, stats, stop)
+        finally:
+            queries.close()  # Closes the DBQL connection
+        _put(out, _END, stats, stop)
+
+    def _parse_stage(self, inbox: queue.Queue, out: queue.Queue, stop: threading.Event,
+                     flush_every: int, checkpoint_queries: Optional[int] = CHECKPOINT_QUERIES):
+        """
+        Pipeline stage: parse queries from inbox, put lineage batches on out.
 
-        for i, (query_id, stmt_type, query_text, query_time, default_db) in enumerate(queries):
-            # Progress logging
-            if (i + 1) % 1000 == 0:
-                logger.info("Progress: %d/%d queries (%.1f%%)",
-                           i + 1, len(queries), 1000 * (i + 1) / len(queries))
+        A batch is put every flush_every lineage records, or every
+        checkpoint_queries queries (None: records only). Each batch goes with
+        the checkpoint (StartTime, QueryID, queries processed) of the last
+        query it covers.
+        """
+        stats = self.stats.stages["parse"]
 
-            # Skip null query text
-            if not query_text:
-                self.stats.record_skip("null query_text")
-                continue
+        def queries():
+            while True:
+                chunk = _get(inbox, stats, stop)
+                if chunk is _END:
+                    return
+                yield from chunk
 
-            try:
-                # Set default database context for unqualified table names
-                if default_db:
-                    self.parser.default_database = default_db.strip()
+        lineage_records: List[Dict] = []
+        checkpoint = None
+        since_checkpoint = 0
+        parsed = self._parse_queries(queries())
+        start = time.perf_counter()
+        blocked = stats.blocked_seconds
 
-                # Parse SQL and extract lineage
-                records = self.parser.extract_column_lineage(query_text, stmt_type)
+        try:
+            for query, records, error in parsed:
+                if (len(lineage_records) >= flush_every
+                        or checkpoint_queries and since_checkpoint >= checkpoint_queries):
+                    _put(out, (lineage_records, checkpoint), stats, stop)
+                    lineage_records = []
+                    since_checkpoint = 0
+
+                query_id, stmt_type, query_text, query_time, default_db = query[:5]
+                stats.items += 1
+                since_checkpoint += 1
+                checkpoint = (query_time, query_id, self.stats.queries_processed + 1)
+                # Distinct-statement rows carry their occurrence count
+                self.stats.occurrences += query[5] if len(query) > 5 else 1
+
+                # Progress logging
+                if (self.stats.queries_processed + 1) % 1000 == 0:
+                    logger.info("Progress: %d queries, %d lineage records",
+                                self.stats.queries_processed + 1, self.stats.lineage_records)
+
+                # Skip null query text
+                if not query_text:
+                    self.stats.record_skip("null query_text")
+                    continue
+
+                if error is not None:
+                    error_type, error_msg = error
+                    table_name = self._extract_target_table(query_text)
+                    logger.warning(
+                        "Failed to parse query %s (%s): %s",
+                        query_id, table_name, error_msg[:200]
+                    )
+                    self.stats.record_failure(
+                        str(query_id), table_name, error_type, error_msg
+                    )
+                    continue
 
                 if records:
                     for rec in records:
@@ -329,46 +823,180 @@ class DBQLExtractor:
                     self.stats.record_success(len(records))
                 else:
                     self.stats.record_success(0)
-
-            except Exception as e:
-                table_name = self._extract_target_table(query_text)
-                error_type = type(e).__name__
-                logger.warning(
-                    "Failed to parse query %s (%s): %s",
-                    query_id, table_name, str(e)[:200]
-                )
-                self.stats.record_failure(
-                    str(query_id), table_name, error_type, str(e)
-                )
-
-        # Insert lineage records
-        if lineage_records:
-            inserted = self._insert_lineage_records(lineage_records)
-            logger.info("Inserted %d lineage records", inserted)
-            return inserted
-
-        return 0
-
-    def _insert_lineage_records(self, records: List[Dict]) -> int:
+        finally:
+            parsed.close()  # Shuts the parse pool down
+            self.parse_cache.flush()
+            stats.busy_seconds += (time.perf_counter() - start
+                                   - (stats.blocked_seconds - blocked))
+
+        # Load the remaining lineage records
+        if since_checkpoint:
+            _put(out, (lineage_records, checkpoint), stats, stop)
+        _put(out, _END, stats, stop)
+
+    def _load_stage(self, inbox: queue.Queue, full: bool, stop: threading.Event,
+                    inserted: List[int]):
+        """
+        Pipeline stage: load lineage batches from inbox, appending inserted
+        counts, and advance the watermark (on watermark-driven runs) once
+        each batch is committed.
+        """
+        stats = self.stats.stages["load"]
+        while True:
+            item = _get(inbox, stats, stop)
+            if item is _END:
+                return
+            records, checkpoint = item
+            start = time.perf_counter()
+            if records:
+                inserted.append(self._insert_lineage_records(records, full=full))
+            if self._tracking:
+                self.update_watermark(*checkpoint, status="RUNNING")
+                self._checkpoint = checkpoint
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += len(records)
+
+    def _log_stages(self):
+        """Log per-stage throughput and queue depth."""
+        for name in STAGES:
+            stage = self.stats.stages[name]
+            logger.info("Stage %s: %d items in %.1fs busy (%.0f/s), %.1fs blocked%s",
+                        name, stage.items, stage.busy_seconds, stage.rate, stage.blocked_seconds,
+                        f", input queue depth {stage.mean_queue_depth:.1f} avg / "
+                        f"{stage.queue_depth_max} max" if stage.queue_samples else "")
+        bottleneck = self.stats.bottleneck()
+        if bottleneck:
+            logger.info("Bottleneck: %s stage", bottleneck)
+        logger.info("Parse cache: %d hits (%d from disk), %d misses (%.1f%% hit rate)",
+                    self.parse_cache.hits, self.parse_cache.disk_hits, self.parse_cache.misses,
+                    100 * self.parse_cache.hit_rate)
+
+    def _parse_queries(self, queries: Iterable[Tuple]) -> Iterator[Tuple]:
+        """
+        Parse DBQL queries, yielding (query, records, error) in query order.
+
+        Each distinct fingerprint (normalized SQL, statement type and default
+        database) is parsed once; repeats are answered from parse_cache.
+        Queries are read lazily and their uncached statements sent to a
+        process pool in chunks of parse_chunk_size, with at most two chunks
+        per worker in flight. If a worker dies or a chunk cannot be returned,
+        that chunk is parsed again in this process, so one bad statement
+        cannot lose the others.
+        """
+        queries = iter(queries)
+        if self.parse_workers <= 1:
+            for query in queries:
+                yield (query, *self._parse_cached(query))
+            return
+
+        chunks = iter(lambda: list(islice(queries, self.parse_chunk_size)), [])
+        first, second = next(chunks, []), next(chunks, [])
+        if not second:
+            # A single chunk is not worth starting a pool for
+            for query in first:
+                yield (query, *self._parse_cached(query))
+            return
+
+        logger.info("Parsing queries with %d worker processes", self.parse_workers)
+        in_flight = deque()
+        # Keys parsed by in-flight chunks -> chunks needing them, and their
+        # results until no in-flight chunk needs them any more
+        awaiting: Dict[str, int] = {}
+        resolved: Dict[str, Tuple] = {}
+
+        def submit(pool, chunk):
+            keys, known, pending, deferred = [], {}, {}, set()
+            for query in chunk:
+                key = self._fingerprint(query)
+                keys.append(key)
+                if key in known or key in pending or key in deferred:
+                    self.parse_cache.hits += 1  # Repeated within the chunk: parsed once
+                elif key in awaiting:
+                    self.parse_cache.hits += 1  # Being parsed for an earlier chunk
+                    deferred.add(key)
+                else:
+                    result = self.parse_cache.get(key)
+                    if result is None:
+                        pending[key] = _parse_args(query)
+                    else:
+                        known[key] = result
+            for key in chain(pending, deferred):
+                awaiting[key] = awaiting.get(key, 0) + 1
+
+            future = None
+            if pending:
+                try:
+                    future = pool.submit(_parse_chunk, list(pending.values()))
+                except BrokenProcessPool:
+                    pass  # A worker died: parse the rest in-process
+            in_flight.append((chunk, keys, known, pending, deferred, future))
+
+        def results(chunk, keys, known, pending, deferred, future):
+            if pending:
+                parsed = None
+                if future is not None:
+                    try:
+                        parsed = future.result()
+                    except Exception as e:
+                        logger.warning("Parse worker failed (%s); parsing %d queries in-process",
+                                       type(e).__name__, len(pending))
+                if parsed is None:
+                    parsed = [_parse_query(self.parser, *args) for args in pending.values()]
+                for key, result in zip(pending, parsed):
+                    resolved[key] = result
+                    self.parse_cache.put(key, result)
+            for query, key in zip(chunk, keys):
+                records, error = known[key] if key in known else resolved[key]
+                yield query, records, error
+            for key in chain(pending, deferred):
+                awaiting[key] -= 1
+                if not awaiting[key]:
+                    del awaiting[key]
+                    del resolved[key]
+
+        # Spawned, not forked: the pool starts while the fetch and load threads
+        # (and the teradatasql driver's runtime) are running, and forking a
+        # multi-threaded process can leave children deadlocked
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_parse_worker,
+                                 initargs=(self.parser.default_database,),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            for chunk in chain((first, second), chunks):
+                submit(pool, chunk)
+                if len(in_flight) >= 2 * self.parse_workers:
+                    yield from results(*in_flight.popleft())
+            while in_flight:
+                yield from results(*in_flight.popleft())
+
+    def _fingerprint(self, query: Tuple) -> str:
+        """Parse cache key of a DBQL query row."""
+        stmt_type, query_text, default_db = _parse_args(query)
+        return fingerprint(query_text, default_db or self.parser.default_database, stmt_type)
+
+    def _parse_cached(self, query: Tuple) -> Tuple:
+        """(records, error) for a query, parsed in this process unless cached."""
+        key = self._fingerprint(query)
+        result = self.parse_cache.get(key)
+        if result is None:
+            result = _parse_query(self.parser, *_parse_args(query))
+            self.parse_cache.put(key, result)
+        return result
+
+    def _insert_lineage_records(self, records: List[Dict], full: bool = False) -> int:
         """
-        Insert lineage records into OL_COLUMN_LINEAGE.
+        Load lineage records into OL_COLUMN_LINEAGE.
+
+        Rows are bulk-loaded into a staging table and applied with one MERGE
+        (see lineage_loader.py): new edges are inserted, known edges get a
+        fresh discovered_at and are reactivated if they had been deactivated.
 
         Args:
             records: List of lineage record dictionaries
+            full: Full extraction; stages through FastLoad when enabled
 
         Returns:
-            Number of records inserted
-        """
-        insert_sql = f"""
-            INSERT INTO {DATABASE}.OL_COLUMN_LINEAGE
-            (lineage_id, run_id, source_namespace, source_dataset, source_field,
-             target_namespace, target_dataset, target_field,
-             transformation_type, transformation_subtype, transformation_description,
-             confidence_score, discovered_at, is_active)
-            VALUES (?, NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP(0), 'Y')
+            Number of new lineage records inserted
         """
-
-        inserted = 0
+        rows = []
         seen_ids: Set[str] = set()
 
         for rec in records:
@@ -394,29 +1022,31 @@ class DBQLExtractor:
             source_dataset = f"{rec['source_database']}.{rec['source_table']}"
             target_dataset = f"{rec['target_database']}.{rec['target_table']}"
 
-            try:
-                self.cursor.execute(insert_sql, (
-                    lineage_id,
-                    self.namespace_uri,
-                    source_dataset,
-                    rec['source_column'],
-                    self.namespace_uri,
-                    target_dataset,
-                    rec['target_column'],
-                    ol_type,
-                    ol_subtype,
-                    f"Extracted from DBQL",
-                    confidence
-                ))
-                inserted += 1
-            except teradatasql.DatabaseError as e:
-                # Handle duplicate key - lineage already exists
-                if "2801" in str(e):
-                    pass  # Already exists, skip
-                elif self.verbose:
-                    logger.warning("Insert failed for %s: %s", lineage_id, e)
-
-        return inserted
+            rows.append((
+                lineage_id,
+                self.namespace_uri,
+                source_dataset,
+                rec['source_column'],
+                self.namespace_uri,
+                target_dataset,
+                rec['target_column'],
+                ol_type,
+                ol_subtype,
+                f"Extracted from DBQL",
+                confidence
+            ))
+
+        start = time.perf_counter()
+        if full and self.fastload:
+            counts = fastload_lineage(self.cursor, DATABASE, rows, batch_size=self.batch_size)
+        else:
+            counts = load_lineage(self.cursor, DATABASE, rows, batch_size=self.batch_size)
+        elapsed = time.perf_counter() - start
+        logger.info("Merged %d lineage rows in %.1fs (%.0f rows/sec): %d inserted, %d updated, "
+                    "%d unchanged, %d rejected",
+                    len(rows), elapsed, len(rows) / elapsed if elapsed > 0 else 0,
+                    counts.inserted, counts.updated, counts.unchanged, counts.rejected)
+        return counts.inserted
 
     def print_summary(self):
         """Print extraction summary."""
@@ -424,10 +1054,15 @@ class DBQLExtractor:
         print("DBQL EXTRACTION SUMMARY")
         print("=" * 60)
         print(f"  Queries processed:     {self.stats.queries_processed}")
+        if self.distinct:
+            print(f"  Logged occurrences:    {self.stats.occurrences}")
         print(f"  Queries succeeded:     {self.stats.queries_succeeded}")
         print(f"  Queries failed:        {self.stats.queries_failed}")
         print(f"  Queries skipped:       {self.stats.queries_skipped}")
         print(f"  Lineage records:       {self.stats.lineage_records}")
+        if self.parse_cache.lookups:
+            print(f"  Parse cache hits:      {self.parse_cache.hits}/{self.parse_cache.lookups} "
+                  f"({self.parse_cache.hit_rate:.1%}, {self.parse_cache.disk_hits} from disk)")
 
         if self.verbose and self.stats.errors:
             print("\n  Failed Query Details:")
@@ -436,6 +1071,17 @@ class DBQLExtractor:
             if len(self.stats.errors) > 10:
                 print(f"    ... and {len(self.stats.errors) - 10} more")
 
+        bottleneck = self.stats.bottleneck()
+        if bottleneck:
+            print("\n  Pipeline stages:")
+            for name in STAGES:
+                stage = self.stats.stages[name]
+                depth = (f"  input queue {stage.mean_queue_depth:.1f} avg / {stage.queue_depth_max} max"
+                         if stage.queue_samples else "")
+                print(f"    {name:<6} {stage.items:>10} items  {stage.busy_seconds:>8.1f}s busy  "
+                      f"{stage.rate:>8.0f}/s  {stage.blocked_seconds:>8.1f}s blocked{depth}")
+            print(f"  Bottleneck: {bottleneck}")
+
 
 def configure_logging(verbose: bool = False) -> logging.Logger:
     """Configure logging for DBQL extraction."""
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Export Lineage Snapshot
+
+Writes the active column lineage graph from OL_COLUMN_LINEAGE to a compact
+binary snapshot file for offline analysis and fast API startup.
+
+Snapshot format (little-endian, all sections 8-byte aligned):
+  - Header: magic, format version, counts, creation time and the newest
+    discovered_at timestamp included in the snapshot (refresh watermark)
+  - Section directory: (offset, nbytes) per section
+  - Interned string table: uint32 offsets + UTF-8 blob shared by namespaces,
+    dataset names, field names and transformation types
+  - Datasets sorted by name, with their namespace and a CSR index of nodes
+  - Nodes (columns) grouped by dataset and sorted by field name
+  - Forward CSR adjacency (source -> targets) with transformation type and
+    confidence score as parallel arrays
+  - Reverse CSR adjacency (target -> sources) with indexes back into the
+    forward edge arrays
+
+Readers memory-map the file and cast sections to typed memoryviews, so opening
+a snapshot copies nothing and memory is shared between processes through the
+page cache. Node lookup is a binary search over the sorted string sections.
+
+Usage:
+  python export_lineage_snapshot.py                          # Write lineage.olsnap
+  python export_lineage_snapshot.py --output /data/lineage.olsnap
+  python export_lineage_snapshot.py --info /data/lineage.olsnap
+
+  from export_lineage_snapshot import LineageSnapshot
+  snap = LineageSnapshot("lineage.olsnap")
+  node = snap.find_node("demo_user.FACT_SALES", "net_amount")
+  for source, edge in snap.predecessors(node):
+      print(snap.node_key(source), snap.edge_type(edge))
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+SNAPSHOT_MAGIC = b"OLSNAP01"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# magic, version, section_count, node_count, edge_count, dataset_count,
+# string_count, created_at, max_discovered_at (epoch seconds, 0 if unknown)
+_HEADER = struct.Struct("<8sIIQQQQdd")
+_SECTION_ENTRY = struct.Struct("<QQ")
+
+# Section order in the directory: (name, array typecode)
+SECTIONS = [
+    ("string_offsets", "I"),
+    ("string_blob", "B"),
+    ("type_names", "I"),
+    ("dataset_name", "I"),
+    ("dataset_namespace", "I"),
+    ("dataset_nodes", "I"),
+    ("node_dataset", "I"),
+    ("node_field", "I"),
+    ("fwd_offsets", "I"),
+    ("fwd_targets", "I"),
+    ("fwd_type", "B"),
+    ("fwd_confidence", "f"),
+    ("rev_offsets", "I"),
+    ("rev_sources", "I"),
+    ("rev_edge", "I"),
+]
+
+DEFAULT_SNAPSHOT_PATH = "lineage.olsnap"
+
+# (source_namespace, source_dataset, source_field,
+#  target_namespace, target_dataset, target_field,
+#  transformation_type, confidence_score)
+EdgeRow = Tuple[str, str, str, str, str, str, str, float]
+
+
+def _typed_array(typecode: str, values=()) -> array:
+    """Create an array and check the item size the format relies on."""
+    arr = array(typecode, values)
+    expected = {"I": 4, "B": 1, "f": 4}[typecode]
+    if arr.itemsize != expected:
+        raise RuntimeError(f"array('{typecode}') itemsize {arr.itemsize} != {expected}")
+    return arr
+
+
+def _csr(order_keys: array, count: int) -> Tuple[array, array]:
+    """Counting sort: return (offsets, permutation) grouping items by key."""
+    offsets = _typed_array("I", [0]) * (count + 1)
+    for key in order_keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    cursor = _typed_array("I", offsets[:-1])
+    permutation = _typed_array("I", [0]) * len(order_keys)
+    for item, key in enumerate(order_keys):
+        permutation[cursor[key]] = item
+        cursor[key] += 1
+    return offsets, permutation
+
+
+def write_snapshot(path: str, edges: Iterable[EdgeRow],
+                   max_discovered_at: Optional[float] = None) -> Dict[str, int]:
+    """
+    Write a lineage snapshot file.
+
+    The file is written to a temporary path and atomically renamed, so readers
+    never observe a partially written snapshot.
+
+    Args:
+        path: Destination file path
+        edges: Iterable of edge rows (duplicates by source/target are ignored)
+        max_discovered_at: Newest discovered_at included (epoch seconds)
+
+    Returns:
+        Dict with node, edge, dataset and string counts
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+        return sid
+
+    # Intern everything while streaming so the exporter stays compact
+    dataset_ns: Dict[int, int] = {}
+    nodes: Dict[Tuple[int, int], int] = {}
+    types: Dict[int, int] = {}
+    edge_src = _typed_array("I")
+    edge_tgt = _typed_array("I")
+    edge_type = _typed_array("B")
+    edge_conf = _typed_array("f")
+    seen_edges = set()
+
+    def node_id(namespace: str, dataset: str, field: str) -> int:
+        ds = intern(dataset)
+        dataset_ns.setdefault(ds, intern(namespace or ""))
+        key = (ds, intern(field))
+        nid = nodes.get(key)
+        if nid is None:
+            nid = nodes[key] = len(nodes)
+        return nid
+
+    for src_ns, src_ds, src_field, tgt_ns, tgt_ds, tgt_field, ttype, conf in edges:
+        src = node_id(src_ns, src_ds, src_field)
+        tgt = node_id(tgt_ns, tgt_ds, tgt_field)
+        if (src, tgt) in seen_edges:
+            continue
+        seen_edges.add((src, tgt))
+        type_sid = intern(ttype or "DIRECT")
+        code = types.get(type_sid)
+        if code is None:
+            if len(types) >= 256:
+                raise ValueError("More than 256 distinct transformation types")
+            code = types[type_sid] = len(types)
+        edge_src.append(src)
+        edge_tgt.append(tgt)
+        edge_type.append(code)
+        edge_conf.append(float(conf) if conf is not None else 0.0)
+    del seen_edges
+
+    string_list: List[str] = [None] * len(strings)
+    for value, sid in strings.items():
+        string_list[sid] = value
+    del strings
+
+    # Order datasets by name, and nodes by (dataset rank, field name)
+    dataset_sids = sorted(dataset_ns, key=lambda sid: string_list[sid])
+    dataset_rank = {sid: rank for rank, sid in enumerate(dataset_sids)}
+    node_keys = sorted(nodes.items(),
+                       key=lambda kv: (dataset_rank[kv[0][0]], string_list[kv[0][1]]))
+    remap = _typed_array("I", [0]) * len(node_keys)
+    node_dataset = _typed_array("I")
+    node_field = _typed_array("I")
+    for new_id, ((ds, field), old_id) in enumerate(node_keys):
+        remap[old_id] = new_id
+        node_dataset.append(dataset_rank[ds])
+        node_field.append(field)
+    del nodes, node_keys
+
+    dataset_nodes, _ = _csr(node_dataset, len(dataset_sids))
+    for i in range(len(edge_src)):
+        edge_src[i] = remap[edge_src[i]]
+        edge_tgt[i] = remap[edge_tgt[i]]
+
+    node_count = len(node_dataset)
+    fwd_offsets, fwd_perm = _csr(edge_src, node_count)
+    fwd_targets = _typed_array("I", (edge_tgt[e] for e in fwd_perm))
+    fwd_type = _typed_array("B", (edge_type[e] for e in fwd_perm))
+    fwd_conf = _typed_array("f", (edge_conf[e] for e in fwd_perm))
+    # Reverse CSR is built over forward edge positions so it can index them
+    fwd_sources = _typed_array("I", (edge_src[e] for e in fwd_perm))
+    rev_offsets, rev_edge = _csr(fwd_targets, node_count)
+    rev_sources = _typed_array("I", (fwd_sources[e] for e in rev_edge))
+    del edge_src, edge_tgt, edge_type, edge_conf, fwd_perm, fwd_sources
+
+    blob = bytearray()
+    string_offsets = _typed_array("I", [0])
+    for value in string_list:
+        blob += value.encode("utf-8")
+        string_offsets.append(len(blob))
+
+    type_names = _typed_array("I", [0]) * len(types)
+    for type_sid, code in types.items():
+        type_names[code] = type_sid
+
+    payloads = {
+        "string_offsets": string_offsets,
+        "string_blob": bytes(blob),
+        "type_names": type_names,
+        "dataset_name": _typed_array("I", dataset_sids),
+        "dataset_namespace": _typed_array("I", (dataset_ns[sid] for sid in dataset_sids)),
+        "dataset_nodes": dataset_nodes,
+        "node_dataset": node_dataset,
+        "node_field": node_field,
+        "fwd_offsets": fwd_offsets,
+        "fwd_targets": fwd_targets,
+        "fwd_type": fwd_type,
+        "fwd_confidence": fwd_conf,
+        "rev_offsets": rev_offsets,
+        "rev_sources": rev_sources,
+        "rev_edge": rev_edge,
+    }
+
+    directory_size = _HEADER.size + _SECTION_ENTRY.size * len(SECTIONS)
+    offset = (directory_size + 7) & ~7
+    entries = []
+    for name, _ in SECTIONS:
+        data = payloads[name]
+        nbytes = len(data) if isinstance(data, bytes) else len(data) * data.itemsize
+        entries.append((offset, nbytes))
+        offset = (offset + nbytes + 7) & ~7
+
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(SECTIONS),
+            node_count, len(fwd_targets), len(dataset_sids), len(string_list),
+            time.time(), max_discovered_at or 0.0,
+        ))
+        for entry in entries:
+            f.write(_SECTION_ENTRY.pack(*entry))
+        for (name, _), (section_offset, _) in zip(SECTIONS, entries):
+            f.write(b"\0" * (section_offset - f.tell()))
+            data = payloads[name]
+            f.write(data if isinstance(data, bytes) else data.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    return {
+        "nodes": node_count,
+        "edges": len(fwd_targets),
+        "datasets": len(dataset_sids),
+        "strings": len(string_list),
+    }
+
+
+class LineageSnapshot:
+    """Zero-copy, read-only view of a lineage snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (magic, version, section_count, self.node_count, self.edge_count,
+         self.dataset_count, self.string_count, self.created_at,
+         self.max_discovered_at) = _HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a lineage snapshot")
+        if version != SNAPSHOT_FORMAT_VERSION or section_count != len(SECTIONS):
+            raise ValueError(f"Unsupported snapshot format version {version}")
+
+        for i, (name, typecode) in enumerate(SECTIONS):
+            offset, nbytes = _SECTION_ENTRY.unpack_from(
+                self._mmap, _HEADER.size + i * _SECTION_ENTRY.size)
+            section = self._view[offset:offset + nbytes]
+            setattr(self, f"_{name}", section if typecode == "B" else section.cast(typecode))
+
+    def close(self):
+        """Release the memory map (views handed out must no longer be used)."""
+        for name, _ in SECTIONS:
+            getattr(self, f"_{name}").release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- strings -------------------------------------------------------------
+
+    def string(self, sid: int) -> str:
+        """Return an interned string by id."""
+        start, end = self._string_offsets[sid], self._string_offsets[sid + 1]
+        return str(self._string_blob[start:end], "utf-8")
+
+    def dataset_name(self, dataset: int) -> str:
+        return self.string(self._dataset_name[dataset])
+
+    def dataset_namespace(self, dataset: int) -> str:
+        return self.string(self._dataset_namespace[dataset])
+
+    # -- nodes ---------------------------------------------------------------
+
+    def find_dataset(self, name: str) -> int:
+        """Binary search a dataset by name; returns -1 when absent."""
+        lo, hi = 0, self.dataset_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.dataset_name(mid) < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.dataset_count and self.dataset_name(lo) == name:
+            return lo
+        return -1
+
+    def dataset_nodes(self, dataset: int) -> range:
+        """Node ids belonging to a dataset."""
+        return range(self._dataset_nodes[dataset], self._dataset_nodes[dataset + 1])
+
+    def find_node(self, dataset: str, field: str, case_insensitive: bool = True) -> int:
+        """Find a column node by dataset name and field name; returns -1 when absent."""
+        ds = self.find_dataset(dataset)
+        if ds < 0:
+            return -1
+        node_range = self.dataset_nodes(ds)
+        fields = _FieldView(self, node_range.start)
+        i = node_range.start + bisect_left(fields, field, 0, len(node_range))
+        if i < node_range.stop and self.node_field(i) == field:
+            return i
+        if case_insensitive:
+            folded = field.upper()
+            for node in node_range:
+                if self.node_field(node).upper() == folded:
+                    return node
+        return -1
+
+    def node_dataset(self, node: int) -> int:
+        return self._node_dataset[node]
+
+    def node_field(self, node: int) -> str:
+        return self.string(self._node_field[node])
+
+    def node_key(self, node: int) -> Tuple[str, str, str]:
+        """Return (namespace, dataset_name, field_name) for a node."""
+        ds = self._node_dataset[node]
+        return self.dataset_namespace(ds), self.dataset_name(ds), self.node_field(node)
+
+    # -- edges ---------------------------------------------------------------
+
+    def out_degree(self, node: int) -> int:
+        return self._fwd_offsets[node + 1] - self._fwd_offsets[node]
+
+    def in_degree(self, node: int) -> int:
+        return self._rev_offsets[node + 1] - self._rev_offsets[node]
+
+    def successors(self, node: int) -> Iterator[Tuple[int, int]]:
+        """Yield (target_node, edge_id) for downstream edges of a node."""
+        for edge in range(self._fwd_offsets[node], self._fwd_offsets[node + 1]):
+            yield self._fwd_targets[edge], edge
+
+    def predecessors(self, node: int) -> Iterator[Tuple[int, int]]:
+        """Yield (source_node, edge_id) for upstream edges of a node."""
+        for i in range(self._rev_offsets[node], self._rev_offsets[node + 1]):
+            yield self._rev_sources[i], self._rev_edge[i]
+
+    def edge_type(self, edge: int) -> str:
+        return self.string(self._type_names[self._fwd_type[edge]])
+
+    def edge_confidence(self, edge: int) -> float:
+        return self._fwd_confidence[edge]
+
+    def iter_edges(self) -> Iterator[EdgeRow]:
+        """Yield every edge as an edge row (same shape write_snapshot accepts)."""
+        for source in range(self.node_count):
+            src_ns, src_ds, src_field = self.node_key(source)
+            for target, edge in self.successors(source):
+                tgt_ns, tgt_ds, tgt_field = self.node_key(target)
+                yield (src_ns, src_ds, src_field, tgt_ns, tgt_ds, tgt_field,
+                       self.edge_type(edge), self.edge_confidence(edge))
+
+
+class _FieldView:
+    """Sequence adapter exposing field names of a dataset's nodes to bisect."""
+
+    def __init__(self, snapshot: LineageSnapshot, first_node: int):
+        self._snapshot = snapshot
+        self._first = first_node
+
+    def __getitem__(self, i: int) -> str:
+        return self._snapshot.node_field(self._first + i)
+
+
+def fetch_active_lineage(cursor, batch_size: int = 50000) -> Iterator[EdgeRow]:
+    """Stream active edges from OL_COLUMN_LINEAGE in bounded batches."""
+    from db_config import CONFIG
+    cursor.execute(f"""
+        SELECT
+            TRIM(source_namespace), TRIM(source_dataset), TRIM(source_field),
+            TRIM(target_namespace), TRIM(target_dataset), TRIM(target_field),
+            TRIM(transformation_type), confidence_score
+        FROM {CONFIG["database"]}.OL_COLUMN_LINEAGE
+        WHERE is_active = 'Y'
+    """)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield tuple(row)
+
+
+def fetch_max_discovered_at(cursor) -> Optional[float]:
+    """Return the newest active discovered_at as epoch seconds."""
+    from db_config import CONFIG
+    cursor.execute(f"""
+        SELECT MAX(discovered_at) FROM {CONFIG["database"]}.OL_COLUMN_LINEAGE
+        WHERE is_active = 'Y'
+    """)
+    row = cursor.fetchone()
+    return row[0].timestamp() if row and row[0] else None
+
+
+def print_snapshot_info(path: str):
+    """Print a summary of a snapshot file."""
+    with LineageSnapshot(path) as snap:
+        print(f"Snapshot: {path}")
+        print(f"  Size:          {os.path.getsize(path):,} bytes")
+        print(f"  Created:       {datetime.fromtimestamp(snap.created_at)}")
+        if snap.max_discovered_at:
+            print(f"  Lineage as of: {datetime.fromtimestamp(snap.max_discovered_at)}")
+        print(f"  Datasets:      {snap.dataset_count:,}")
+        print(f"  Columns:       {snap.node_count:,}")
+        print(f"  Edges:         {snap.edge_count:,}")
+        print(f"  Strings:       {snap.string_count:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the active lineage graph to a binary snapshot file",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        default=DEFAULT_SNAPSHOT_PATH,
+        help=f"Snapshot file to write (default: {DEFAULT_SNAPSHOT_PATH})"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50000,
+        help="Rows fetched per round trip (default: 50000)"
+    )
+    parser.add_argument(
+        "--info",
+        metavar="PATH",
+        help="Print a summary of an existing snapshot and exit"
+    )
+    args = parser.parse_args()
+
+    if args.info:
+        print_snapshot_info(args.info)
+        return 0
+
+    import teradatasql
+    from db_config import CONFIG
+
+    print("=" * 60)
+    print("Export Lineage Snapshot")
+    print("=" * 60)
+
+    print(f"\nConnecting to {CONFIG['host']}...")
+    try:
+        conn = teradatasql.connect(**CONFIG)
+        cursor = conn.cursor()
+        print("Connected successfully!")
+    except Exception as e:
+        print(f"ERROR: Failed to connect: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    max_discovered_at = fetch_max_discovered_at(cursor)
+    counts = write_snapshot(args.output, fetch_active_lineage(cursor, args.batch_size),
+                            max_discovered_at=max_discovered_at)
+    elapsed = time.perf_counter() - start
+
+    cursor.close()
+    conn.close()
+
+    print(f"\n  Wrote {counts['edges']:,} edges between {counts['nodes']:,} columns "
+          f"in {counts['datasets']:,} datasets ({elapsed:.1f}s)")
+    print(f"  Snapshot: {args.output} ({os.path.getsize(args.output):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Staged MERGE Loads into OL_COLUMN_LINEAGE
+
+Lineage sources (DBQL extraction, fixtures) hand their rows to load_lineage(),
+which applies them to OL_COLUMN_LINEAGE in three steps:
+
+  1. Bulk-load the rows into a session-local volatile table
+     (OL_COLUMN_LINEAGE_STG) with batched executemany calls.
+  2. Count how many staged rows are new, will change an existing edge, or
+     match an existing active edge exactly.
+  3. Apply them with a single set-based MERGE: new edges are inserted;
+     existing edges get the staged attributes, a fresh discovered_at and
+     is_active = 'Y' (reactivating edges that had been deactivated).
+
+Once most of the graph is known, most rows match existing edges, so the
+MERGE replaces a run of rejected duplicate-key inserts with one statement.
+
+For full extractions with millions of rows, fastload_lineage() stages through
+the teradatasql FastLoad protocol instead, into the permanent, empty table
+OL_COLUMN_LINEAGE_LOAD, in chunks of rows per executemany call. Rows FastLoad
+rejects are read back from its error tables and reported. Where FastLoad is
+not available (load table missing, FastLoad disabled or not allowed for the
+user), it falls back to load_lineage().
+
+Usage:
+  from lineage_loader import load_lineage
+
+  counts = load_lineage(cursor, DATABASE, rows)
+  print(counts.inserted, counts.updated, counts.unchanged)
+"""
+
+from collections import namedtuple
+from typing import List, Sequence, Tuple
+
+import teradatasql
+
+# Volatile tables live in the session's spool and vanish when it ends
+STAGING_TABLE = "OL_COLUMN_LINEAGE_STG"
+
+# FastLoad cannot write volatile tables: it loads this permanent table, which
+# must be empty when a load starts (created by setup_lineage_schema.py)
+FASTLOAD_TABLE = "OL_COLUMN_LINEAGE_LOAD"
+
+# Rows sent per FastLoad executemany() call; FastLoad pays off from ~100k rows
+DEFAULT_FASTLOAD_CHUNK = 500000
+
+# FastLoad errors printed in full (the rest are counted)
+MAX_REPORTED_ERRORS = 20
+
+# Row layout expected by load_lineage()
+STAGED_COLUMNS = (
+    "lineage_id", "source_namespace", "source_dataset", "source_field",
+    "target_namespace", "target_dataset", "target_field",
+    "transformation_type", "transformation_subtype", "transformation_description",
+    "confidence_score",
+)
+
+# Attributes compared to decide whether a matched edge counts as updated
+COMPARED_COLUMNS = (
+    "transformation_type", "transformation_subtype",
+    "transformation_description", "confidence_score",
+)
+
+LoadCounts = namedtuple("LoadCounts", "inserted updated unchanged rejected")
+
+
+def _unique_rows(rows: Sequence[Tuple]) -> List[Tuple]:
+    """Drop later duplicates of a lineage_id (MERGE allows one source row per target)."""
+    unique = {}
+    for row in rows:
+        unique.setdefault(row[0], row)
+    return list(unique.values())
+
+
+def create_staging_table(cursor):
+    """(Re)create the volatile staging table in the current session."""
+    try:
+        cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+    except teradatasql.DatabaseError as e:
+        if "3807" not in str(e):
+            raise
+    cursor.execute(f"""
+        CREATE VOLATILE MULTISET TABLE {STAGING_TABLE} (
+            lineage_id VARCHAR(64) NOT NULL,
+            source_namespace VARCHAR(512) NOT NULL,
+            source_dataset VARCHAR(256) NOT NULL,
+            source_field VARCHAR(256) NOT NULL,
+            target_namespace VARCHAR(512) NOT NULL,
+            target_dataset VARCHAR(256) NOT NULL,
+            target_field VARCHAR(256) NOT NULL,
+            transformation_type VARCHAR(20),
+            transformation_subtype VARCHAR(50),
+            transformation_description VARCHAR(2000),
+            confidence_score DECIMAL(3,2)
+        ) PRIMARY INDEX (lineage_id)
+        ON COMMIT PRESERVE ROWS
+    """)
+
+
+def insert_batches(cursor, insert_sql: str, rows: Sequence[Tuple], batch_size: int) -> int:
+    """
+    Insert rows with executemany, one transaction per batch of batch_size.
+
+    A batch that fails is rolled back and split in half until the failing
+    rows are isolated; those are reported and skipped.
+
+    Returns:
+        Number of rows inserted
+    """
+    conn = cursor.connection
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        return sum(_insert_batch(cursor, insert_sql, list(rows[i:i + batch_size]))
+                   for i in range(0, len(rows), batch_size))
+    finally:
+        conn.autocommit = autocommit
+
+
+def _insert_batch(cursor, insert_sql: str, rows: List[Tuple]) -> int:
+    conn = cursor.connection
+    try:
+        cursor.executemany(insert_sql, rows)
+        conn.commit()
+        return len(rows)
+    except teradatasql.DatabaseError as e:
+        conn.rollback()
+        if len(rows) == 1:
+            print(f"  Warning: rejected lineage row {rows[0][0]}: {str(e)[:200]}")
+            return 0
+        half = len(rows) // 2
+        return (_insert_batch(cursor, insert_sql, rows[:half])
+                + _insert_batch(cursor, insert_sql, rows[half:]))
+
+
+def merge_staged(cursor, database: str, staged_table: str) -> Tuple[int, int]:
+    """
+    MERGE the rows of a staging table into OL_COLUMN_LINEAGE.
+
+    Returns:
+        (inserted, updated) counted before the MERGE; the remaining staged
+        rows matched an active edge with the same attributes
+    """
+    columns = ", ".join(STAGED_COLUMNS)
+    # NULL-safe inequality per attribute
+    differs = " OR ".join(f"t.{c} <> s.{c} OR (t.{c} IS NULL AND s.{c} IS NOT NULL) "
+                          f"OR (t.{c} IS NOT NULL AND s.{c} IS NULL)"
+                          for c in COMPARED_COLUMNS)
+    cursor.execute(f"""
+        SELECT
+            SUM(CASE WHEN t.lineage_id IS NULL THEN 1 ELSE 0 END),
+            SUM(CASE WHEN t.lineage_id IS NOT NULL AND (COALESCE(t.is_active, 'N') <> 'Y' OR {differs})
+                     THEN 1 ELSE 0 END)
+        FROM {staged_table} s
+        LEFT JOIN {database}.OL_COLUMN_LINEAGE t ON t.lineage_id = s.lineage_id
+    """)
+    inserted, updated = (int(n or 0) for n in cursor.fetchone())
+
+    cursor.execute(f"""
+        MERGE INTO {database}.OL_COLUMN_LINEAGE AS t
+        USING (SELECT {columns} FROM {staged_table}) AS s
+        ON t.lineage_id = s.lineage_id
+        WHEN MATCHED THEN UPDATE SET
+            transformation_type = s.transformation_type,
+            transformation_subtype = s.transformation_subtype,
+            transformation_description = s.transformation_description,
+            confidence_score = s.confidence_score,
+            discovered_at = CURRENT_TIMESTAMP(0),
+            is_active = 'Y'
+        WHEN NOT MATCHED THEN INSERT
+            (lineage_id, run_id, source_namespace, source_dataset, source_field,
+             target_namespace, target_dataset, target_field,
+             transformation_type, transformation_subtype, transformation_description,
+             confidence_score, discovered_at, is_active)
+        VALUES
+            (s.lineage_id, NULL, s.source_namespace, s.source_dataset, s.source_field,
+             s.target_namespace, s.target_dataset, s.target_field,
+             s.transformation_type, s.transformation_subtype, s.transformation_description,
+             s.confidence_score, CURRENT_TIMESTAMP(0), 'Y')
+    """)
+    return inserted, updated
+
+
+def load_lineage(cursor, database: str, rows: Sequence[Tuple],
+                 batch_size: int = 5000) -> LoadCounts:
+    """
+    Stage rows and MERGE them into OL_COLUMN_LINEAGE.
+
+    Args:
+        cursor: Cursor of an autocommit connection
+        database: Database holding OL_COLUMN_LINEAGE
+        rows: Tuples laid out as STAGED_COLUMNS; later duplicates of a
+            lineage_id are dropped (MERGE allows one source row per target)
+        batch_size: Rows per executemany round trip while staging
+
+    Returns:
+        LoadCounts(inserted, updated, unchanged, rejected); updated counts
+        reactivated edges and edges whose attributes changed
+    """
+    unique = _unique_rows(rows)
+
+    create_staging_table(cursor)
+    staged = insert_batches(
+        cursor,
+        f"INSERT INTO {STAGING_TABLE} ({', '.join(STAGED_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(STAGED_COLUMNS))})",
+        unique, max(1, batch_size))
+    inserted, updated = merge_staged(cursor, database, STAGING_TABLE)
+    cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+
+    return LoadCounts(inserted, updated, staged - inserted - updated, len(unique) - staged)
+
+
+def _fastload_errors(cursor, insert_sql: str) -> List[str]:
+    """Errors FastLoad recorded for the last executemany (error tables and warnings)."""
+    messages = []
+    for function in ("teradata_get_warnings", "teradata_get_errors"):
+        cursor.execute(f"{{fn teradata_nativesql}}{{fn {function}}}{insert_sql}")
+        messages.extend(row[0] for row in cursor.fetchall() if row and row[0])
+    return messages
+
+
+def fastload_lineage(cursor, database: str, rows: Sequence[Tuple],
+                     chunk_size: int = DEFAULT_FASTLOAD_CHUNK,
+                     batch_size: int = 5000) -> LoadCounts:
+    """
+    FastLoad rows into OL_COLUMN_LINEAGE_LOAD and MERGE them into OL_COLUMN_LINEAGE.
+
+    Rows are sent chunk_size at a time and committed once at the end, as
+    FastLoad requires. Errors from FastLoad's error tables are printed after
+    each chunk; rows they reject are counted as rejected. Falls back to
+    load_lineage() (volatile staging table, batched inserts) when the load
+    table is missing or FastLoad cannot be used.
+
+    Returns:
+        LoadCounts as for load_lineage()
+    """
+    unique = _unique_rows(rows)
+    load_table = f"{database}.{FASTLOAD_TABLE}"
+    try:
+        cursor.execute(f"DELETE FROM {load_table}")
+    except teradatasql.DatabaseError as e:
+        if "3807" not in str(e):
+            raise
+        print(f"  {FASTLOAD_TABLE} does not exist (run setup_lineage_schema.py); "
+              f"using batched inserts")
+        return load_lineage(cursor, database, unique, batch_size)
+
+    insert_sql = (f"INSERT INTO {load_table} ({', '.join(STAGED_COLUMNS)}) "
+                  f"VALUES ({', '.join('?' * len(STAGED_COLUMNS))})")
+    conn = cursor.connection
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    errors = []
+    try:
+        for i in range(0, len(unique), max(1, chunk_size)):
+            chunk = unique[i:i + chunk_size]
+            try:
+                cursor.executemany("{fn teradata_require_fastload}" + insert_sql, chunk)
+            except teradatasql.DatabaseError as e:
+                conn.rollback()
+                if i > 0:
+                    raise
+                # FastLoad refused before any rows went in: no FastLoad here
+                print(f"  FastLoad unavailable ({str(e).splitlines()[0][:200]}); "
+                      f"using batched inserts")
+                conn.autocommit = autocommit
+                return load_lineage(cursor, database, unique, batch_size)
+            errors.extend(_fastload_errors(cursor, insert_sql))
+            print(f"  FastLoaded {min(i + chunk_size, len(unique))}/{len(unique)} lineage rows")
+        conn.commit()
+    finally:
+        conn.autocommit = autocommit
+
+    for message in errors[:MAX_REPORTED_ERRORS]:
+        print(f"  FastLoad error: {message[:500]}")
+    if len(errors) > MAX_REPORTED_ERRORS:
+        print(f"  ... and {len(errors) - MAX_REPORTED_ERRORS} more FastLoad errors")
+
+    cursor.execute(f"SELECT COUNT(*) FROM {load_table}")
+    staged = int(cursor.fetchone()[0])
+    inserted, updated = merge_staged(cursor, database, load_table)
+    cursor.execute(f"DELETE FROM {load_table}")
+
+    return LoadCounts(inserted, updated, staged - inserted - updated, len(unique) - staged)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Dataset- and Database-Level Lineage Rollups
+
+Aggregates active column lineage into coarser graphs for architecture views:
+
+  OL_DATASET_LINEAGE   - one row per (source dataset, target dataset,
+                         transformation type) with the number of column edges
+  OL_DATABASE_LINEAGE  - the same per (source database, target database,
+                         transformation type)
+
+Both tables are rebuilt with INSERT...SELECT, so the aggregation runs inside
+Teradata, in one transaction: readers see the old rollups until the new ones
+are committed, never an empty or half-built table. The database of a dataset
+is the part of its name before the first dot. The API serves them through the
+zoom parameter of the table and database lineage routes.
+
+Usage:
+  python lineage_rollups.py            # Rebuild both rollup tables
+
+populate_lineage.py runs this automatically after loading lineage.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import argparse
+
+
+def populate_lineage_rollups(cursor, database: str) -> dict:
+    """
+    Rebuild OL_DATASET_LINEAGE and OL_DATABASE_LINEAGE from OL_COLUMN_LINEAGE.
+
+    The deletes and inserts are committed together; on failure they are
+    rolled back and the previous rollups stay in place.
+
+    Returns:
+        {table_name: rows_inserted}
+    """
+    print("\n--- Computing OL_DATASET_LINEAGE and OL_DATABASE_LINEAGE ---")
+    counts = {}
+
+    conn = cursor.connection
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        _rebuild(cursor, database, counts)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit
+
+    for table, count in counts.items():
+        print(f"  {table}: {count} rows")
+    return counts
+
+
+def _rebuild(cursor, database: str, counts: dict):
+    """Delete and re-aggregate both rollup tables (in the caller's transaction)."""
+    cursor.execute(f"DELETE FROM {database}.OL_DATASET_LINEAGE")
+    cursor.execute(f"""
+        INSERT INTO {database}.OL_DATASET_LINEAGE
+        (source_namespace, source_dataset, target_namespace, target_dataset,
+         transformation_type, edge_count, computed_at)
+        SELECT
+            MAX(TRIM(source_namespace)),
+            TRIM(source_dataset),
+            MAX(TRIM(target_namespace)),
+            TRIM(target_dataset),
+            COALESCE(TRIM(transformation_type), 'DIRECT'),
+            COUNT(*),
+            CURRENT_TIMESTAMP(0)
+        FROM {database}.OL_COLUMN_LINEAGE
+        WHERE is_active = 'Y'
+        GROUP BY 2, 4, 5
+    """)
+    counts["OL_DATASET_LINEAGE"] = cursor.rowcount
+
+    # Built from the dataset rollup: far fewer rows than column lineage
+    cursor.execute(f"DELETE FROM {database}.OL_DATABASE_LINEAGE")
+    cursor.execute(f"""
+        INSERT INTO {database}.OL_DATABASE_LINEAGE
+        (source_database, target_database, transformation_type, edge_count, computed_at)
+        SELECT
+            STRTOK(source_dataset, '.', 1),
+            STRTOK(target_dataset, '.', 1),
+            transformation_type,
+            SUM(edge_count),
+            CURRENT_TIMESTAMP(0)
+        FROM {database}.OL_DATASET_LINEAGE
+        GROUP BY 1, 2, 3
+    """)
+    counts["OL_DATABASE_LINEAGE"] = cursor.rowcount
+
+
+def main():
+    argparse.ArgumentParser(
+        description="Rebuild dataset- and database-level lineage rollups").parse_args()
+
+    import teradatasql
+    from db_config import CONFIG
+
+    conn = teradatasql.connect(**CONFIG)
+    cursor = conn.cursor()
+    try:
+        populate_lineage_rollups(cursor, CONFIG["database"])
+    finally:
+        cursor.close()
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
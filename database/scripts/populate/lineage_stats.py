@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Per-Column Lineage Statistics
+
+Computes, for every column that appears in active lineage, its in-degree,
+out-degree and transitive upstream/downstream reach counted in columns,
+tables and databases, and stores them in OL_FIELD_LINEAGE_STATS.
+
+All columns are computed together in one pass over the graph rather than by
+one traversal per column:
+
+  1. Collapse strongly connected components (cycles) with Tarjan's algorithm,
+     leaving a DAG of components.
+  2. Walk the DAG in topological order, building each component's reach as
+     the union of its neighbors' reach (bitsets held in Python ints, so unions
+     are single C-level OR operations).
+  3. Free a component's reach as soon as the last component that needs it has
+     been processed, which bounds memory by the width of the DAG.
+
+The table is replaced in one transaction, so traversals and degree lookups
+keep reading the previous statistics until the new ones are committed.
+
+Usage:
+  python lineage_stats.py            # Recompute OL_FIELD_LINEAGE_STATS
+  python lineage_stats.py --dry-run  # Compute and print a summary only
+
+populate_lineage.py runs this automatically after loading lineage.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import argparse
+import time
+from typing import Dict, Iterable, List, Tuple
+
+Column = Tuple[str, str]  # (dataset_name, field_name)
+
+# Columns written to OL_FIELD_LINEAGE_STATS after (dataset_name, field_name)
+STAT_NAMES = (
+    "in_degree", "out_degree",
+    "upstream_columns", "downstream_columns",
+    "upstream_tables", "downstream_tables",
+    "upstream_databases", "downstream_databases",
+)
+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:  # Python < 3.10
+    def _popcount(bits: int) -> int:
+        return bin(bits).count("1")
+
+
+def strongly_connected_components(adjacency: List[List[int]]) -> List[List[int]]:
+    """
+    Tarjan's algorithm (iterative).
+
+    Returns:
+        Components in reverse topological order: every edge between two
+        components points from a later component to an earlier one
+    """
+    n = len(adjacency)
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, i = work.pop()
+            if i == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            neighbors = adjacency[node]
+            while i < len(neighbors):
+                nxt = neighbors[i]
+                i += 1
+                if index[nxt] < 0:
+                    work.append((node, i))
+                    work.append((nxt, 0))
+                    break
+                if on_stack[nxt]:
+                    lowlink[node] = min(lowlink[node], index[nxt])
+            else:
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
+
+
+def _reach_counts(components, component_of, adjacency, column_bit, table_bit, database_bit):
+    """
+    Count the columns, tables and databases reachable from each column.
+
+    Components must be ordered so that every edge points to an earlier one.
+
+    Returns:
+        List of (columns, tables, databases) per column id
+    """
+    # How many later components still need each component's reach
+    pending = [0] * len(components)
+    successors = []
+    for c, members in enumerate(components):
+        succ = {component_of[t] for m in members for t in adjacency[m]} - {c}
+        successors.append(succ)
+        for s in succ:
+            pending[s] += 1
+
+    reach = {}  # component -> (column bits, table bits, database bits), incl. members
+    counts = [None] * len(component_of)
+    for c, members in enumerate(components):
+        cols = tables = dbs = 0
+        for s in successors[c]:
+            s_cols, s_tables, s_dbs = reach[s]
+            cols |= s_cols
+            tables |= s_tables
+            dbs |= s_dbs
+            pending[s] -= 1
+            if pending[s] == 0:
+                del reach[s]
+
+        member_cols = member_tables = member_dbs = 0
+        for m in members:
+            member_cols |= column_bit[m]
+            member_tables |= table_bit[m]
+            member_dbs |= database_bit[m]
+        cyclic = len(members) > 1 or m in adjacency[m]
+        if cyclic:
+            # Every member of a cycle reaches every other member
+            cols |= member_cols
+            tables |= member_tables
+            dbs |= member_dbs
+
+        n_tables, n_dbs = _popcount(tables), _popcount(dbs)
+        for m in members:
+            n_cols = _popcount(cols) - (1 if cyclic else 0)  # A column does not feed itself
+            counts[m] = (n_cols, n_tables, n_dbs)
+
+        if pending[c]:
+            reach[c] = (cols | member_cols, tables | member_tables, dbs | member_dbs)
+    return counts
+
+
+def compute_lineage_stats(edges: Iterable[Tuple[str, str, str, str]]) -> Dict[Column, Tuple[int, ...]]:
+    """
+    Compute degree and reach statistics for every column in a lineage graph.
+
+    Args:
+        edges: (source_dataset, source_field, target_dataset, target_field)
+            tuples; duplicates are ignored
+
+    Returns:
+        {(dataset_name, field_name): tuple of STAT_NAMES values}, with names
+        in upper case: Teradata names are case-insensitive, so spellings that
+        differ only in case are one column (and one OL_FIELD_LINEAGE_STATS key)
+    """
+    ids: Dict[Column, int] = {}
+    columns: List[Column] = []
+    forward: List[List[int]] = []
+    reverse: List[List[int]] = []
+    seen = set()
+
+    def column_id(column: Column) -> int:
+        column = (column[0].upper(), column[1].upper())
+        i = ids.get(column)
+        if i is None:
+            i = ids[column] = len(columns)
+            columns.append(column)
+            forward.append([])
+            reverse.append([])
+        return i
+
+    for src_ds, src_field, tgt_ds, tgt_field in edges:
+        s = column_id((src_ds, src_field))
+        t = column_id((tgt_ds, tgt_field))
+        if (s, t) not in seen:
+            seen.add((s, t))
+            forward[s].append(t)
+            reverse[t].append(s)
+
+    # Bit positions for columns, tables and databases
+    table_ids: Dict[str, int] = {}
+    database_ids: Dict[str, int] = {}
+    column_bit, table_bit, database_bit = [], [], []
+    for i, (dataset, _) in enumerate(columns):
+        database = dataset.split(".", 1)[0]
+        column_bit.append(1 << i)
+        table_bit.append(1 << table_ids.setdefault(dataset, len(table_ids)))
+        database_bit.append(1 << database_ids.setdefault(database, len(database_ids)))
+
+    components = strongly_connected_components(forward)
+    component_of = [0] * len(columns)
+    for c, members in enumerate(components):
+        for m in members:
+            component_of[m] = c
+
+    # Tarjan order has edges pointing to earlier components: right order for
+    # downstream reach; reversed, it is the right order for upstream reach
+    downstream = _reach_counts(components, component_of, forward,
+                               column_bit, table_bit, database_bit)
+    upstream_components = components[::-1]
+    upstream_component_of = [len(components) - 1 - c for c in component_of]
+    upstream = _reach_counts(upstream_components, upstream_component_of, reverse,
+                             column_bit, table_bit, database_bit)
+
+    return {
+        column: (len(reverse[i]), len(forward[i]),
+                 upstream[i][0], downstream[i][0],
+                 upstream[i][1], downstream[i][1],
+                 upstream[i][2], downstream[i][2])
+        for i, column in enumerate(columns)
+    }
+
+
+def populate_lineage_stats(cursor, database: str, batch_size: int = 5000,
+                           dry_run: bool = False) -> int:
+    """
+    Recompute OL_FIELD_LINEAGE_STATS from active OL_COLUMN_LINEAGE rows.
+
+    The delete and the batched inserts are committed together; on failure
+    they are rolled back and the previous statistics stay in place.
+
+    Returns:
+        Number of columns with statistics
+    """
+    print("\n--- Computing OL_FIELD_LINEAGE_STATS ---")
+    start = time.perf_counter()
+    cursor.execute(f"""
+        SELECT TRIM(source_dataset), TRIM(source_field), TRIM(target_dataset), TRIM(target_field)
+        FROM {database}.OL_COLUMN_LINEAGE
+        WHERE is_active = 'Y'
+    """)
+    edges = []
+    while True:
+        rows = cursor.fetchmany(50000)
+        if not rows:
+            break
+        edges.extend(tuple(row) for row in rows)
+
+    stats = compute_lineage_stats(edges)
+    print(f"  Computed {len(stats)} columns from {len(edges)} edges "
+          f"in {time.perf_counter() - start:.1f}s")
+    if dry_run:
+        return len(stats)
+
+    insert_sql = f"""
+        INSERT INTO {database}.OL_FIELD_LINEAGE_STATS
+        (dataset_name, field_name, {", ".join(STAT_NAMES)}, computed_at)
+        VALUES (?, ?, {", ".join("?" * len(STAT_NAMES))}, CURRENT_TIMESTAMP(0))
+    """
+    rows = [column + values for column, values in stats.items()]
+    conn = cursor.connection
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        cursor.execute(f"DELETE FROM {database}.OL_FIELD_LINEAGE_STATS")
+        for i in range(0, len(rows), batch_size):
+            cursor.executemany(insert_sql, rows[i:i + batch_size])
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit
+    print(f"  Stored statistics for {len(rows)} columns")
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute per-column lineage degree and reach statistics")
+    parser.add_argument("--dry-run", "-n", action="store_true",
+                        help="Compute and summarize without writing")
+    args = parser.parse_args()
+
+    import teradatasql
+    from db_config import CONFIG
+
+    conn = teradatasql.connect(**CONFIG)
+    cursor = conn.cursor()
+    try:
+        populate_lineage_stats(cursor, CONFIG["database"], dry_run=args.dry_run)
+    finally:
+        cursor.close()
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+SQL Fingerprints and Parse Result Cache for DBQL Extraction
+
+ETL jobs replay the same statements day after day with different literals,
+and their column lineage does not depend on the literals. fingerprint()
+reduces a statement to its shape - comments dropped, string and numeric
+literals replaced by ?, whitespace collapsed - and hashes it together with
+the statement type and default database the statement was parsed with.
+ParseCache keeps parse results by fingerprint, so a repeated statement is
+parsed once.
+
+With a path, results also persist across runs in a SQLite file
+(SqliteParseStore), keyed by fingerprint and parser version: scheduled
+incremental runs find most statements parsed by an earlier run. Bumping
+sql_parser.PARSER_VERSION (or upgrading sqlglot) invalidates every stored
+result. The file is
+size-bounded; least recently used results are evicted.
+
+Identifiers are kept as written, including their case and quoted names, so
+statements that differ only in what they read or write never share a
+fingerprint.
+
+Usage:
+  from parse_cache import ParseCache, fingerprint
+
+  cache = ParseCache(path="parse_cache.sqlite3", version=parser_version())
+  key = fingerprint(sql, default_database, statement_type)
+  result = cache.get(key)
+  if result is None:
+      result = parse(sql)
+      cache.put(key, result)
+  cache.flush()  # Writes pending results to the file
+  print(f"{cache.hit_rate:.1%} hit rate")
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+# Parse results kept in memory (least recently used are evicted)
+DEFAULT_MAX_ENTRIES = 10000
+
+# Persistent parse results, kept across runs
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "lineage-parse-cache.sqlite3")
+
+# Size bound of the persistent parse results
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Results written to the file per transaction
+WRITE_BATCH = 500
+
+# Literals, comments and whitespace; quoted identifiers are matched so that
+# their contents are left alone
+_TOKEN = re.compile(r"""
+      (?P<string>'(?:[^']|'')*')
+    | (?P<ident>"(?:[^"]|"")*")
+    | (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<number>(?<![\w$#])(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<space>\s+)
+""", re.VERBOSE | re.DOTALL)
+
+_REPLACEMENTS = {"string": "?", "comment": " ", "number": "?", "space": " "}
+
+
+def normalize_sql(sql: Optional[str]) -> str:
+    """SQL with comments removed, literals replaced by ? and whitespace collapsed."""
+    if not sql:
+        return ""
+    normalized = _TOKEN.sub(
+        lambda m: _REPLACEMENTS.get(m.lastgroup, m.group()), sql)
+    return re.sub(r"\s+", " ", normalized).strip().rstrip(";").strip()
+
+
+def fingerprint(sql: Optional[str], default_database: Optional[str] = None,
+                statement_type: Optional[str] = None) -> str:
+    """Hash of a statement's normalized text, statement type and default database."""
+    key = "\0".join((statement_type or "", (default_database or "").strip(), normalize_sql(sql)))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+class SqliteParseStore:
+    """
+    Parse results by (fingerprint, parser version) in a SQLite file, LRU by size.
+
+    Results of other parser versions are deleted when the file is opened.
+    Writes are buffered and committed WRITE_BATCH at a time.
+    """
+
+    def __init__(self, path: str, version: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self._pending: List[Tuple] = []
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Used by one thread at a time, not necessarily the one that opened it
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_results (
+                fingerprint TEXT NOT NULL,
+                parser_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (fingerprint, parser_version)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS parse_results_accessed ON parse_results (accessed_at)")
+        self.invalidated = self._conn.execute(
+            "DELETE FROM parse_results WHERE parser_version <> ?", (version,)).rowcount
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM parse_results").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple]:
+        row = self._conn.execute(
+            "SELECT result FROM parse_results WHERE fingerprint = ? AND parser_version = ?",
+            (key, self.version)).fetchone()
+        if row is None:
+            return None
+        self._pending.append(("touch", key))
+        stored = json.loads(row[0])
+        return stored["records"], tuple(stored["error"]) if stored["error"] else None
+
+    def put(self, key: str, result: Tuple):
+        records, error = result
+        self._pending.append(("put", key, json.dumps({"records": records, "error": error})))
+        if len(self._pending) >= WRITE_BATCH:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered writes and access times, then evict beyond max_bytes."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        now = time.time()
+        with self._conn:
+            self._conn.execute("BEGIN")
+            for op in pending:
+                if op[0] == "touch":
+                    self._conn.execute(
+                        "UPDATE parse_results SET accessed_at = ? "
+                        "WHERE fingerprint = ? AND parser_version = ?",
+                        (now, op[1], self.version))
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO parse_results "
+                        "(fingerprint, parser_version, result, size, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (op[1], self.version, op[2], len(op[2]), now))
+                    self._size += len(op[2])
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used results until the file is under max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM parse_results").fetchone()[0]
+        self._size = total
+        if total <= self.max_bytes:
+            return 0
+        # Evict down to 90% so that eviction does not run on every flush
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        for key, version, size in self._conn.execute(
+                "SELECT fingerprint, parser_version, size FROM parse_results ORDER BY accessed_at, rowid"):
+            victims.append((key, version))
+            excess -= size
+            if excess <= 0:
+                break
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "DELETE FROM parse_results WHERE fingerprint = ? AND parser_version = ?", victims)
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM parse_results").fetchone()[0]
+        return len(victims)
+
+    def stats(self) -> Tuple[int, int]:
+        """Return (entries, stored bytes)."""
+        row = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_results").fetchone()
+        return row[0], row[1]
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+
+class ParseCache:
+    """
+    Parse results by fingerprint (LRU), counting hits and misses.
+
+    With a path, results not in memory are looked up in, and new results
+    written to, a SqliteParseStore for the given parser version. A failing
+    file is reported and the cache carries on in memory.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Optional[str] = None,
+                 version: str = "", max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.store = None
+        if path:
+            try:
+                self.store = SqliteParseStore(path, version, max_bytes)
+            except sqlite3.Error as e:
+                print(f"  Warning: parse cache {path} unavailable ({e}); caching in memory only")
+
+    def get(self, key: str) -> Optional[Any]:
+        """The cached result for key, or None (counted as a hit or a miss)."""
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+        result = self._store_call("get", key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._remember(key, result)
+        self.hits += 1
+        self.disk_hits += 1
+        return result
+
+    def put(self, key: str, result: Any):
+        """Cache a parse result, evicting the least recently used beyond max_entries."""
+        self._remember(key, result)
+        self._store_call("put", key, result)
+
+    def flush(self):
+        """Write pending results to the file."""
+        self._store_call("flush")
+
+    def close(self):
+        """Write pending results and close the file."""
+        self._store_call("close")
+        self.store = None
+
+    def _remember(self, key: str, result: Any):
+        if not self.max_entries:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _store_call(self, method: str, *args):
+        if self.store is None:
+            return None
+        try:
+            return getattr(self.store, method)(*args)
+        except sqlite3.Error as e:
+            print(f"  Warning: parse cache {self.store.path} failed ({e}); caching in memory only")
+            self.store = None
+            return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache."""
+        return self.hits / self.lookups if self.lookups else 0.0
@@ -13,6 +13,8 @@ Usage:
   python populate_lineage.py --dbql       # Explicitly use DBQL (redundant but supported)
   python populate_lineage.py --dbql --since "2024-01-01"  # DBQL since date
   python populate_lineage.py --dry-run    # Preview without changes
+  python populate_lineage.py --skip-stats # Skip OL_FIELD_LINEAGE_STATS rebuild
+  python populate_lineage.py --skip-rollups # Skip dataset/database rollup rebuild
 """
 
 from pathlib import Path
@@ -26,6 +28,17 @@ import hashlib
 
 from db_config import CONFIG, get_openlineage_namespace
 
+try:
+    from lineage_loader import load_lineage
+    from lineage_rollups import populate_lineage_rollups
+    from lineage_stats import populate_lineage_stats
+    from parse_cache import DEFAULT_PATH as PARSE_CACHE_PATH
+except ImportError:
+    from scripts.populate.lineage_loader import load_lineage
+    from scripts.populate.lineage_rollups import populate_lineage_rollups
+    from scripts.populate.lineage_stats import populate_lineage_stats
+    from scripts.populate.parse_cache import DEFAULT_PATH as PARSE_CACHE_PATH
+
 # Get database name from config
 DATABASE = CONFIG["database"]
 
@@ -229,16 +242,7 @@ def populate_lineage_from_fixtures(cursor, namespace_id: str, namespace_uri: str
         # Fallback for direct script execution
         from database.fixtures import COLUMN_LINEAGE_MAPPINGS
 
-    insert_sql = f"""
-        INSERT INTO {DATABASE}.OL_COLUMN_LINEAGE
-        (lineage_id, run_id, source_namespace, source_dataset, source_field,
-         target_namespace, target_dataset, target_field,
-         transformation_type, transformation_subtype, transformation_description,
-         confidence_score, discovered_at, is_active)
-        VALUES (?, NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP(0), 'Y')
-    """
-
-    count = 0
+    rows = []
     for src_template, tgt_template, trans_type, confidence in COLUMN_LINEAGE_MAPPINGS:
         # Substitute {DATABASE} placeholder with actual database name
         src = src_template.format(DATABASE=DATABASE)
@@ -252,32 +256,39 @@ def populate_lineage_from_fixtures(cursor, namespace_id: str, namespace_uri: str
         source_dataset = f"{src_parts[0]}.{src_parts[1]}"
         target_dataset = f"{tgt_parts[0]}.{tgt_parts[1]}"
 
-        try:
-            cursor.execute(insert_sql, (
-                lineage_id,
-                namespace_uri,
-                source_dataset,
-                src_parts[2],  # source_field
-                namespace_uri,
-                target_dataset,
-                tgt_parts[2],  # target_field
-                ol_type,
-                ol_subtype,
-                f"Fixture mapping ({trans_type})",
-                confidence
-            ))
-            count += 1
-        except Exception as e:
-            if "duplicate" not in str(e).lower() and "2801" not in str(e):
-                print(f"  Warning: {src}->{tgt}: {e}")
-
-    print(f"  Created {count} lineage records from fixtures")
-    return count
+        rows.append((
+            lineage_id,
+            namespace_uri,
+            source_dataset,
+            src_parts[2],  # source_field
+            namespace_uri,
+            target_dataset,
+            tgt_parts[2],  # target_field
+            ol_type,
+            ol_subtype,
+            f"Fixture mapping ({trans_type})",
+            confidence
+        ))
+
+    # Stage the mappings and MERGE them into OL_COLUMN_LINEAGE
+    counts = load_lineage(cursor, DATABASE, rows)
+    print(f"  Merged {len(rows)} lineage records from fixtures: {counts.inserted} inserted, "
+          f"{counts.updated} updated, {counts.unchanged} unchanged")
+    if counts.rejected:
+        print(f"  Warning: {counts.rejected} lineage records rejected")
+    return counts.inserted
 
 
 def populate_lineage_from_dbql(cursor, namespace_uri: str, since: datetime = None,
                                full: bool = False, verbose: bool = False,
-                               dry_run: bool = False):
+                               dry_run: bool = False, batch_size: int = 5000,
+                               fastload: bool = True, parse_workers: int = None,
+                               fetch_size: int = 1000, flush_every: int = 50000,
+                               queue_size: int = 4, distinct: bool = False,
+                               watermark: bool = True, settle_minutes: int = 60,
+                               parse_cache_size: int = 10000,
+                               parse_cache_path: str = PARSE_CACHE_PATH,
+                               parse_cache_max_bytes: int = 256 * 1024 * 1024):
     """Populate OL_COLUMN_LINEAGE from DBQL tables via SQL parsing."""
     print("\n--- Populating OL_COLUMN_LINEAGE from DBQL ---")
 
@@ -299,7 +310,19 @@ def populate_lineage_from_dbql(cursor, namespace_uri: str, since: datetime = Non
         cursor=cursor,
         namespace_uri=namespace_uri,
         verbose=verbose,
-        dry_run=dry_run
+        dry_run=dry_run,
+        batch_size=batch_size,
+        fastload=fastload,
+        parse_workers=parse_workers,
+        fetch_size=fetch_size,
+        flush_every=flush_every,
+        queue_size=queue_size,
+        distinct=distinct,
+        watermark=watermark,
+        settle_minutes=settle_minutes,
+        parse_cache_size=parse_cache_size,
+        parse_cache_path=parse_cache_path or None,
+        parse_cache_max_bytes=parse_cache_max_bytes
     )
 
     # Check DBQL access
@@ -320,15 +343,18 @@ def populate_lineage_from_dbql(cursor, namespace_uri: str, since: datetime = Non
 def clear_openlineage_data(cursor, lineage_only: bool = False):
     """Clear existing OpenLineage data.
 
+    The DBQL watermark is cleared with OL_COLUMN_LINEAGE, so the next DBQL
+    extraction does not skip the history whose lineage was deleted.
+
     Args:
         lineage_only: If True, only clear OL_COLUMN_LINEAGE (for DBQL refresh)
     """
     if lineage_only:
         print("\n--- Clearing OL_COLUMN_LINEAGE ---")
-        tables = ["OL_COLUMN_LINEAGE"]
+        tables = ["OL_COLUMN_LINEAGE", "OL_DBQL_WATERMARK"]
     else:
         print("\n--- Clearing existing OpenLineage data ---")
-        tables = ["OL_COLUMN_LINEAGE", "OL_DATASET_FIELD", "OL_DATASET"]
+        tables = ["OL_COLUMN_LINEAGE", "OL_DBQL_WATERMARK", "OL_DATASET_FIELD", "OL_DATASET"]
 
     for table in tables:
         try:
@@ -341,7 +367,8 @@ def clear_openlineage_data(cursor, lineage_only: bool = False):
 def verify_openlineage_data(cursor):
     """Verify OpenLineage data after population."""
     print("\n--- Verifying OpenLineage data ---")
-    for table in ["OL_NAMESPACE", "OL_DATASET", "OL_DATASET_FIELD", "OL_COLUMN_LINEAGE"]:
+    for table in ["OL_NAMESPACE", "OL_DATASET", "OL_DATASET_FIELD", "OL_COLUMN_LINEAGE",
+                  "OL_FIELD_LINEAGE_STATS", "OL_DATASET_LINEAGE", "OL_DATABASE_LINEAGE"]:
         try:
             cursor.execute(f"SELECT COUNT(*) FROM {DATABASE}.{table}")
             count = cursor.fetchone()[0]
@@ -389,6 +416,14 @@ Examples:
   python populate_lineage.py --dbql
   python populate_lineage.py --dbql --since "2024-01-01"
   python populate_lineage.py --dbql --full
+  python populate_lineage.py --dbql --full --no-fastload
+  python populate_lineage.py --dbql --batch-size 10000
+  python populate_lineage.py --dbql --parse-workers 8
+  python populate_lineage.py --dbql --distinct
+
+  # Incremental DBQL run: continue after the watermark, keeping earlier lineage
+  python populate_lineage.py --dbql --lineage-only --skip-clear
+  python populate_lineage.py --dbql --fetch-size 500 --flush-every 20000
 
   # Dry run to preview
   python populate_lineage.py --dry-run
@@ -397,6 +432,13 @@ Examples:
   # Append mode (don't clear existing lineage)
   python populate_lineage.py --skip-clear
 
+Lineage Statistics:
+  After loading lineage, per-column degree and transitive reach counts are
+  recomputed into OL_FIELD_LINEAGE_STATS (see lineage_stats.py), and
+  dataset- and database-level rollups into OL_DATASET_LINEAGE and
+  OL_DATABASE_LINEAGE (see lineage_rollups.py). Use --skip-stats or
+  --skip-rollups to leave those tables as they are.
+
 DBQL Requirements:
   - SELECT access on DBC.DBQLogTbl and DBC.DBQLSQLTbl
   - Query logging enabled: BEGIN QUERY LOGGING WITH SQL, OBJECTS ON ALL
@@ -434,6 +476,78 @@ DBQL Requirements:
         action="store_true",
         help="Full DBQL extraction (ignore time filter)"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="DBQL lineage rows staged per round trip and transaction (default: 5000)"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Processes parsing DBQL SQL in parallel (default: one per CPU; 1 disables)"
+    )
+    parser.add_argument(
+        "--no-watermark",
+        action="store_true",
+        help="Don't resume from or advance the DBQL watermark (OL_DBQL_WATERMARK)"
+    )
+    parser.add_argument(
+        "--settle-minutes",
+        type=int,
+        default=60,
+        help="Without --since/--full, leave DBQL queries started in the last N minutes "
+             "for a later run, until DBQL has logged them (default: 60; 0 reads up to now)"
+    )
+    parser.add_argument(
+        "--distinct",
+        action="store_true",
+        help="Fetch each distinct DBQL statement once (grouped in Teradata) "
+             "instead of every logged query"
+    )
+    parser.add_argument(
+        "--parse-cache-size",
+        type=int,
+        default=10000,
+        help="DBQL parse results cached by SQL fingerprint (default: 10000; 0 disables)"
+    )
+    parser.add_argument(
+        "--parse-cache-path",
+        default=PARSE_CACHE_PATH,
+        help="SQLite file keeping DBQL parse results across runs "
+             f"(default: {PARSE_CACHE_PATH}; empty for memory only)"
+    )
+    parser.add_argument(
+        "--parse-cache-max-bytes",
+        type=int,
+        default=256 * 1024 * 1024,
+        help="Size bound of --parse-cache-path (default: 268435456)"
+    )
+    parser.add_argument(
+        "--fetch-size",
+        type=int,
+        default=1000,
+        help="DBQL queries fetched per round trip (default: 1000)"
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=50000,
+        help="DBQL lineage records loaded and committed at a time (default: 50000; "
+             "--full through FastLoad loads at least 500000 at a time)"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=4,
+        help="DBQL chunks and lineage batches queued between pipeline stages (default: 4)"
+    )
+    parser.add_argument(
+        "--no-fastload",
+        action="store_true",
+        help="Stage --full DBQL extractions with batched inserts instead of FastLoad"
+    )
 
     # Common options
     parser.add_argument(
@@ -456,6 +570,16 @@ DBQL Requirements:
         action="store_true",
         help="Only populate lineage (skip datasets/fields)"
     )
+    parser.add_argument(
+        "--skip-stats",
+        action="store_true",
+        help="Skip recomputing OL_FIELD_LINEAGE_STATS"
+    )
+    parser.add_argument(
+        "--skip-rollups",
+        action="store_true",
+        help="Skip rebuilding OL_DATASET_LINEAGE and OL_DATABASE_LINEAGE"
+    )
 
     args = parser.parse_args()
 
@@ -482,6 +606,8 @@ DBQL Requirements:
             print(f"  Since: {since}")
         elif args.full:
             print("  Full extraction (all history)")
+        elif args.skip_clear and not args.no_watermark:
+            print("  Incremental: after the DBQL watermark (first run: last 30 days)")
         else:
             print("  Default: last 30 days")
     else:
@@ -515,6 +641,10 @@ DBQL Requirements:
             except ImportError:
                 from database.fixtures import COLUMN_LINEAGE_MAPPINGS
             print(f"  - {len(COLUMN_LINEAGE_MAPPINGS)} column lineage records from fixtures")
+        if not args.skip_stats:
+            print(f"  - Lineage statistics in OL_FIELD_LINEAGE_STATS")
+        if not args.skip_rollups:
+            print(f"  - Lineage rollups in OL_DATASET_LINEAGE, OL_DATABASE_LINEAGE")
     else:
         # Clear existing data (unless skipped)
         if not args.skip_clear:
@@ -535,11 +665,39 @@ DBQL Requirements:
                 since=since,
                 full=args.full,
                 verbose=args.verbose,
-                dry_run=args.dry_run
+                dry_run=args.dry_run,
+                batch_size=args.batch_size,
+                fastload=not args.no_fastload,
+                parse_workers=args.parse_workers,
+                fetch_size=args.fetch_size,
+                flush_every=args.flush_every,
+                queue_size=args.queue_size,
+                distinct=args.distinct,
+                watermark=not args.no_watermark,
+                settle_minutes=args.settle_minutes,
+                parse_cache_size=args.parse_cache_size,
+                parse_cache_path=args.parse_cache_path,
+                parse_cache_max_bytes=args.parse_cache_max_bytes
             )
         else:
             populate_lineage_from_fixtures(cursor, namespace_id, namespace_uri)
 
+        # Precompute degree/reach statistics and rollups for the API; a schema
+        # from before these tables existed skips them
+        derived = []
+        if not args.skip_stats:
+            derived.append((populate_lineage_stats, "OL_FIELD_LINEAGE_STATS"))
+        if not args.skip_rollups:
+            derived.append((populate_lineage_rollups, "OL_DATASET_LINEAGE/OL_DATABASE_LINEAGE"))
+        for populate, tables in derived:
+            try:
+                populate(cursor, DATABASE)
+            except teradatasql.DatabaseError as e:
+                if "3807" not in str(e):
+                    raise
+                print(f"  Warning: {tables} does not exist (run setup_lineage_schema.py); "
+                      "skipping")
+
         # Verify data
         verify_openlineage_data(cursor)
 
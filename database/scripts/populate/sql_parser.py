@@ -27,6 +27,16 @@ try:
 except ImportError:
     raise ImportError("sqlglot is required. Install with: pip install sqlglot>=25.0.0")
 
+# Version of the lineage extraction logic. Bump it whenever a change to this
+# module can change the lineage extracted from a statement: results persisted
+# by parse_cache.py for other versions are discarded.
+PARSER_VERSION = "1"
+
+
+def parser_version() -> str:
+    """PARSER_VERSION qualified by the sqlglot release, which parses for it."""
+    return f"{PARSER_VERSION}+sqlglot-{sqlglot.__version__}"
+
 
 @dataclass
 class ColumnReference:
@@ -85,7 +95,8 @@ class TeradataSQLParser:
     def extract_column_lineage(
         self,
         sql: str,
-        statement_type: Optional[str] = None
+        statement_type: Optional[str] = None,
+        default_database: Optional[str] = None
     ) -> List[dict]:
         """
         Extract column-level lineage from a SQL statement.
@@ -93,6 +104,8 @@ class TeradataSQLParser:
         Args:
             sql: The SQL statement to parse
             statement_type: Optional hint about statement type (Insert, Merge Into, etc.)
+            default_database: Database of unqualified table names for this
+                statement only (defaults to the parser's default_database)
 
         Returns:
             List of lineage records as dictionaries
@@ -100,6 +113,14 @@ class TeradataSQLParser:
         if not sql or not sql.strip():
             return []
 
+        if default_database and default_database != self.default_database:
+            parser_default = self.default_database
+            self.default_database = default_database
+            try:
+                return self.extract_column_lineage(sql, statement_type)
+            finally:
+                self.default_database = parser_default
+
         # Clean the SQL
         sql = self._clean_sql(sql)
 
@@ -131,6 +131,84 @@ OL_DDL_STATEMENTS = [
     )
     """,
 
+    # OL_COLUMN_LINEAGE_LOAD - Empty between loads; FastLoad target of full
+    # DBQL extractions, merged into OL_COLUMN_LINEAGE (lineage_loader.py)
+    """
+    CREATE MULTISET TABLE {DATABASE}.OL_COLUMN_LINEAGE_LOAD (
+        lineage_id VARCHAR(64) NOT NULL,
+        source_namespace VARCHAR(512) NOT NULL,
+        source_dataset VARCHAR(256) NOT NULL,
+        source_field VARCHAR(256) NOT NULL,
+        target_namespace VARCHAR(512) NOT NULL,
+        target_dataset VARCHAR(256) NOT NULL,
+        target_field VARCHAR(256) NOT NULL,
+        transformation_type VARCHAR(20),
+        transformation_subtype VARCHAR(50),
+        transformation_description VARCHAR(2000),
+        confidence_score DECIMAL(3,2)
+    ) PRIMARY INDEX (lineage_id)
+    """,
+
+    # OL_DBQL_WATERMARK - Last DBQL query (StartTime, QueryID) whose lineage is
+    # committed; incremental DBQL extractions continue after it (dbql_extractor.py)
+    """
+    CREATE MULTISET TABLE {DATABASE}.OL_DBQL_WATERMARK (
+        source_name VARCHAR(64) NOT NULL,
+        last_start_time TIMESTAMP(6),
+        last_query_id DECIMAL(18,0),
+        queries_processed INTEGER,
+        status VARCHAR(20),
+        updated_at TIMESTAMP(0),
+        PRIMARY KEY (source_name)
+    )
+    """,
+
+    # OL_FIELD_LINEAGE_STATS - Precomputed per-column degree and reach counts
+    # (rebuilt by populate_lineage.py / lineage_stats.py)
+    """
+    CREATE MULTISET TABLE {DATABASE}.OL_FIELD_LINEAGE_STATS (
+        dataset_name VARCHAR(256) NOT NULL,
+        field_name VARCHAR(256) NOT NULL,
+        in_degree INTEGER NOT NULL,
+        out_degree INTEGER NOT NULL,
+        upstream_columns INTEGER NOT NULL,
+        downstream_columns INTEGER NOT NULL,
+        upstream_tables INTEGER NOT NULL,
+        downstream_tables INTEGER NOT NULL,
+        upstream_databases INTEGER NOT NULL,
+        downstream_databases INTEGER NOT NULL,
+        computed_at TIMESTAMP(0),
+        PRIMARY KEY (dataset_name, field_name)
+    )
+    """,
+
+    # OL_DATASET_LINEAGE - Column lineage rolled up per dataset pair and type
+    # (rebuilt by populate_lineage.py / lineage_rollups.py)
+    """
+    CREATE MULTISET TABLE {DATABASE}.OL_DATASET_LINEAGE (
+        source_namespace VARCHAR(512) NOT NULL,
+        source_dataset VARCHAR(256) NOT NULL,
+        target_namespace VARCHAR(512) NOT NULL,
+        target_dataset VARCHAR(256) NOT NULL,
+        transformation_type VARCHAR(20) NOT NULL,
+        edge_count INTEGER NOT NULL,
+        computed_at TIMESTAMP(0),
+        PRIMARY KEY (source_dataset, target_dataset, transformation_type)
+    )
+    """,
+
+    # OL_DATABASE_LINEAGE - Column lineage rolled up per database pair and type
+    """
+    CREATE MULTISET TABLE {DATABASE}.OL_DATABASE_LINEAGE (
+        source_database VARCHAR(128) NOT NULL,
+        target_database VARCHAR(128) NOT NULL,
+        transformation_type VARCHAR(20) NOT NULL,
+        edge_count INTEGER NOT NULL,
+        computed_at TIMESTAMP(0),
+        PRIMARY KEY (source_database, target_database, transformation_type)
+    )
+    """,
+
     # OL_SCHEMA_VERSION - Track schema version
     """
     CREATE MULTISET TABLE {DATABASE}.OL_SCHEMA_VERSION (
@@ -178,6 +256,10 @@ INDEX_STATEMENTS = [
     "CREATE INDEX idx_ol_lineage_tgt_field (target_field) ON {DATABASE}.OL_COLUMN_LINEAGE",
     "CREATE INDEX idx_ol_lineage_run (run_id) ON {DATABASE}.OL_COLUMN_LINEAGE",
     "CREATE INDEX idx_ol_lineage_type (transformation_type) ON {DATABASE}.OL_COLUMN_LINEAGE",
+
+    # Rollup lookups by target (the primary key covers lookups by source)
+    "CREATE INDEX idx_ol_ds_lineage_tgt (target_dataset) ON {DATABASE}.OL_DATASET_LINEAGE",
+    "CREATE INDEX idx_ol_db_lineage_tgt (target_database) ON {DATABASE}.OL_DATABASE_LINEAGE",
 ]
 
 
@@ -211,6 +293,11 @@ def main():
     # OL_* tables to drop (in reverse order to handle dependencies)
     tables_to_drop = [
         "OL_SCHEMA_VERSION",
+        "OL_DATABASE_LINEAGE",
+        "OL_DATASET_LINEAGE",
+        "OL_FIELD_LINEAGE_STATS",
+        "OL_DBQL_WATERMARK",
+        "OL_COLUMN_LINEAGE_LOAD",
         "OL_COLUMN_LINEAGE",
         "OL_RUN_OUTPUT",
         "OL_RUN_INPUT",
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming, pipelined, resumable DBQL extraction in dbql_extractor.py.
+
+Tests verify:
+- DBQL rows are read with fetchmany on a connection of their own
+- Lineage is loaded every flush_every records rather than at the end, and
+  full extractions through FastLoad load once per FastLoad chunk
+- A failing load keeps the earlier flushes, stops the pipeline and closes
+  the DBQL connection
+- Bounded queues hold the fetch stage back while loads are slow
+- A parse pool runs alongside the fetch and load threads
+- Per-stage throughput and queue depth are recorded
+- Dry runs count the queries without holding them
+- Distinct mode groups statements in Teradata and counts their occurrences
+- The watermark advances per committed chunk, and the next run continues
+  after it; an interrupted run resumes from its last checkpoint; runs with
+  an explicit --since or --full window leave it alone
+- Watermark-driven runs leave queries too recent to be logged yet for a
+  later run
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'populate'))
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import teradatasql
+
+import dbql_extractor
+from dbql_extractor import DBQLExtractor
+from lineage_loader import LoadCounts
+
+
+class FetchConnection:
+    """DBQL connection whose cursor serves rows through fetchmany only."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.fetches = []
+        self.sql = None
+        self.params = None
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        assert "FROM DBC.DBQLogTbl" in sql
+        self.sql = " ".join(sql.split())
+        self.params = params
+
+    def fetchmany(self, size):
+        self.fetches.append(size)
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class WatermarkCursor:
+    """Keeps the OL_DBQL_WATERMARK row in memory and records every checkpoint."""
+
+    def __init__(self, row=None, missing=False):
+        self.row = row
+        self.missing = missing
+        self.checkpoints = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        assert "OL_DBQL_WATERMARK" in sql
+        if self.missing:
+            raise teradatasql.DatabaseError("[Error 3807] Object 'OL_DBQL_WATERMARK' does not exist.")
+        if sql.split()[0] == "SELECT":
+            return
+        start_time, query_id, processed, status, _ = params
+        self.rowcount = int(self.row is not None)
+        if sql.split()[0] == "UPDATE" and self.row is None:
+            return
+        self.row = (start_time, query_id, status)
+        self.checkpoints.append((query_id, processed, status))
+
+    def fetchone(self):
+        return self.row
+
+
+START = datetime(2024, 1, 1)
+
+
+def queries(n, first=0):
+    return [(i, "Insert", f"INSERT INTO db.t{i} (c) SELECT c FROM db.s{i}",
+             START + timedelta(seconds=i), "db")
+            for i in range(first, first + n)]
+
+
+def extractor(conn, cursor=None, **kwargs):
+    extractor = DBQLExtractor(cursor or WatermarkCursor(), "teradata://h:1025", parse_workers=1,
+                              connect=lambda: conn, **kwargs)
+    extractor.loads = []
+
+    def load(records, full=False):
+        extractor.loads.append(len(records))
+        return len(records)
+
+    extractor._insert_lineage_records = load
+    return extractor
+
+
+def test_streams_and_flushes_every_n_records():
+    conn = FetchConnection(queries(25))
+    ex = extractor(conn, fetch_size=10, flush_every=10, fastload=False)
+
+    assert ex.extract_lineage(full=True) == 25
+    assert conn.fetches == [10, 10, 10, 10]
+    assert ex.loads == [10, 10, 5]
+    assert conn.closed
+    assert ex.stats.queries_succeeded == 25
+    stages = ex.stats.stages
+    assert (stages["fetch"].items, stages["parse"].items, stages["load"].items) == (25, 25, 25)
+    assert ex.stats.bottleneck() in ("fetch", "parse", "load")
+
+
+def test_parse_pool_runs_alongside_fetch_and_load_threads(monkeypatch):
+    # Parsing in this process fails: every statement must go through the pool
+    def not_here(*args):
+        raise AssertionError("parsed in the extractor process")
+
+    monkeypatch.setattr(dbql_extractor, "_parse_query", not_here)
+    conn = FetchConnection(queries(60))
+    ex = extractor(conn, fetch_size=5, flush_every=20, fastload=False, parse_chunk_size=4)
+    ex.parse_workers = 2
+    loaded = []
+    loads = ex._insert_lineage_records
+
+    def load(records, full=False):
+        loaded.extend(r['target_table'] for r in records)
+        return loads(records, full)
+
+    ex._insert_lineage_records = load
+    assert ex.extract_lineage(full=True) == 60
+    assert loaded == [f"t{i}" for i in range(60)]
+    assert ex.loads == [20, 20, 20]
+    assert ex.stats.queries_succeeded == 60
+
+
+def test_full_fastload_loads_once_per_chunk(monkeypatch):
+    fastloads = []
+
+    def fastload_lineage(cursor, database, rows, batch_size=5000):
+        fastloads.append(len(rows))
+        return LoadCounts(len(rows), 0, 0, 0)
+
+    monkeypatch.setattr(dbql_extractor, "DEFAULT_FASTLOAD_CHUNK", 10)
+    monkeypatch.setattr(dbql_extractor, "fastload_lineage", fastload_lineage)
+    cursor = WatermarkCursor()
+    ex = DBQLExtractor(cursor, "teradata://h:1025", parse_workers=1, fetch_size=4,
+                       flush_every=3, connect=lambda: FetchConnection(queries(25)))
+
+    assert ex.extract_lineage(full=True) == 25
+    assert fastloads == [10, 10, 5]
+    assert cursor.checkpoints == []
+
+
+def test_failed_load_keeps_earlier_flushes():
+    conn = FetchConnection(queries(25))
+    ex = extractor(conn, fetch_size=4, flush_every=10, fastload=False)
+    loads = ex._insert_lineage_records
+
+    def load(records, full=False):
+        if ex.loads:
+            raise RuntimeError("connection lost")
+        return loads(records, full)
+
+    ex._insert_lineage_records = load
+    with pytest.raises(RuntimeError):
+        ex.extract_lineage(full=True)
+    assert ex.loads == [10]
+    assert conn.closed
+
+
+def test_full_queues_hold_fetch_back():
+    conn = FetchConnection(queries(100))
+    ex = extractor(conn, fetch_size=1, flush_every=1, queue_size=1, fastload=False)
+    loads = ex._insert_lineage_records
+    release = threading.Event()
+
+    def slow_load(records, full=False):
+        release.wait(5)
+        return loads(records, full)
+
+    ex._insert_lineage_records = slow_load
+    result = []
+    runner = threading.Thread(target=lambda: result.append(ex.extract_lineage(full=True)))
+    runner.start()
+    time.sleep(0.5)
+    # One batch loading, one queued, one waiting to be queued; one fetched
+    # chunk queued and one waiting to be queued
+    assert len(conn.fetches) <= 6
+    release.set()
+    runner.join(5)
+    assert result == [100]
+    assert ex.stats.stages["parse"].queue_depth_max == 1
+
+
+def test_dry_run_counts_without_loading():
+    conn = FetchConnection(queries(7))
+    ex = extractor(conn, fetch_size=3, dry_run=True)
+
+    assert ex.extract_lineage(full=True) == 0
+    assert conn.fetches == [3, 3, 3, 3]
+    assert ex.loads == []
+
+
+def test_distinct_statements_are_grouped_in_teradata():
+    rows = [query + (occurrences, None)
+            for query, occurrences in zip(queries(3), (5, 1, 20))]
+    conn = FetchConnection(rows)
+    ex = extractor(conn, distinct=True)
+
+    assert ex.extract_lineage(full=True) == 3
+    assert "HASHROW(s.SQLTextInfo, q.DefaultDatabase, q.StatementType) AS stmt_hash" in conn.sql
+    assert ("QUALIFY ROW_NUMBER() OVER (PARTITION BY d.stmt_hash, d.stmt_length "
+            "ORDER BY d.StartTime DESC, d.QueryID DESC) = 1") in conn.sql
+    assert (ex.stats.queries_processed, ex.stats.occurrences) == (3, 26)
+
+    conn = FetchConnection(queries(3))
+    extractor(conn).extract_lineage(full=True)
+    assert "HASHROW" not in conn.sql
+
+
+def test_watermark_advances_per_committed_chunk():
+    cursor = WatermarkCursor()
+    ex = extractor(FetchConnection(queries(25)), cursor, fetch_size=10, flush_every=10)
+    ex.extract_lineage()
+
+    assert cursor.checkpoints == [(9, 10, "RUNNING"), (19, 20, "RUNNING"),
+                                  (24, 25, "RUNNING"), (24, 25, "COMPLETE")]
+    assert cursor.row == (START + timedelta(seconds=24), 24, "COMPLETE")
+
+
+def test_next_run_continues_after_watermark():
+    cursor = WatermarkCursor(row=(datetime(2024, 1, 1, 0, 0, 24, 500), 24, "COMPLETE"))
+    conn = FetchConnection(queries(5, first=25))
+    ex = extractor(conn, cursor)
+    assert ex.extract_lineage() == 5
+
+    assert "AND (q.StartTime > ? OR (q.StartTime = ? AND q.QueryID > ?))" in conn.sql
+    assert conn.params == [datetime(2024, 1, 1, 0, 0, 24, 500)] * 2 + [24]
+    assert conn.sql.endswith("ORDER BY q.StartTime, q.QueryID")
+    assert cursor.row[1:] == (29, "COMPLETE")
+
+    # Explicit --since and --full windows ignore the watermark and leave it alone
+    row = cursor.row
+    for kwargs in ({"since": START}, {"full": True}):
+        conn = FetchConnection(queries(3))
+        extractor(conn, cursor).extract_lineage(**kwargs)
+        assert "QueryID >" not in conn.sql
+        assert cursor.row == row
+
+
+def test_recent_queries_are_left_until_dbql_has_logged_them():
+    conn = FetchConnection(queries(3))
+    extractor(conn, WatermarkCursor(row=(START, 0, "COMPLETE"))).extract_lineage()
+    assert ("AND q.QueryID > ?)) "
+            "AND q.StartTime < CURRENT_TIMESTAMP(6) - INTERVAL '60' MINUTE(4)") in conn.sql
+
+    # The default window settles too
+    conn = FetchConnection(queries(3))
+    extractor(conn, settle_minutes=20000).extract_lineage()
+    assert "INTERVAL '9999' MINUTE(4)" in conn.sql
+
+    conn = FetchConnection(queries(3))
+    extractor(conn, settle_minutes=0).extract_lineage()
+    assert "CURRENT_TIMESTAMP" not in conn.sql
+
+    # Explicit windows are fetched as given
+    for kwargs in ({"since": START}, {"full": True}):
+        conn = FetchConnection(queries(3))
+        extractor(conn).extract_lineage(**kwargs)
+        assert "CURRENT_TIMESTAMP" not in conn.sql
+
+
+def test_interrupted_run_resumes_from_last_checkpoint():
+    cursor = WatermarkCursor()
+    ex = extractor(FetchConnection(queries(25)), cursor, fetch_size=10, flush_every=10)
+    loads = ex._insert_lineage_records
+
+    def load(records, full=False):
+        if ex.loads:
+            raise RuntimeError("connection lost")
+        return loads(records, full)
+
+    ex._insert_lineage_records = load
+    with pytest.raises(RuntimeError):
+        ex.extract_lineage()
+    assert cursor.row[1:] == (9, "RUNNING")
+
+    conn = FetchConnection(queries(15, first=10))
+    ex = extractor(conn, cursor, fetch_size=10, flush_every=10)
+    assert ex.extract_lineage() == 15
+    assert conn.params == [START + timedelta(seconds=9)] * 2 + [9]
+    assert cursor.row[1:] == (24, "COMPLETE")
+
+
+def test_missing_watermark_table_falls_back_to_lookback():
+    conn = FetchConnection(queries(3))
+    ex = extractor(conn, WatermarkCursor(missing=True))
+    assert ex.extract_lineage() == 3
+    assert "CAST(" in conn.sql and "QueryID >" not in conn.sql
+    assert ex.watermark is False
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for staged MERGE loads into OL_COLUMN_LINEAGE (lineage_loader.py).
+
+Tests verify:
+- Rows are staged with executemany in batches, one commit per batch
+- A failing batch is rolled back and split until the bad rows are isolated
+- Duplicate lineage ids are staged once
+- The MERGE refreshes discovered_at and reactivates edges
+- Inserted, updated and unchanged counts are reported
+- FastLoad stages in chunks, reports error-table rows and merges the load table
+- FastLoad falls back to batched inserts where it is unavailable
+- DBQLExtractor loads its records through the staged MERGE
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'populate'))
+
+import teradatasql
+
+from dbql_extractor import DBQLExtractor
+from lineage_loader import FASTLOAD_TABLE, STAGING_TABLE, fastload_lineage, insert_batches, load_lineage
+
+
+class FakeConnection:
+    def __init__(self):
+        self.autocommit = True
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class LoaderCursor:
+    """Records statements; executemany fails for batches holding a rejected id."""
+
+    def __init__(self, rejected=(), counts=(0, 0), fastload=True, errors=()):
+        self.connection = FakeConnection()
+        self.rejected = set(rejected)
+        self.counts = counts
+        self.fastload = fastload
+        self.errors = list(errors)
+        self.statements = []
+        self.batches = []
+        self.result = []
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.statements.append(sql)
+        self.result = [self.counts]
+        if sql == f"DROP TABLE {STAGING_TABLE}" and len(self.statements) == 1:
+            raise teradatasql.DatabaseError(f"[Error 3807] Object '{STAGING_TABLE}' does not exist.")
+        if "teradata_get_errors" in sql:
+            self.result, self.errors = [(e,) for e in self.errors], []
+        elif "teradata_get_warnings" in sql:
+            self.result = []
+        elif sql.startswith("SELECT COUNT(*)"):
+            self.result = [(sum(len(b) for b in self.batches),)]
+
+    def executemany(self, sql, rows):
+        assert self.connection.autocommit is False
+        if sql.startswith("{fn teradata_require_fastload}") and not self.fastload:
+            raise teradatasql.DatabaseError("[Error 2631] FastLoad is not permitted")
+        self.batches.append([row[0] for row in rows])
+        if any(row[0] in self.rejected for row in rows):
+            raise teradatasql.DatabaseError("[Error 2673] The source parcel length does not match data")
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+
+def row(lineage_id):
+    return (lineage_id, "teradata://h:1025", "db.SRC", "a", "teradata://h:1025", "db.TGT", "a",
+            "DIRECT", "IDENTITY", "test", 0.9)
+
+
+def test_stages_in_batches():
+    cursor = LoaderCursor()
+    assert insert_batches(cursor, "INSERT", [row(str(i)) for i in range(10)], 4) == 10
+    assert [len(b) for b in cursor.batches] == [4, 4, 2]
+    assert cursor.connection.commits == 3
+    assert cursor.connection.autocommit is True
+
+
+def test_failing_batch_is_split_to_isolate_rows():
+    cursor = LoaderCursor(rejected={"5"})
+    assert insert_batches(cursor, "INSERT", [row(str(i)) for i in range(8)], 8) == 7
+    # 8 fails -> 4 ok + 4 fails -> 2 fails + 2 ok -> 1 ok + 1 fails
+    assert [len(b) for b in cursor.batches] == [8, 4, 4, 2, 1, 1, 2]
+    assert cursor.connection.rollbacks == 4
+    assert cursor.connection.commits == 3
+
+
+def test_merges_staged_rows_and_counts():
+    cursor = LoaderCursor(rejected={"bad"}, counts=(2, 1))
+    counts = load_lineage(cursor, "lineage_db", [row("a"), row("b"), row("a"), row("c"),
+                                                 row("d"), row("bad")])
+
+    assert counts == (2, 1, 1, 1)
+    assert sorted(cursor.batches[0]) == ["a", "b", "bad", "c", "d"]
+    merge = next(s for s in cursor.statements if s.startswith("MERGE"))
+    assert merge.startswith(f"MERGE INTO lineage_db.OL_COLUMN_LINEAGE AS t USING "
+                            f"(SELECT lineage_id, ")
+    assert "ON t.lineage_id = s.lineage_id" in merge
+    assert "discovered_at = CURRENT_TIMESTAMP(0), is_active = 'Y'" in merge
+    assert "WHEN NOT MATCHED THEN INSERT" in merge
+    assert cursor.statements[-1] == f"DROP TABLE {STAGING_TABLE}"
+
+
+def test_fastload_in_chunks_then_merge(capsys):
+    cursor = LoaderCursor(counts=(3, 1), errors=["2665 Invalid date (row 4)"])
+    counts = fastload_lineage(cursor, "lineage_db", [row(str(i)) for i in range(5)], chunk_size=2)
+
+    assert [len(b) for b in cursor.batches] == [2, 2, 1]
+    assert cursor.connection.commits == 1
+    assert cursor.connection.autocommit is True
+    assert cursor.statements[0] == f"DELETE FROM lineage_db.{FASTLOAD_TABLE}"
+    merge = next(s for s in cursor.statements if s.startswith("MERGE"))
+    assert f"FROM lineage_db.{FASTLOAD_TABLE}) AS s" in merge
+    assert cursor.statements[-1] == f"DELETE FROM lineage_db.{FASTLOAD_TABLE}"
+    assert counts == (3, 1, 1, 0)
+    assert "FastLoad error: 2665 Invalid date (row 4)" in capsys.readouterr().out
+
+
+def test_fastload_falls_back_to_batched_inserts():
+    cursor = LoaderCursor(counts=(2, 0), fastload=False)
+    counts = fastload_lineage(cursor, "lineage_db", [row("a"), row("b")])
+
+    assert counts == (2, 0, 0, 0)
+    assert cursor.connection.rollbacks == 1
+    assert any(s.startswith(f"CREATE VOLATILE MULTISET TABLE {STAGING_TABLE}")
+               for s in cursor.statements)
+    assert f"FROM {STAGING_TABLE}) AS s" in next(s for s in cursor.statements
+                                                  if s.startswith("MERGE"))
+
+
+def test_dbql_extractor_loads_through_merge():
+    cursor = LoaderCursor(counts=(1, 0))
+    extractor = DBQLExtractor(cursor, "teradata://h:1025", batch_size=100)
+    record = {
+        'source_database': 'db', 'source_table': 'SRC', 'source_column': 'a',
+        'target_database': 'db', 'target_table': 'TGT', 'target_column': 'a',
+        'transformation_type': 'DIRECT',
+    }
+    assert extractor._insert_lineage_records([record, record]) == 1
+    assert len(cursor.batches) == 1 and len(cursor.batches[0]) == 1
+    assert any(s.startswith("MERGE INTO") for s in cursor.statements)
+    assert not any(FASTLOAD_TABLE in s for s in cursor.statements)
+
+    cursor = LoaderCursor(counts=(1, 0))
+    extractor = DBQLExtractor(cursor, "teradata://h:1025")
+    extractor._insert_lineage_records([record], full=True)
+    assert cursor.statements[0].startswith(f"DELETE FROM ")
+    assert cursor.statements[0].endswith(FASTLOAD_TABLE)
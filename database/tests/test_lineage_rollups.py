@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for dataset- and database-level lineage rollups (lineage_rollups.py).
+
+Tests verify:
+- Both rollup tables are cleared and rebuilt inside the database
+- The database rollup is aggregated from the dataset rollup
+- Inserted row counts are reported per table
+- The rebuild is one transaction, rolled back on failure
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'populate'))
+
+import pytest
+
+from lineage_rollups import populate_lineage_rollups
+
+
+class FakeConnection:
+    def __init__(self):
+        self.autocommit = True
+        self.events = []
+
+    def commit(self):
+        self.events.append("commit")
+
+    def rollback(self):
+        self.events.append("rollback")
+
+
+class RecordingCursor:
+    def __init__(self, fail_on=None):
+        self.statements = []
+        self.rowcount = 0
+        self.fail_on = fail_on
+        self.connection = FakeConnection()
+
+    def execute(self, sql, params=None):
+        assert self.connection.autocommit is False
+        self.statements.append(" ".join(sql.split()))
+        if self.fail_on and self.statements[-1].startswith(self.fail_on):
+            raise RuntimeError("no more spool space")
+        self.rowcount = 10 * len(self.statements)
+
+
+def test_rebuilds_dataset_then_database_rollup():
+    cursor = RecordingCursor()
+    counts = populate_lineage_rollups(cursor, "lineage_db")
+
+    deletes = [s for s in cursor.statements if s.startswith("DELETE")]
+    inserts = [s for s in cursor.statements if s.startswith("INSERT")]
+    assert deletes == ["DELETE FROM lineage_db.OL_DATASET_LINEAGE",
+                       "DELETE FROM lineage_db.OL_DATABASE_LINEAGE"]
+    assert "FROM lineage_db.OL_COLUMN_LINEAGE WHERE is_active = 'Y'" in inserts[0]
+    assert "GROUP BY 2, 4, 5" in inserts[0]
+    assert "FROM lineage_db.OL_DATASET_LINEAGE GROUP BY 1, 2, 3" in inserts[1]
+    assert counts == {"OL_DATASET_LINEAGE": 20, "OL_DATABASE_LINEAGE": 40}
+    assert cursor.connection.events == ["commit"]
+    assert cursor.connection.autocommit is True
+
+
+def test_failed_rebuild_is_rolled_back():
+    cursor = RecordingCursor(fail_on="INSERT INTO lineage_db.OL_DATABASE_LINEAGE")
+    with pytest.raises(RuntimeError):
+        populate_lineage_rollups(cursor, "lineage_db")
+    assert cursor.connection.events == ["rollback"]
+    assert cursor.connection.autocommit is True
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary lineage snapshot format (export_lineage_snapshot.py).
+
+Tests verify:
+- Round trip of nodes, edges, transformation types and confidence scores
+- Forward and reverse CSR adjacency agree
+- Dataset and node lookup (binary search, case-insensitive fallback)
+- Duplicate edges are dropped and files are replaced atomically
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'populate'))
+
+import os
+import pytest
+
+from export_lineage_snapshot import LineageSnapshot, write_snapshot
+
+
+NS = "teradata://host:1025"
+
+EDGES = [
+    (NS, "db.SRC", "amount", NS, "db.STG", "amount", "DIRECT", 0.95),
+    (NS, "db.STG", "amount", NS, "db.FACT", "net_amount", "DIRECT", 0.85),
+    (NS, "db.STG", "tax", NS, "db.FACT", "net_amount", "INDIRECT", 0.80),
+    (NS, "db.FACT", "net_amount", NS, "other.RPT", "total", "DIRECT", 0.90),
+    # Duplicate source/target pair is ignored
+    (NS, "db.SRC", "amount", NS, "db.STG", "amount", "INDIRECT", 0.10),
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "lineage.olsnap")
+    write_snapshot(path, EDGES, max_discovered_at=1700000000.0)
+    snap = LineageSnapshot(path)
+    yield snap
+    snap.close()
+
+
+class TestSnapshotRoundTrip:
+
+    def test_counts(self, snapshot):
+        assert snapshot.edge_count == 4
+        assert snapshot.node_count == 5
+        assert snapshot.dataset_count == 4
+        assert snapshot.max_discovered_at == 1700000000.0
+
+    def test_iter_edges_round_trips(self, snapshot):
+        edges = {(e[1], e[2], e[4], e[5], e[6]) for e in snapshot.iter_edges()}
+        assert edges == {(e[1], e[2], e[4], e[5], e[6]) for e in EDGES[:4]}
+
+    def test_confidence_is_preserved(self, snapshot):
+        node = snapshot.find_node("db.SRC", "amount")
+        [(_, edge)] = list(snapshot.successors(node))
+        assert snapshot.edge_confidence(edge) == pytest.approx(0.95)
+        assert snapshot.edge_type(edge) == "DIRECT"
+
+    def test_node_key_includes_namespace(self, snapshot):
+        node = snapshot.find_node("other.RPT", "total")
+        assert snapshot.node_key(node) == (NS, "other.RPT", "total")
+
+
+class TestAdjacency:
+
+    def test_reverse_matches_forward(self, snapshot):
+        forward = {(s, t, e) for s in range(snapshot.node_count)
+                   for t, e in snapshot.successors(s)}
+        reverse = {(s, t, e) for t in range(snapshot.node_count)
+                   for s, e in snapshot.predecessors(t)}
+        assert forward == reverse
+
+    def test_fan_in_and_degrees(self, snapshot):
+        fact = snapshot.find_node("db.FACT", "net_amount")
+        sources = {snapshot.node_key(s)[2] for s, _ in snapshot.predecessors(fact)}
+        assert sources == {"amount", "tax"}
+        assert snapshot.in_degree(fact) == 2
+        assert snapshot.out_degree(fact) == 1
+
+
+class TestLookup:
+
+    def test_missing_dataset_and_field(self, snapshot):
+        assert snapshot.find_dataset("db.MISSING") == -1
+        assert snapshot.find_node("db.FACT", "missing") == -1
+
+    def test_case_insensitive_field_lookup(self, snapshot):
+        assert snapshot.find_node("db.FACT", "NET_AMOUNT") == \
+            snapshot.find_node("db.FACT", "net_amount")
+        assert snapshot.find_node("db.FACT", "NET_AMOUNT", case_insensitive=False) == -1
+
+    def test_dataset_nodes_are_sorted_by_field(self, snapshot):
+        ds = snapshot.find_dataset("db.STG")
+        fields = [snapshot.node_field(n) for n in snapshot.dataset_nodes(ds)]
+        assert fields == ["amount", "tax"]
+
+
+class TestFileHandling:
+
+    def test_empty_graph(self, tmp_path):
+        path = str(tmp_path / "empty.olsnap")
+        write_snapshot(path, [])
+        with LineageSnapshot(path) as snap:
+            assert snap.node_count == 0
+            assert snap.find_node("db.T", "c") == -1
+
+    def test_rewrite_replaces_file_atomically(self, tmp_path):
+        path = str(tmp_path / "lineage.olsnap")
+        write_snapshot(path, EDGES[:1])
+        write_snapshot(path, EDGES)
+        assert [p.name for p in tmp_path.iterdir()] == ["lineage.olsnap"]
+        with LineageSnapshot(path) as snap:
+            assert snap.edge_count == 4
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "not_a_snapshot"
+        path.write_bytes(b"x" * 256)
+        with pytest.raises(ValueError):
+            LineageSnapshot(str(path))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for per-column lineage statistics (lineage_stats.py).
+
+Tests verify:
+- In/out degree and transitive reach on chains and diamonds
+- Cycles: every member reaches the others but not itself
+- Table and database reach counts
+- Spellings of a column that differ only in case are one column
+- Agreement with a naive per-column traversal on a random graph
+- The stored statistics are replaced in one transaction, rolled back on failure
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'populate'))
+
+import random
+
+import pytest
+
+from lineage_stats import STAT_NAMES, compute_lineage_stats, populate_lineage_stats
+
+
+def stats_of(edges, column):
+    dataset, field = column
+    return dict(zip(STAT_NAMES, compute_lineage_stats(edges)[(dataset.upper(), field.upper())]))
+
+
+def test_chain_and_diamond():
+    edges = [
+        ("db.SRC", "a", "db.STG", "a"),
+        ("db.SRC", "a", "db.STG", "b"),
+        ("db.STG", "a", "db.FACT", "x"),
+        ("db.STG", "b", "db.FACT", "x"),
+        ("db.FACT", "x", "rpt.R", "t"),
+    ]
+    src = stats_of(edges, ("db.SRC", "a"))
+    assert src["in_degree"] == 0 and src["out_degree"] == 2
+    assert src["downstream_columns"] == 4
+    assert src["downstream_tables"] == 3
+    assert src["downstream_databases"] == 2
+    assert src["upstream_columns"] == 0
+
+    fact = stats_of(edges, ("db.FACT", "x"))
+    assert fact["in_degree"] == 2 and fact["out_degree"] == 1
+    assert fact["upstream_columns"] == 3
+    assert fact["upstream_tables"] == 2
+    assert fact["upstream_databases"] == 1
+    assert fact["downstream_columns"] == 1
+
+
+def test_cycle_members_reach_each_other():
+    edges = [
+        ("db.A", "x", "db.B", "x"),
+        ("db.B", "x", "db.A", "x"),
+        ("db.B", "x", "db.C", "x"),
+    ]
+    a = stats_of(edges, ("db.A", "x"))
+    assert a["downstream_columns"] == 2  # B.x and C.x, not A.x itself
+    assert a["downstream_tables"] == 3  # A is reached through B
+    assert a["upstream_columns"] == 1
+
+
+def test_self_loop_and_duplicates():
+    edges = [
+        ("db.A", "x", "db.A", "x"),
+        ("db.A", "x", "db.B", "y"),
+        ("db.A", "x", "db.B", "y"),
+    ]
+    a = stats_of(edges, ("db.A", "x"))
+    assert a["out_degree"] == 2
+    assert a["downstream_columns"] == 1
+    assert a["downstream_tables"] == 2
+
+
+def test_case_variants_are_one_column():
+    edges = [
+        ("db.SRC", "Customer_ID", "db.STG", "customer_id"),
+        ("DB.src", "CUSTOMER_ID", "db.Stg", "CUSTOMER_ID"),
+        ("db.STG", "Customer_Id", "Rpt.R", "cust"),
+    ]
+    stats = compute_lineage_stats(edges)
+    assert sorted(stats) == [("DB.SRC", "CUSTOMER_ID"), ("DB.STG", "CUSTOMER_ID"), ("RPT.R", "CUST")]
+    src = stats_of(edges, ("db.src", "customer_id"))
+    assert src["out_degree"] == 1
+    assert src["downstream_columns"] == 2
+    assert src["downstream_tables"] == 2
+    assert src["downstream_databases"] == 2
+
+
+def test_matches_naive_traversal():
+    rng = random.Random(7)
+    columns = [(f"DB{i % 3}.T{i % 7}", f"C{i}") for i in range(60)]
+    edges = [tuple(rng.choice(columns)) + tuple(rng.choice(columns)) for _ in range(150)]
+    forward = {}
+    for s_ds, s_f, t_ds, t_f in edges:
+        forward.setdefault((s_ds, s_f), set()).add((t_ds, t_f))
+
+    stats = compute_lineage_stats(edges)
+    for column, values in stats.items():
+        seen, stack = set(), [column]
+        while stack:
+            for nxt in forward.get(stack.pop(), ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        result = dict(zip(STAT_NAMES, values))
+        assert result["downstream_columns"] == len(seen - {column})
+        assert result["downstream_tables"] == len({ds for ds, _ in seen})
+        assert result["downstream_databases"] == len({ds.split(".")[0] for ds, _ in seen})
+
+
+class StatsCursor:
+    """Serves lineage edges and records the statistics writes."""
+
+    def __init__(self, edges, fail_after=None):
+        self.edges = list(edges)
+        self.fail_after = fail_after
+        self.writes = []
+        self.connection = self
+        self.autocommit = True
+        self.events = []
+
+    def execute(self, sql, params=None):
+        if sql.split()[0] == "DELETE":
+            assert self.autocommit is False
+            self.writes.append("DELETE")
+
+    def fetchmany(self, size):
+        rows, self.edges = self.edges[:size], self.edges[size:]
+        return rows
+
+    def executemany(self, sql, rows):
+        assert self.autocommit is False
+        if self.fail_after is not None and len(self.writes) > self.fail_after:
+            raise RuntimeError("no more perm space")
+        self.writes.append(len(rows))
+
+    def commit(self):
+        self.events.append("commit")
+
+    def rollback(self):
+        self.events.append("rollback")
+
+
+def test_stats_are_replaced_in_one_transaction():
+    edges = [("db.S", f"c{i}", "db.T", f"c{i}") for i in range(5)]
+    cursor = StatsCursor(edges)
+    assert populate_lineage_stats(cursor, "lineage_db", batch_size=4) == 10
+    assert cursor.writes == ["DELETE", 4, 4, 2]
+    assert cursor.events == ["commit"]
+    assert cursor.autocommit is True
+
+    cursor = StatsCursor(edges, fail_after=1)
+    with pytest.raises(RuntimeError):
+        populate_lineage_stats(cursor, "lineage_db", batch_size=4)
+    assert cursor.events == ["rollback"]
+    assert cursor.autocommit is True
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for SQL fingerprints and the parse result cache (parse_cache.py).
+
+Tests verify:
+- Fingerprints ignore literals, comments, whitespace and trailing semicolons
+- Identifiers, quoted names, statement type and default database are kept
+- The cache evicts least recently used results and reports its hit rate
+- DBQLExtractor parses each repeated statement once, in-process and on a pool
+- Results and failures persist across runs for the same parser version
+- A new parser version invalidates stored results; the file is size-bounded
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'populate'))
+
+import dbql_extractor
+from dbql_extractor import DBQLExtractor
+from parse_cache import ParseCache, SqliteParseStore, fingerprint, normalize_sql
+
+
+def test_literals_comments_and_whitespace_are_normalized():
+    a = """INSERT INTO db.t (c, d) -- daily load
+           SELECT c, 'x--y' FROM db.s WHERE dt = DATE '2024-01-01' AND n > 10.5;"""
+    b = "INSERT INTO db.t (c, d) /* rerun */ SELECT c, 'it''s' FROM db.s WHERE dt = DATE '2025-06-30' AND n > 3"
+    assert fingerprint(a, "db") == fingerprint(b, "db")
+    assert normalize_sql(b) == ("INSERT INTO db.t (c, d) SELECT c, ? FROM db.s "
+                                "WHERE dt = DATE ? AND n > ?")
+
+
+def test_identifiers_and_context_are_kept():
+    sql = 'INSERT INTO t1 SELECT c2 FROM "s 3"'
+    assert normalize_sql(sql) == sql
+    assert fingerprint(sql, "db") != fingerprint('INSERT INTO t1 SELECT c2 FROM "s 4"', "db")
+    assert fingerprint(sql, "db") != fingerprint(sql.replace("t1", "T1"), "db")
+    assert fingerprint(sql, "db") != fingerprint(sql, "other")
+    assert fingerprint(sql, "db", "Insert") != fingerprint(sql, "db", "Merge Into")
+    assert fingerprint(sql, " db ") == fingerprint(sql, "db")
+
+
+def test_lru_eviction_and_hit_rate():
+    cache = ParseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+    assert cache.hit_rate == 0.75
+
+    disabled = ParseCache(max_entries=0)
+    disabled.put("a", 1)
+    assert disabled.get("a") is None
+
+
+def replayed(days, jobs):
+    return [(day * jobs + job, "Insert",
+             f"INSERT INTO db.t{job} (c) SELECT c FROM db.s{job} WHERE d = {day}", None, "db")
+            for day in range(days) for job in range(jobs)]
+
+
+def test_repeated_statements_are_parsed_once(monkeypatch):
+    parsed = []
+    parse_query = dbql_extractor._parse_query
+
+    def counting(parser, stmt_type, query_text, default_db):
+        parsed.append(query_text)
+        return parse_query(parser, stmt_type, query_text, default_db)
+
+    monkeypatch.setattr(dbql_extractor, "_parse_query", counting)
+    extractor = DBQLExtractor(None, "teradata://h:1025", parse_workers=1)
+    results = list(extractor._parse_queries(replayed(10, 3)))
+
+    assert len(parsed) == 3
+    assert [r[1][0]['target_table'] for r in results] == ["t0", "t1", "t2"] * 10
+    assert extractor.parse_cache.hit_rate == 27 / 30
+
+
+def test_pool_parses_repeats_once():
+    queries = replayed(10, 3)
+    extractor = DBQLExtractor(None, "teradata://h:1025", parse_workers=2, parse_chunk_size=4)
+    results = list(extractor._parse_queries(queries))
+
+    serial = DBQLExtractor(None, "teradata://h:1025", parse_workers=1, parse_cache_size=0)
+    assert results == list(serial._parse_queries(queries))
+    assert extractor.parse_cache.misses == 3
+    assert extractor.parse_cache.hits == 27
+
+
+RECORDS = [{"source_table": "S", "target_table": "T", "confidence_score": 0.85}]
+
+
+def test_results_persist_across_runs(tmp_path):
+    path = str(tmp_path / "parse.sqlite3")
+    first = ParseCache(path=path, version="1")
+    first.put("ok", (RECORDS, None))
+    first.put("bad", (None, ("ParseError", "unexpected token")))
+    first.close()
+
+    second = ParseCache(path=path, version="1")
+    assert second.get("ok") == (RECORDS, None)
+    assert second.get("bad") == (None, ("ParseError", "unexpected token"))
+    assert second.get("ok") == (RECORDS, None)
+    assert (second.hits, second.disk_hits, second.misses) == (3, 2, 0)
+
+    bumped = ParseCache(path=path, version="2")
+    assert bumped.store.invalidated == 2
+    assert bumped.get("ok") is None
+
+
+def test_store_is_size_bounded(tmp_path):
+    store = SqliteParseStore(str(tmp_path / "parse.sqlite3"), "1", max_bytes=2000)
+    for i in range(50):
+        store.put(f"k{i}", (RECORDS, None))
+        store.flush()
+    entries, size = store.stats()
+    assert size <= 2000
+    assert 0 < entries < 50
+    assert store.get("k49") == (RECORDS, None)
+    assert store.get("k0") is None
+
+
+def test_next_run_parses_nothing_seen_before(tmp_path, monkeypatch):
+    parsed = []
+    parse_query = dbql_extractor._parse_query
+
+    def counting(parser, stmt_type, query_text, default_db):
+        parsed.append(query_text)
+        return parse_query(parser, stmt_type, query_text, default_db)
+
+    monkeypatch.setattr(dbql_extractor, "_parse_query", counting)
+    path = str(tmp_path / "parse.sqlite3")
+
+    def run(queries):
+        extractor = DBQLExtractor(None, "teradata://h:1025", parse_workers=1,
+                                  parse_cache_path=path)
+        results = list(extractor._parse_queries(queries))
+        extractor.parse_cache.flush()
+        return results
+
+    yesterday = run(replayed(2, 3))
+    assert len(parsed) == 3
+    # Today: the same jobs with new literals, plus one new statement
+    today = run(replayed(1, 4))
+    assert len(parsed) == 4
+    assert [r[1] for r in today[:3]] == [r[1] for r in yesterday[:3]]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+JSON Serialization Benchmark for the Lineage API
+
+Builds a synthetic lineage graph in the response shape of the database-level
+lineage route, serializes it with Flask's default JSON provider and with
+FastJSONProvider, checks that both produce identical bytes, and reports
+throughput.
+
+Usage:
+  python benchmark_serialization.py                  # 100k edges
+  python benchmark_serialization.py --edges 500000 --repeat 5
+
+Exits with status 1 if the two providers' output differs.
+"""
+
+import argparse
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import FastJSONProvider
+
+
+def build_graph(edge_count: int, fields_per_table: int = 20, tables_per_db: int = 50) -> dict:
+    """Synthetic column lineage graph: each column feeds a column in the next table."""
+    namespace = "teradata://demo.clearscape.teradata.com:1025"
+    column_count = edge_count + fields_per_table
+
+    nodes = []
+    for i in range(column_count):
+        table = i // fields_per_table
+        dataset = f"db_{table // tables_per_db:03d}.TABLE_{table:06d}"
+        nodes.append({
+            "id": f"{dataset}.COLUMN_{i % fields_per_table:02d}",
+            "type": "field",
+            "name": f"COLUMN_{i % fields_per_table:02d}",
+            "dataset": {"name": dataset, "namespace": namespace, "sourceType": "TABLE"},
+            "metadata": {"columnType": "VARCHAR", "nullable": i % 3 == 0},
+        })
+
+    edges = []
+    for i in range(edge_count):
+        source, target = nodes[i]["id"], nodes[i + fields_per_table]["id"]
+        edges.append({
+            "id": f"{source}->{target}",
+            "source": source,
+            "target": target,
+            "transformationType": "DIRECT" if i % 4 else "INDIRECT",
+        })
+
+    return {
+        "databaseName": "db_000",
+        "datasets": [],
+        "graph": {"nodes": nodes, "edges": edges},
+    }
+
+
+def time_response(app: Flask, payload: dict, repeat: int):
+    """Best-of-N wall time to build a JSON response; returns (seconds, body)."""
+    best, body = float("inf"), b""
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = app.json.response(payload).get_data()
+            best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lineage API JSON serialization")
+    parser.add_argument("--edges", type=int, default=100000, help="Number of edges (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per provider (default: 3)")
+    args = parser.parse_args()
+
+    payload = build_graph(args.edges)
+    print(f"Synthetic graph: {len(payload['graph']['nodes'])} nodes, {args.edges} edges")
+
+    default_app = Flask("default")
+    default_app.json = DefaultJSONProvider(default_app)
+    fast_app = Flask("fast")
+    fast_app.json = FastJSONProvider(fast_app)
+
+    default_seconds, default_body = time_response(default_app, payload, args.repeat)
+    fast_seconds, fast_body = time_response(fast_app, payload, args.repeat)
+
+    megabytes = len(default_body) / 1e6
+    print(f"Response size: {megabytes:.1f} MB")
+    print(f"  stdlib: {default_seconds * 1000:8.1f} ms  {megabytes / default_seconds:8.1f} MB/s")
+    if json_provider.orjson is None:
+        print("  orjson: not installed (FastJSONProvider falls back to the stdlib)")
+    print(f"  fast:   {fast_seconds * 1000:8.1f} ms  {megabytes / fast_seconds:8.1f} MB/s  "
+          f"({default_seconds / fast_seconds:.1f}x)")
+
+    if fast_body != default_body:
+        print("FAIL: output differs from Flask's default JSON provider", file=sys.stderr)
+        return 1
+    print("OK: output is byte-identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Startup warm-up of the response cache from recent traffic.
+
+HotKeys counts successful requests to cached routes in a SQLite file shared by
+all worker processes. Counts are buffered in memory and written every
+`flush_interval` seconds; keys not requested for `retention_days` are dropped.
+
+CacheWarmer replays the top-N keys through the server once per process, on a
+small thread pool and within a time budget, so the first real requests after a
+deploy find their responses cached. Its status backs the /ready endpoint.
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class HotKeys:
+    """Request counts per (path, query), shared by all workers through SQLite."""
+
+    def __init__(self, path, flush_interval=30.0, retention_days=7):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._pending = Counter()
+        self._flushed_at = time.monotonic()
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS hot_keys (
+                path TEXT NOT NULL,
+                query TEXT NOT NULL,
+                hits INTEGER NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (path, query)
+            )
+        """)
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def record(self, path, query):
+        """Count one request; writes to SQLite at most every flush_interval seconds."""
+        with self._lock:
+            self._pending[(path, query)] += 1
+            if time.monotonic() - self._flushed_at < self.flush_interval:
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+            if not pending:
+                return
+            now = time.time()
+            try:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO hot_keys (path, query, hits, last_seen) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (path, query) DO UPDATE "
+                    "SET hits = hits + excluded.hits, last_seen = excluded.last_seen",
+                    [(path, query, hits, now) for (path, query), hits in pending.items()])
+                conn.execute("DELETE FROM hot_keys WHERE last_seen < ?",
+                             (now - self.retention_days * 86400,))
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn is not None and self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                print(f"Warning: could not record hot keys: {e}", file=sys.stderr)
+
+    def top(self, n):
+        """The n most requested (path, query) keys, most requested first."""
+        with self._lock:
+            try:
+                return self._connect().execute(
+                    "SELECT path, query FROM hot_keys ORDER BY hits DESC, last_seen DESC LIMIT ?",
+                    (n,)).fetchall()
+            except sqlite3.Error as e:
+                print(f"Warning: could not read hot keys: {e}", file=sys.stderr)
+                return []
+
+
+class CacheWarmer:
+    """
+    Background warm-up of the top-N hot keys, run once per process.
+
+    Args:
+        hot_keys: HotKeys to read the keys from
+        run: Callable(path, query) computing and caching one response; returns
+            the HTTP status code
+        top_n: Number of keys to warm (0 disables warm-up)
+        budget_seconds: Keys not done by then are abandoned
+        concurrency: Keys computed at once
+    """
+
+    def __init__(self, hot_keys, run, top_n, budget_seconds=120.0, concurrency=2):
+        self.hot_keys = hot_keys
+        self.run = run
+        self.top_n = top_n
+        self.budget_seconds = budget_seconds
+        self.concurrency = concurrency
+        self.state = "pending" if top_n > 0 else "disabled"
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+
+    @property
+    def ready(self):
+        """True once warm-up has finished, run out of time or is disabled."""
+        return self.state in ("done", "timeout", "disabled")
+
+    def start(self):
+        """Start warm-up once per process (safe to call per request)."""
+        if self.top_n <= 0 or (self._thread is not None and self._pid == os.getpid()):
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.state = "running"
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="cache-warmup", daemon=True)
+            self._thread.start()
+
+    def _warm(self, path, query):
+        try:
+            ok = self.run(path, query) == 200
+        except Exception as e:
+            print(f"Warning: cache warm-up of {path} failed: {e}", file=sys.stderr)
+            ok = False
+        with self._count_lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def _run(self):
+        deadline = time.monotonic() + self.budget_seconds
+        keys = self.hot_keys.top(self.top_n)
+        self.total = len(keys)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="cache-warmup")
+        pending = {executor.submit(self._warm, path, query) for path, query in keys}
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        # Requests already running finish in the background; queued ones are dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.finished_at = time.time()
+        self.state = "timeout" if pending else "done"
+        print(f"Cache warm-up {self.state}: {self.completed}/{self.total} keys in "
+              f"{self.finished_at - self.started_at:.1f}s")
+
+    def status(self):
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "state": self.state,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "elapsedSeconds": elapsed,
+        }
@@ -0,0 +1,192 @@
+"""
+HTTP response compression for the Lineage API.
+
+Lineage graphs are large, highly repetitive JSON (dataset names repeat in
+every node and edge id), so they compress well. compress_response() picks
+gzip or brotli from the request's Accept-Encoding, compresses bodies above a
+size threshold, and wraps streamed responses in an incremental compressor.
+Gzip output carries no timestamp, so identical bodies compress to identical
+bytes.
+
+The returned CompressionStats hold the ratio and the CPU time spent
+compressing, which python_server.py reports in Server-Timing and the access log.
+"""
+
+import time
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+# Optional: brotli is offered only when installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response types worth compressing (everything the API returns)
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/plain", "text/html"}
+
+# Valid compression levels per coding: gzip level, brotli quality
+LEVEL_RANGES = {"gzip": (1, 9), "br": (0, 11)}
+
+
+def available_encodings() -> List[str]:
+    """Supported content codings, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def clamp_level(encoding: str, level: int) -> int:
+    """Clamp a compression level into the valid range of encoding."""
+    low, high = LEVEL_RANGES[encoding]
+    return min(max(level, low), high)
+
+
+def negotiate_encoding(accept_encodings, encodings: List[str]) -> Optional[str]:
+    """
+    Pick a content coding from a parsed Accept-Encoding header.
+
+    Args:
+        accept_encodings: werkzeug Accept object (request.accept_encodings)
+        encodings: Supported codings in preference order; ties go to the earlier one
+
+    Returns:
+        The chosen coding, or None when the client accepts none of them
+    """
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionStats:
+    """Input/output sizes and CPU time of one compressed response."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+
+    def server_timing(self) -> str:
+        """Server-Timing entry: compression CPU time, coding and ratio."""
+        return (f'compress;dur={self.cpu_seconds * 1000:.1f};'
+                f'desc="{self.encoding} {self.ratio:.1f}x"')
+
+    def log_fields(self) -> dict:
+        """Access log fields for this response."""
+        return {
+            "encoding": self.encoding,
+            "bytes": self.bytes_out,
+            "uncompressedBytes": self.bytes_in,
+            "compressCpuMs": round(self.cpu_seconds * 1000, 2),
+        }
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor that records CompressionStats."""
+
+    def __init__(self, encoding: str, level: int):
+        self.stats = CompressionStats(encoding)
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=level)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        start = time.thread_time()
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            if flush:
+                out += self._brotli.flush()
+        else:
+            out = self._zlib.compress(data)
+            if flush:
+                out += self._zlib.flush(zlib.Z_SYNC_FLUSH)
+        self._account(len(data), out, start)
+        return out
+
+    def finish(self) -> bytes:
+        start = time.thread_time()
+        out = self._brotli.finish() if self._brotli is not None else self._zlib.flush()
+        self._account(0, out, start)
+        return out
+
+    def _account(self, bytes_in: int, out: bytes, start: float):
+        self.stats.bytes_in += bytes_in
+        self.stats.bytes_out += len(out)
+        self.stats.cpu_seconds += time.thread_time() - start
+
+
+# Streamed bodies are flushed to the client once this much input is pending
+# or this long after the last flush, whichever comes first
+STREAM_FLUSH_BYTES = 64 * 1024
+STREAM_FLUSH_SECONDS = 0.1
+
+
+def _compress_stream(chunks: Iterable, compressor: _Compressor) -> Iterator[bytes]:
+    """Compress a streamed body, flushing periodically so clients see progress."""
+    pending = 0
+    last_flush = time.monotonic()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            pending += len(chunk)
+            flush = (pending >= STREAM_FLUSH_BYTES
+                     or time.monotonic() - last_flush >= STREAM_FLUSH_SECONDS)
+            out = compressor.compress(chunk, flush=flush)
+            if flush:
+                pending, last_flush = 0, time.monotonic()
+            if out:
+                yield out
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def compress_response(response, accept_encodings, encodings: List[str],
+                      levels: dict, min_bytes: int) -> Optional[CompressionStats]:
+    """
+    Compress a Flask response in place when the client accepts it.
+
+    Args:
+        response: Flask/werkzeug Response
+        accept_encodings: Parsed Accept-Encoding of the request
+        encodings: Codings the server may use, in preference order
+        levels: Compression level per coding ({"gzip": 6, "br": 5})
+        min_bytes: Bodies smaller than this are sent uncompressed (streamed
+            bodies have no known size and are always compressed)
+
+    Returns:
+        CompressionStats (final once a streamed body has been sent), or None
+        when the response was left as is
+    """
+    if (not encodings or response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return None
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(accept_encodings, encodings)
+    if encoding is None:
+        return None
+
+    compressor = _Compressor(encoding, levels[encoding])
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, compressor)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return None
+        response.set_data(compressor.compress(data) + compressor.finish())
+    response.headers["Content-Encoding"] = encoding
+    return compressor.stats
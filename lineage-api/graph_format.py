@@ -0,0 +1,111 @@
+"""
+Wire formats for lineage graph responses.
+
+The default ("full") format lists node and edge objects, repeating the full
+`database.table.column` id in every edge and the dataset object in every node.
+The opt-in compact format (`format=compact`) interns them:
+
+    {
+      "format": "compact",
+      "datasets": [{"name": "db.T", "namespace": "teradata://...", ...}],
+      "nodes": [[datasetIndex, "fieldName"], ...],
+      "transformationTypes": ["DIRECT", "INDIRECT"],
+      "edges": [[sourceNodeIndex, targetNodeIndex, typeCode], ...]
+    }
+
+Nodes carrying metadata (database-level lineage) are encoded as
+[datasetIndex, fieldName, columnType, nullable]. Neighbor expansion adds
+"nodeStats": [[inDegree, outDegree, hasMore], ...], parallel to "nodes".
+A node's id is `datasets[datasetIndex].name + "." + fieldName` and an
+edge's id is `sourceId + "->" + targetId`, as in the full format.
+"""
+
+from typing import Dict, Iterable, List
+
+LINEAGE_FORMATS = ("full", "compact")
+
+
+def encode_graph(nodes: Dict[str, dict], edges: Dict[str, dict], wire_format: str) -> dict:
+    """Encode node and edge maps (keyed by id) as the "graph" member of a response."""
+    if wire_format == "compact":
+        return compact_graph(nodes.values(), edges.values())
+    return {"nodes": list(nodes.values()), "edges": list(edges.values())}
+
+
+def compact_graph(nodes: Iterable[dict], edges: Iterable[dict]) -> dict:
+    """Encode full-format nodes and edges in the compact format."""
+    datasets: List[dict] = []
+    dataset_index: Dict[tuple, int] = {}
+    node_rows: List[list] = []
+    node_index: Dict[str, int] = {}
+    node_stats: List[list] = []
+
+    for node in nodes:
+        dataset = node["dataset"]
+        dataset_key = tuple(sorted(dataset.items()))
+        d = dataset_index.get(dataset_key)
+        if d is None:
+            d = dataset_index[dataset_key] = len(datasets)
+            datasets.append(dataset)
+        row = [d, node["name"]]
+        metadata = node.get("metadata")
+        if metadata is not None:
+            row += [metadata.get("columnType"), metadata.get("nullable")]
+        node_index[node["id"]] = len(node_rows)
+        node_rows.append(row)
+        if "inDegree" in node:
+            node_stats.append([node["inDegree"], node["outDegree"], node["hasMore"]])
+
+    types: List[str] = []
+    type_index: Dict[str, int] = {}
+    edge_rows = []
+    for edge in edges:
+        ttype = edge["transformationType"]
+        code = type_index.get(ttype)
+        if code is None:
+            code = type_index[ttype] = len(types)
+            types.append(ttype)
+        edge_rows.append([node_index[edge["source"]], node_index[edge["target"]], code])
+
+    graph = {
+        "format": "compact",
+        "datasets": datasets,
+        "nodes": node_rows,
+        "transformationTypes": types,
+        "edges": edge_rows,
+    }
+    if node_stats:
+        graph["nodeStats"] = node_stats
+    return graph
+
+
+def expand_compact_graph(graph: dict) -> dict:
+    """Decode a compact graph back into full-format nodes and edges."""
+    datasets = graph["datasets"]
+    stats = graph.get("nodeStats")
+    nodes = []
+    for i, row in enumerate(graph["nodes"]):
+        dataset = datasets[row[0]]
+        node = {
+            "id": f"{dataset['name']}.{row[1]}",
+            "type": "field",
+            "name": row[1],
+            "dataset": dataset,
+        }
+        if len(row) > 2:
+            node["metadata"] = {"columnType": row[2], "nullable": row[3]}
+        if stats:
+            node["inDegree"], node["outDegree"], node["hasMore"] = stats[i]
+        nodes.append(node)
+
+    types = graph["transformationTypes"]
+    edges = []
+    for source, target, code in graph["edges"]:
+        source_id, target_id = nodes[source]["id"], nodes[target]["id"]
+        edges.append({
+            "id": f"{source_id}->{target_id}",
+            "source": source_id,
+            "target": target_id,
+            "transformationType": types[code],
+        })
+    return {"nodes": nodes, "edges": edges}
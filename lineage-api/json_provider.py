@@ -0,0 +1,77 @@
+"""
+Fast JSON responses for the Lineage API.
+
+FastJSONProvider is a drop-in Flask JSON provider that encodes jsonify()
+responses with orjson when it is installed. Output is byte-for-byte identical
+to Flask's DefaultJSONProvider in compact mode (sorted keys, "," and ":"
+separators, ASCII-only, trailing newline); whenever orjson's output could
+differ, the response is encoded by the stdlib encoder instead:
+
+  - non-ASCII text (the stdlib escapes it as \\uXXXX)
+  - floats that the stdlib writes in exponent form (below 1e-4 or from 1e16)
+  - integers beyond 64 bits and types orjson rejects
+
+Values orjson does not handle natively (dates, Decimal, ...) go through
+Flask's default hook, so they serialize exactly as with jsonify. The API
+never emits non-finite floats, which orjson writes as null.
+"""
+
+import re
+from typing import Any, Optional
+
+from flask.json.provider import DefaultJSONProvider
+
+# Optional: orjson provides the fast path; without it every response uses the stdlib
+try:
+    import orjson
+    _ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                       | orjson.OPT_PASSTHROUGH_DATACLASS)
+except ImportError:
+    orjson = None
+    _ORJSON_OPTIONS = 0
+
+# Numbers orjson and the stdlib format differently: 1e16 vs 1e+16, 0.00001 vs 1e-05.
+# The pattern starts with a literal so the scan stays fast on large responses;
+# matches inside strings only cost a fallback to the stdlib encoder.
+_EXPONENT = re.compile(rb"e-?[0-9]")
+
+
+def _float_format_differs(data: bytes) -> bool:
+    """True if orjson output may contain a float the stdlib formats differently."""
+    if b"0.0000" in data:
+        return True
+    for match in _EXPONENT.finditer(data):
+        if data[match.start() - 1:match.start()].isdigit():
+            return True
+    return False
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes responses with orjson when output is identical."""
+
+    def dumps_bytes(self, obj: Any) -> Optional[bytes]:
+        """
+        Encode obj with orjson.
+
+        Returns:
+            Compact JSON bytes identical to the stdlib encoding, or None when
+            the stdlib encoder must be used
+        """
+        if orjson is None or not self.sort_keys or not self.ensure_ascii:
+            return None
+        try:
+            data = orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS)
+        except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+            return None
+        if not data.isascii() or _float_format_differs(data):
+            return None
+        return data
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)  # Indented output
+        obj = self._prepare_response_obj(args, kwargs)
+        data = self.dumps_bytes(obj)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,612 @@
+"""
+In-process lineage graph for the Lineage API.
+
+LineageGraph answers neighbor queries over active column lineage. Its base is
+an optional memory-mapped LineageSnapshot; edges added or deactivated since the
+snapshot was exported are held as in-process deltas on top of it. Without a
+snapshot the whole graph lives in the delta maps (loaded once from the database).
+
+LineageRefresher keeps a LineageGraph current by polling OL_COLUMN_LINEAGE:
+rows whose discovered_at is at or after its watermark are applied as deltas,
+and a change in the active edge count triggers a sweep of is_active = 'N' rows
+(or a full reload when rows were deleted). Every change bumps `version`, a
+per-process counter; `data_version` identifies the data itself (watermark and
+active edge count), so caches shared between processes key on it.
+
+Nodes are (dataset_name, field_name) tuples.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+
+class LineageGraph:
+    """Active column lineage: optional snapshot base plus in-process deltas."""
+
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot
+        self.edge_count = snapshot.edge_count if snapshot is not None else 0
+        self._lock = threading.Lock()
+        self._added_out = {}    # source -> {target: transformation_type}
+        self._added_in = {}     # target -> {source: transformation_type}
+        self._removed = set()   # (source, target) edges deactivated since the base
+        self._namespaces = {}   # dataset_name -> namespace_uri
+
+    @property
+    def delta_edges(self):
+        """Number of edges held in the delta maps."""
+        with self._lock:
+            return sum(len(targets) for targets in self._added_out.values()) + len(self._removed)
+
+    # -- lookups -------------------------------------------------------------
+
+    def resolve(self, dataset_name, field_name):
+        """Return the node key for a column (field matched case-insensitively), or None."""
+        key = (dataset_name, field_name)
+        with self._lock:
+            if key in self._added_out or key in self._added_in:
+                return key
+        if self.snapshot is not None:
+            node = self.snapshot.find_node(dataset_name, field_name)
+            if node >= 0:
+                _, dataset, field = self.snapshot.node_key(node)
+                return dataset, field
+        return None
+
+    def namespace(self, dataset_name):
+        """Return the namespace URI of a dataset ("" when unknown)."""
+        namespace = self._namespaces.get(dataset_name)
+        if namespace is None:
+            namespace = ""
+            if self.snapshot is not None:
+                ds = self.snapshot.find_dataset(dataset_name)
+                if ds >= 0:
+                    namespace = self.snapshot.dataset_namespace(ds)
+            self._namespaces[dataset_name] = namespace
+        return namespace
+
+    def successors(self, key):
+        """Return [(target, transformation_type)] for downstream edges of a column."""
+        return self._neighbors(key, forward=True)
+
+    def predecessors(self, key):
+        """Return [(source, transformation_type)] for upstream edges of a column."""
+        return self._neighbors(key, forward=False)
+
+    def _neighbors(self, key, forward):
+        neighbors = {}
+        snapshot = self.snapshot
+        if snapshot is not None:
+            node = snapshot.find_node(key[0], key[1], case_insensitive=False)
+            if node >= 0:
+                hops = snapshot.successors(node) if forward else snapshot.predecessors(node)
+                for other, edge in hops:
+                    _, dataset, field = snapshot.node_key(other)
+                    neighbors[(dataset, field)] = snapshot.edge_type(edge)
+        with self._lock:
+            added = self._added_out if forward else self._added_in
+            neighbors.update(added.get(key, ()))
+            if self._removed:
+                return [(other, ttype) for other, ttype in neighbors.items()
+                        if ((key, other) if forward else (other, key)) not in self._removed]
+        return list(neighbors.items())
+
+    def _in_base(self, source, target):
+        snapshot = self.snapshot
+        if snapshot is None:
+            return False
+        node = snapshot.find_node(source[0], source[1], case_insensitive=False)
+        if node < 0:
+            return False
+        for other, _ in snapshot.successors(node):
+            if snapshot.node_key(other)[1:] == target:
+                return True
+        return False
+
+    # -- deltas --------------------------------------------------------------
+
+    def apply(self, source_namespace, source, target_namespace, target,
+              transformation_type, active):
+        """
+        Apply one lineage row to the graph.
+
+        Returns:
+            True when the set of active edges changed
+        """
+        edge = (source, target)
+        in_base = self._in_base(source, target)
+        with self._lock:
+            present = edge not in self._removed and (
+                in_base or target in self._added_out.get(source, ()))
+            if active:
+                self._namespaces[source[0]] = source_namespace or ""
+                self._namespaces[target[0]] = target_namespace or ""
+                if present:
+                    return False
+                self._removed.discard(edge)
+                if not in_base:
+                    ttype = transformation_type or "DIRECT"
+                    self._added_out.setdefault(source, {})[target] = ttype
+                    self._added_in.setdefault(target, {})[source] = ttype
+                self.edge_count += 1
+                return True
+            if not present:
+                return False
+            self._removed.add(edge)
+            self.edge_count -= 1
+            return True
+
+
+def traverse_graph(graph, roots, direction, max_depth, progress=None):
+    """
+    Breadth-first lineage traversal over a LineageGraph.
+
+    Args:
+        graph: LineageGraph to traverse
+        roots: Iterable of (dataset_name, field_name) start columns
+        direction: "upstream", "downstream" or "any" (follow edges both ways)
+        max_depth: Maximum number of hops from a root
+        progress: Optional callable(depth, edge_count) called after each level
+
+    Returns:
+        List of (source_namespace, source_dataset, source_field, target_namespace,
+        target_dataset, target_field, transformation_type) rows, the same shape
+        as the recursive CTE queries return
+    """
+    depth = {}
+    for dataset_name, field_name in roots:
+        key = graph.resolve(dataset_name, field_name)
+        if key is not None:
+            depth[key] = 0
+
+    rows = []
+    seen_edges = set()
+    frontier = list(depth)
+    level = 0
+    while frontier and level < max_depth:
+        next_frontier = []
+        for key in frontier:
+            hops = []
+            if direction in ("downstream", "any"):
+                hops.extend((key, target, ttype, target) for target, ttype in graph.successors(key))
+            if direction in ("upstream", "any"):
+                hops.extend((source, key, ttype, source) for source, ttype in graph.predecessors(key))
+            for source, target, ttype, neighbor in hops:
+                if (source, target) not in seen_edges:
+                    seen_edges.add((source, target))
+                    rows.append((graph.namespace(source[0]), source[0], source[1],
+                                 graph.namespace(target[0]), target[0], target[1], ttype))
+                if neighbor not in depth:
+                    depth[neighbor] = level + 1
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+        level += 1
+        if progress is not None:
+            progress(level, len(rows))
+    return rows
+
+
+# Watermark used before any row has been seen
+_BEGINNING = datetime(1970, 1, 1)
+
+# Edge columns in CTE row order, and the refresher's columns in LineageGraph.apply order
+_EDGE_COLUMNS = """
+    TRIM(source_namespace), TRIM(source_dataset), TRIM(source_field),
+    TRIM(target_namespace), TRIM(target_dataset), TRIM(target_field),
+    TRIM(transformation_type)
+"""
+_LINEAGE_COLUMNS = _EDGE_COLUMNS + ", is_active, discovered_at"
+
+
+class GraphNeighbors:
+    """One-hop neighbor lookups over a LineageGraph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def resolve(self, columns):
+        """Map (dataset_name, field_name) pairs to node keys (unknown columns kept as given)."""
+        return [self.graph.resolve(*column) or column for column in columns]
+
+    def expand(self, keys, direction):
+        """
+        Return CTE-shaped rows for the edges adjacent to keys.
+
+        Args:
+            keys: Node keys to expand
+            direction: "upstream", "downstream" or "both"
+        """
+        rows, seen = [], set()
+        graph = self.graph
+        for key in keys:
+            hops = []
+            if direction in ("downstream", "both"):
+                hops.extend((key, target, ttype) for target, ttype in graph.successors(key))
+            if direction in ("upstream", "both"):
+                hops.extend((source, key, ttype) for source, ttype in graph.predecessors(key))
+            for source, target, ttype in hops:
+                if (source, target) not in seen:
+                    seen.add((source, target))
+                    rows.append((graph.namespace(source[0]), source[0], source[1],
+                                 graph.namespace(target[0]), target[0], target[1], ttype))
+        return rows
+
+    def degrees(self, keys):
+        """Return {key: (in_degree, out_degree)}."""
+        return {key: (len(self.graph.predecessors(key)), len(self.graph.successors(key)))
+                for key in keys}
+
+    def neighbor_datasets(self, key, direction, limit):
+        """Return the [(dataset_name, edge_count)] most connected to key, largest first."""
+        counts = {}
+        neighbors = []
+        if direction in ("downstream", "both"):
+            neighbors += self.graph.successors(key)
+        if direction in ("upstream", "both"):
+            neighbors += self.graph.predecessors(key)
+        for (dataset_name, _), _ in neighbors:
+            counts[dataset_name] = counts.get(dataset_name, 0) + 1
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+class SqlNeighbors:
+    """One-hop neighbor lookups with batched queries against OL_COLUMN_LINEAGE."""
+
+    def __init__(self, cursor, batch_size=100):
+        self.cursor = cursor
+        self.batch_size = batch_size
+
+    def resolve(self, columns):
+        """Columns are matched case-insensitively by the queries themselves."""
+        return list(columns)
+
+    def _batches(self, keys):
+        keys = list(keys)
+        for i in range(0, len(keys), self.batch_size):
+            batch = keys[i:i + self.batch_size]
+            yield batch, [value for key in batch for value in key]
+
+    def expand(self, keys, direction):
+        """Return CTE-shaped rows for the edges adjacent to keys (see GraphNeighbors.expand)."""
+        rows, seen = [], set()
+        for batch, params in self._batches(keys):
+            for side, side_direction in (("source", "downstream"), ("target", "upstream")):
+                if direction not in (side_direction, "both"):
+                    continue
+                match = " OR ".join(
+                    f"({side}_dataset = ? AND UPPER({side}_field) = UPPER(?))" for _ in batch)
+                self.cursor.execute(f"""
+                    SELECT {_EDGE_COLUMNS}
+                    FROM OL_COLUMN_LINEAGE
+                    WHERE is_active = 'Y' AND ({match})
+                """, params)
+                for row in self.cursor.fetchall():
+                    edge = (row[1], row[2], row[4], row[5])
+                    if edge not in seen:
+                        seen.add(edge)
+                        rows.append(tuple(row))
+        return rows
+
+    def degrees(self, keys):
+        """
+        Return {key: (in_degree, out_degree)} with one grouped query per batch.
+
+        Fields match case-insensitively, as in expand.
+        """
+        degrees = {key: (0, 0) for key in keys}
+        for batch, params in self._batches(degrees):
+            source_match = " OR ".join(
+                "(source_dataset = ? AND UPPER(source_field) = UPPER(?))" for _ in batch)
+            target_match = " OR ".join(
+                "(target_dataset = ? AND UPPER(target_field) = UPPER(?))" for _ in batch)
+            self.cursor.execute(f"""
+                SELECT TRIM(dataset_name), UPPER(TRIM(field_name)), SUM(in_edges), SUM(out_edges)
+                FROM (
+                    SELECT target_dataset AS dataset_name, target_field AS field_name,
+                           1 AS in_edges, 0 AS out_edges
+                    FROM OL_COLUMN_LINEAGE
+                    WHERE is_active = 'Y' AND ({target_match})
+                    UNION ALL
+                    SELECT source_dataset, source_field, 0, 1
+                    FROM OL_COLUMN_LINEAGE
+                    WHERE is_active = 'Y' AND ({source_match})
+                ) edges
+                GROUP BY 1, 2
+            """, params + params)
+            folded = {(row[0], row[1]): (int(row[2]), int(row[3]))
+                      for row in self.cursor.fetchall()}
+            for key in batch:
+                degrees[key] = folded.get(_fold(key), (0, 0))
+        return degrees
+
+    def neighbor_datasets(self, key, direction, limit):
+        """Return the [(dataset_name, edge_count)] most connected to key, largest first."""
+        counts = {}
+        for side, other, side_direction in (("source", "target", "downstream"),
+                                            ("target", "source", "upstream")):
+            if direction not in (side_direction, "both"):
+                continue
+            self.cursor.execute(f"""
+                SELECT TRIM({other}_dataset), COUNT(*)
+                FROM OL_COLUMN_LINEAGE
+                WHERE is_active = 'Y' AND {side}_dataset = ? AND UPPER({side}_field) = UPPER(?)
+                GROUP BY 1
+            """, list(key))
+            for dataset_name, count in self.cursor.fetchall():
+                counts[dataset_name] = counts.get(dataset_name, 0) + int(count)
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def _fold(key):
+    """Node identity for budget accounting (field names match case-insensitively)."""
+    return key[0], key[1].upper()
+
+
+# Result of budget_traverse. collapsed holds (node_key, direction, edge_count,
+# [(dataset_name, edge_count)]) for columns whose fan-out was summarized.
+Traversal = namedtuple("Traversal", "rows unexpanded truncated collapsed")
+
+
+def _fanout(degrees, direction):
+    in_degree, out_degree = degrees
+    if direction == "upstream":
+        return in_degree
+    if direction == "downstream":
+        return out_degree
+    return in_degree + out_degree
+
+
+def budget_traverse(neighbors, starts, max_depth, max_nodes=None, max_edges=None,
+                    collapse_above=None, expand=(), top_datasets=5, chunk_size=100,
+                    progress=None):
+    """
+    Breadth-first lineage traversal bounded by node/edge budgets and fan-out.
+
+    Frontier columns are expanded a chunk at a time through a neighbor source
+    (GraphNeighbors or SqlNeighbors), so no more than one chunk of neighbor
+    lookups is issued past the point where a budget runs out.
+
+    With collapse_above set, degrees are looked up before expanding: a column
+    with more edges than that in its direction is not expanded. It is reported
+    in `collapsed` with its edge count and top neighbor datasets instead,
+    unless it is listed in `expand`.
+
+    Args:
+        neighbors: GraphNeighbors or SqlNeighbors
+        starts: Iterable of (node_key, direction) pairs; direction is "upstream",
+            "downstream" or "both" and is inherited by every node reached
+        max_depth: Maximum number of hops from a start column
+        max_nodes: Maximum number of distinct columns (start columns included)
+        max_edges: Maximum number of edges
+        collapse_above: Fan-out above which a column is summarized, or None
+        expand: (dataset_name, field_name) columns never summarized
+        top_datasets: Number of neighbor datasets listed per summary
+        progress: Optional callable(depth, edge_count) called after each level
+
+    Returns:
+        Traversal: CTE-shaped rows as for traverse_graph; the (node_key,
+        direction) pairs left unexpanded when a budget was hit; "maxNodes",
+        "maxEdges" or None; and the summarized columns
+    """
+    expand = {_fold(key) for key in expand}
+    nodes, edges, rows, collapsed = set(), set(), [], []
+    visited, frontier = set(), []
+    for key, direction in starts:
+        nodes.add(_fold(key))
+        if (_fold(key), direction) not in visited:
+            visited.add((_fold(key), direction))
+            frontier.append((key, direction))
+
+    level = 0
+    while frontier and level < max_depth:
+        next_frontier = []
+        for start in range(0, len(frontier), chunk_size):
+            chunk = frontier[start:start + chunk_size]
+
+            # Summarize high fan-out columns instead of fetching their edges
+            summarized = set()
+            if collapse_above is not None:
+                candidates = [key for key, _ in chunk if _fold(key) not in expand]
+                degrees = neighbors.degrees(candidates) if candidates else {}
+                for key, direction in chunk:
+                    if key not in degrees:
+                        continue
+                    fanout = _fanout(degrees[key], direction)
+                    if fanout > collapse_above:
+                        summarized.add((key, direction))
+                        collapsed.append((key, direction, fanout, neighbors.neighbor_datasets(
+                            key, direction, top_datasets)))
+
+            # Neighbor rows of each chunk entry, keyed by (folded key, direction)
+            hops = {}
+            for direction in ("upstream", "downstream", "both"):
+                keys = [key for key, d in chunk if d == direction and (key, d) not in summarized]
+                if not keys:
+                    continue
+                wanted = {_fold(key) for key in keys}
+                for row in neighbors.expand(keys, direction):
+                    source, target = (row[1], row[2]), (row[4], row[5])
+                    if direction != "upstream" and _fold(source) in wanted:
+                        hops.setdefault((_fold(source), direction), []).append((row, target))
+                    if direction != "downstream" and _fold(target) in wanted:
+                        hops.setdefault((_fold(target), direction), []).append((row, source))
+
+            for i, (key, direction) in enumerate(chunk):
+                for row, neighbor in hops.get((_fold(key), direction), ()):
+                    edge = (_fold((row[1], row[2])), _fold((row[4], row[5])))
+                    if edge not in edges:
+                        truncated = None
+                        if max_edges is not None and len(edges) >= max_edges:
+                            truncated = "maxEdges"
+                        elif (max_nodes is not None and _fold(neighbor) not in nodes
+                              and len(nodes) >= max_nodes):
+                            truncated = "maxNodes"
+                        if truncated:
+                            unexpanded = frontier[start + i:]
+                            if level + 1 < max_depth:
+                                unexpanded += next_frontier
+                            return Traversal(rows, unexpanded, truncated, collapsed)
+                        edges.add(edge)
+                        nodes.add(_fold(neighbor))
+                        rows.append(row)
+                    state = (_fold(neighbor), direction)
+                    if state not in visited:
+                        visited.add(state)
+                        next_frontier.append((neighbor, direction))
+        frontier = next_frontier
+        level += 1
+        if progress is not None:
+            progress(level, len(rows))
+    return Traversal(rows, [], None, collapsed)
+
+
+class LineageRefresher:
+    """
+    Background thread that keeps a LineageGraph in step with OL_COLUMN_LINEAGE.
+
+    Args:
+        connect: Callable returning a new DB-API connection
+        get_snapshot: Callable returning the current LineageSnapshot (or None)
+        interval: Seconds between polls
+        batch_size: Rows fetched per round trip
+    """
+
+    def __init__(self, connect, get_snapshot, interval=30.0, batch_size=10000):
+        self.connect = connect
+        self.get_snapshot = get_snapshot
+        self.interval = interval
+        self.batch_size = batch_size
+        self.graph = None
+        self.version = 0
+        self.watermark = None        # newest discovered_at applied (datetime)
+        self.last_refresh = None     # epoch seconds of the last successful poll
+        self.last_error = None
+        self.refreshes = 0
+        self.full_loads = 0
+        self.rows_applied = 0
+        self._stale_snapshot = None  # snapshot known to predate deleted rows
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Start the polling thread once per process (safe to call per request)."""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="lineage-refresher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh_once()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: lineage refresh failed: {e}", file=sys.stderr)
+            time.sleep(self.interval)
+
+    @property
+    def data_version(self):
+        """
+        Identity of the lineage held by the graph (None before the first load).
+
+        Built from the data rather than counted, so processes that hold the
+        same lineage agree on it: the newest discovered_at applied and the
+        active edge count (deactivations and deletes keep the watermark).
+        """
+        graph = self.graph
+        if graph is None:
+            return None
+        watermark = self.watermark.isoformat() if self.watermark is not None else ""
+        return f"{watermark}/{graph.edge_count}"
+
+    def lag_seconds(self):
+        """Seconds since the last successful poll (None before the first)."""
+        if self.last_refresh is None:
+            return None
+        return time.time() - self.last_refresh
+
+    def refresh_once(self):
+        """Poll the database once and apply any changes to the graph."""
+        snapshot = self.get_snapshot()
+        if snapshot is not self._stale_snapshot:
+            self._stale_snapshot = None
+        base = None if self._stale_snapshot is not None else snapshot
+
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                graph = self.graph
+                if graph is None or graph.snapshot is not base:
+                    graph = self._load(cur, base)
+                changed = self._apply_rows(
+                    cur, graph,
+                    f"SELECT {_LINEAGE_COLUMNS} FROM OL_COLUMN_LINEAGE "
+                    f"WHERE discovered_at >= ? ORDER BY discovered_at",
+                    [self.watermark or _BEGINNING])
+
+                active = self._active_count(cur)
+                if active != graph.edge_count:
+                    # is_active flipped without a new discovered_at
+                    changed |= self._apply_rows(
+                        cur, graph,
+                        f"SELECT {_LINEAGE_COLUMNS} FROM OL_COLUMN_LINEAGE WHERE is_active <> 'Y'")
+                if active != graph.edge_count:
+                    # Rows were deleted: the deltas can't express that, reload
+                    print(f"Lineage graph has {graph.edge_count} edges, database has "
+                          f"{active}; reloading", file=sys.stderr)
+                    if base is not None:
+                        self._stale_snapshot = base
+                    graph = self._load(cur, None)
+
+        if changed or graph is not self.graph:
+            self.version += 1
+        self.graph = graph
+        self.refreshes += 1
+        self.last_refresh = time.time()
+        self.last_error = None
+        return changed
+
+    def _load(self, cur, snapshot):
+        """Build a fresh graph over a snapshot, or fully from the database."""
+        graph = LineageGraph(snapshot)
+        if snapshot is not None:
+            as_of = snapshot.max_discovered_at or snapshot.created_at
+            self.watermark = datetime.fromtimestamp(as_of)
+        else:
+            self.watermark = None
+            self._apply_rows(cur, graph,
+                             f"SELECT {_LINEAGE_COLUMNS} FROM OL_COLUMN_LINEAGE WHERE is_active = 'Y'")
+            self.full_loads += 1
+        return graph
+
+    def _apply_rows(self, cur, graph, sql, params=None):
+        """Stream lineage rows into the graph, advancing the watermark."""
+        if params:
+            cur.execute(sql, params)
+        else:
+            cur.execute(sql)
+        changed = False
+        while True:
+            rows = cur.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for row in rows:
+                changed |= graph.apply(row[0], (row[1], row[2]), row[3], (row[4], row[5]),
+                                       row[6], row[7] == "Y")
+                discovered_at = row[8]
+                if discovered_at is not None and (self.watermark is None or discovered_at > self.watermark):
+                    self.watermark = discovered_at
+            self.rows_applied += len(rows)
+        return changed
+
+    def _active_count(self, cur):
+        cur.execute("SELECT COUNT(*) FROM OL_COLUMN_LINEAGE WHERE is_active = 'Y'")
+        return cur.fetchone()[0]
@@ -0,0 +1,230 @@
+"""
+Background jobs for long-running lineage requests.
+
+A job runs a request handler on a bounded thread pool and stores its response
+body on disk with a TTL. Job state (status, progress, timestamps) lives next
+to the result as JSON, so any pre-forked worker can answer a status poll or
+serve the result, whichever worker ran the job.
+
+Job ids are derived from a request key (path, query and lineage version), so
+an identical request made while a job is queued, running or finished and not
+yet expired returns the existing job instead of starting another.
+
+Files in the job directory, per job id:
+    <id>.json    State
+    <id>.body    Response body of a finished job
+    <id>.lock    Owner pid while queued or running
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the pool's queue is full."""
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """Job state and results on disk, shared by all worker processes."""
+
+    def __init__(self, directory, ttl=3600.0):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def job_id(key):
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+    def _path(self, job_id, suffix):
+        return os.path.join(self.directory, f"{job_id}.{suffix}")
+
+    def _write(self, path, data):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def load(self, job_id):
+        """Return a job's state, or None if it is unknown or has expired."""
+        try:
+            with open(self._path(job_id, "json"), "rb") as f:
+                state = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if state.get("expiresAt") and state["expiresAt"] < time.time():
+            self.delete(job_id)
+            return None
+        return state
+
+    def save(self, state):
+        self._write(self._path(state["id"], "json"), json.dumps(state).encode("utf-8"))
+
+    def write_body(self, job_id, body):
+        self._write(self._path(job_id, "body"), body)
+
+    def read_body(self, job_id):
+        with open(self._path(job_id, "body"), "rb") as f:
+            return f.read()
+
+    def delete(self, job_id):
+        for suffix in ("json", "body"):
+            try:
+                os.remove(self._path(job_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def claim(self, job_id):
+        """Take ownership of a job id; False if a live process already owns it."""
+        path = self._path(job_id, "lock")
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(path) as f:
+                        owner = int(f.read() or 0)
+                except (OSError, ValueError):
+                    owner = 0
+                if owner and _pid_alive(owner):
+                    return False
+                # Owner died mid-job: take the lock over
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(str(os.getpid()))
+            return True
+        return False
+
+    def release(self, job_id):
+        try:
+            os.remove(self._path(job_id, "lock"))
+        except FileNotFoundError:
+            pass
+
+    def owner_alive(self, job_id):
+        try:
+            with open(self._path(job_id, "lock")) as f:
+                return _pid_alive(int(f.read() or 0))
+        except (OSError, ValueError):
+            return False
+
+    def sweep(self):
+        """Delete expired jobs. Returns the number removed."""
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and self.load(name[:-5]) is None:
+                removed += 1
+        return removed
+
+
+class JobProgress:
+    """Progress reporter handed to a running job; saves at most every `interval` seconds."""
+
+    def __init__(self, store, state, interval=0.5):
+        self.store = store
+        self.state = state
+        self.interval = interval
+        self._saved = 0.0
+
+    def update(self, **fields):
+        self.state["progress"].update(fields)
+        now = time.monotonic()
+        if now - self._saved >= self.interval:
+            self._saved = now
+            self.store.save(self.state)
+
+
+class JobRunner:
+    """Runs jobs on a bounded thread pool, reusing identical finished or running jobs."""
+
+    def __init__(self, store, max_workers=2, max_queued=16):
+        self.store = store
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, description=None):
+        """
+        Start fn(progress) as a job, or return the existing job for key.
+
+        fn returns (status_code, body_bytes). Raises JobQueueFull when
+        max_queued jobs are already waiting or running in this process.
+
+        Returns:
+            The job's state dict (see JobStore)
+        """
+        job_id = self.store.job_id(key)
+        state = self.store.load(job_id)
+        if state is not None:
+            if state["status"] == "done":
+                return state
+            if state["status"] in ("queued", "running") and self.store.owner_alive(job_id):
+                return state
+
+        with self._lock:
+            if self._pending >= self.max_queued:
+                raise JobQueueFull(f"{self._pending} lineage jobs already pending")
+            if not self.store.claim(job_id):
+                return self.store.load(job_id) or {"id": job_id, "status": "queued", "progress": {}}
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="lineage-job")
+
+        state = {
+            "id": job_id,
+            "description": description,
+            "status": "queued",
+            "progress": {},
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "expiresAt": None,
+            "statusCode": None,
+            "error": None,
+        }
+        self.store.save(state)
+        self._executor.submit(self._run, state, fn)
+        return state
+
+    def _run(self, state, fn):
+        store = self.store
+        try:
+            state["status"] = "running"
+            state["startedAt"] = time.time()
+            store.save(state)
+            status_code, body = fn(JobProgress(store, state))
+            store.write_body(state["id"], body)
+            state["status"] = "done"
+            state["statusCode"] = status_code
+        except Exception as e:
+            state["status"] = "failed"
+            state["error"] = str(e)
+        finally:
+            state["finishedAt"] = time.time()
+            state["expiresAt"] = state["finishedAt"] + store.ttl
+            store.save(state)
+            store.release(state["id"])
+            with self._lock:
+                self._pending -= 1
+            store.sweep()
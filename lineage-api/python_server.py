@@ -15,18 +15,88 @@ DATABASE Environment Variables:
     Legacy aliases (deprecated): TD_HOST, TD_USER, TD_PASSWORD, TD_DATABASE
 
 SERVER Environment Variables:
-    API_PORT - Server port (default: 8080)
-    PORT     - Legacy alias for API_PORT
+    API_PORT       - Server port (default: 8080)
+    PORT           - Legacy alias for API_PORT
+    API_ACCESS_LOG - Append a JSON-lines access log to this path (default: disabled)
+    API_WORKERS    - Number of pre-forked worker processes (default: 1)
+    API_JSON_ENCODER - "orjson" (default, used when installed) or "stdlib"
+    API_COMPRESS   - Compress responses per Accept-Encoding: on (default) or off
+    API_COMPRESS_MIN_BYTES - Smallest body to compress (default: 1024)
+    API_GZIP_LEVEL - gzip level 1-9, clamped (default: 6)
+    API_BROTLI_QUALITY - brotli quality 0-11, clamped (default: 5; needs the brotli package)
+
+LINEAGE GRAPH Environment Variables:
+    LINEAGE_SNAPSHOT - Path of a lineage snapshot written by
+                       database/scripts/populate/export_lineage_snapshot.py.
+                       When set, lineage traversals read the memory-mapped
+                       snapshot (shared by all workers) instead of running
+                       recursive CTEs. A re-exported file is picked up
+                       automatically.
+    LINEAGE_REFRESH_INTERVAL - Poll OL_COLUMN_LINEAGE every N seconds and apply
+                       new or deactivated edges to an in-process graph
+                       (default: 0, disabled). Works with or without a
+                       snapshot; progress is exposed at /metrics.
+    LINEAGE_VERSION_INTERVAL - Without a snapshot or refresher, seconds between
+                       reads of the lineage version (newest discovered_at
+                       and active edge count) that cache and job keys
+                       include (default: 5)
+    LINEAGE_COLLAPSE_THRESHOLD - Summarize columns with more than N edges in the
+                       traversal direction instead of expanding them
+                       (default: 0, disabled). Overridden per request by
+                       collapseAbove.
+
+LINEAGE JOB Environment Variables (async=true on database lineage):
+    LINEAGE_JOB_DIR     - Directory for job state and results, shared by all
+                          workers (default: <tmp>/lineage-jobs)
+    LINEAGE_JOB_TTL     - Seconds a finished job's result is kept (default: 3600)
+    LINEAGE_JOB_WORKERS - Concurrent jobs per worker process (default: 2)
+
+RESPONSE CACHE Environment Variables (lineage graph routes):
+    API_CACHE              - Cache computed lineage responses: on (default) or off
+    API_CACHE_PATH         - SQLite file shared by all workers and kept across
+                             restarts (default: <tmp>/lineage-api-cache.sqlite3;
+                             empty for memory only)
+    API_CACHE_MAX_BYTES    - Size bound of the SQLite cache (default: 536870912)
+    API_CACHE_MEMORY_BYTES - Size bound of the per-process cache (default: 67108864)
+    API_CACHE_TTL          - Seconds an entry is served (default: 600), whatever
+                             the lineage source
+    API_WARMUP_TOP_N       - Record requests to cached routes and warm the cache
+                             with the N most requested at startup (default: 0,
+                             disabled); /ready reports progress
+    API_WARMUP_KEYS_PATH   - SQLite file of request counts, shared by all workers
+                             (default: <tmp>/lineage-api-hot-keys.sqlite3)
+    API_WARMUP_SECONDS     - Time budget of the warm-up (default: 120)
+    API_WARMUP_CONCURRENCY - Responses computed at once during warm-up (default: 2)
 """
 
 import os
+import re
 import sys
 import json
+import atexit
+import functools
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
 from pathlib import Path
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 import teradatasql
 
+# Lineage snapshot reader lives with the exporter in database/scripts/populate
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "database" / "scripts" / "populate"))
+from export_lineage_snapshot import LineageSnapshot
+from lineage_graph import (GraphNeighbors, LineageGraph, LineageRefresher, SqlNeighbors,
+                           budget_traverse, traverse_graph)
+from json_provider import FastJSONProvider
+from compression import available_encodings, clamp_level, compress_response
+from graph_format import LINEAGE_FORMATS, encode_graph
+from lineage_jobs import JobQueueFull, JobRunner, JobStore
+from cache_warmup import CacheWarmer, HotKeys
+from response_cache import MemoryLRU, ResponseCache, SqliteLRU, decompress_body
+
 # Try to load .env file (python-dotenv is optional)
 try:
     from dotenv import load_dotenv
@@ -76,6 +146,10 @@ validate_required_credentials()
 
 
 app = Flask(__name__)
+# jsonify() encodes with orjson when installed (byte-identical output); set
+# API_JSON_ENCODER=stdlib to use Flask's default encoder
+if os.environ.get("API_JSON_ENCODER", "orjson").strip().lower() != "stdlib":
+    app.json = FastJSONProvider(app)
 CORS(app, origins=["http://localhost:3000", "http://localhost:3001", "http://localhost:3004", "http://localhost:5173"])
 
 # Database configuration - supports both TD_* (database scripts) and TERADATA_* (Go server) prefixes
@@ -98,12 +172,641 @@ def get_db_connection():
     )
 
 
+# ============================================================================
+# Request timing and access log
+# ============================================================================
+
+# Optional JSON-lines access log used by replay_access_log.py. Each line holds
+# one request: route template, path, query string, status, latency and size.
+ACCESS_LOG_PATH = os.environ.get("API_ACCESS_LOG", "").strip() or None
+_access_log_file = None
+_access_log_lock = threading.Lock()
+
+# Response compression: gzip, plus brotli when installed, negotiated through
+# Accept-Encoding for bodies of at least API_COMPRESS_MIN_BYTES; levels out
+# of range are clamped, since zlib and brotli reject them per response
+COMPRESS_ENCODINGS = (available_encodings()
+                      if os.environ.get("API_COMPRESS", "on").strip().lower() not in ("off", "0", "false")
+                      else [])
+COMPRESS_LEVELS = {
+    "gzip": clamp_level("gzip", int(os.environ.get("API_GZIP_LEVEL", "6") or 6)),
+    "br": clamp_level("br", int(os.environ.get("API_BROTLI_QUALITY", "5") or 5)),
+}
+COMPRESS_MIN_BYTES = max(0, int(os.environ.get("API_COMPRESS_MIN_BYTES", "1024") or 1024))
+
+
+def write_access_log(record):
+    """Append one record to the access log (no-op when logging is disabled)."""
+    global _access_log_file
+    if not ACCESS_LOG_PATH:
+        return
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    with _access_log_lock:
+        if _access_log_file is None:
+            _access_log_file = open(ACCESS_LOG_PATH, "a", buffering=1, encoding="utf-8")
+        _access_log_file.write(line)
+
+
+@app.before_request
+def start_request_timer():
+    """Record the request start time for latency instrumentation."""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_timing(response):
+    """Compress the response, expose timings via Server-Timing and write the access log."""
+    start = getattr(g, "request_start", None)
+    if start is None:
+        return response
+    if request.path.startswith("/api/"):
+        version = lineage_version()
+        if version is not None:
+            response.headers["X-Lineage-Version"] = version
+    if API_WARMUP_TOP_N > 0 and response.status_code == 200 and request.endpoint in CACHED_ENDPOINTS:
+        hot_keys.record(request.path, urlencode(sorted(request.args.items(multi=True))))
+
+    compression = compress_response(response, request.accept_encodings, COMPRESS_ENCODINGS,
+                                    COMPRESS_LEVELS, COMPRESS_MIN_BYTES)
+    latency_ms = (time.perf_counter() - start) * 1000
+    response.headers.add("Server-Timing", f"app;dur={latency_ms:.1f}")
+    if compression and not response.is_streamed:
+        response.headers.add("Server-Timing", compression.server_timing())
+
+    if ACCESS_LOG_PATH:
+        record = {
+            "ts": round(time.time(), 3),
+            "method": request.method,
+            "route": request.url_rule.rule if request.url_rule else None,
+            "path": request.path,
+            "query": request.query_string.decode("latin-1"),
+            "status": response.status_code,
+            "latencyMs": round(latency_ms, 2),
+            "bytes": None if response.is_streamed else response.calculate_content_length(),
+        }
+        if "cache_status" in g:
+            record["cache"] = g.cache_status
+        if compression and response.is_streamed:
+            # Sizes and compression time are known once the body has been sent
+            response.call_on_close(lambda: write_access_log({**record, **compression.log_fields()}))
+        else:
+            if compression:
+                record.update(compression.log_fields())
+            write_access_log(record)
+    return response
+
+
+# ============================================================================
+# Shared lineage snapshot
+# ============================================================================
+
+# Read-only, memory-mapped lineage graph shared by all worker processes through
+# the OS page cache. Re-exporting the snapshot atomically replaces the file;
+# workers notice the new inode and swap to it on their next request.
+LINEAGE_SNAPSHOT_PATH = os.environ.get("LINEAGE_SNAPSHOT", "").strip() or None
+SNAPSHOT_CHECK_INTERVAL = 1.0  # seconds between file change checks
+
+_snapshot_lock = threading.Lock()
+_snapshot = None
+_snapshot_identity = None
+_snapshot_checked_at = 0.0
+
+
+def get_lineage_snapshot():
+    """Return the current lineage snapshot, or None when not configured."""
+    global _snapshot, _snapshot_identity, _snapshot_checked_at
+    if not LINEAGE_SNAPSHOT_PATH:
+        return None
+
+    now = time.monotonic()
+    if _snapshot is not None and now - _snapshot_checked_at < SNAPSHOT_CHECK_INTERVAL:
+        return _snapshot
+
+    with _snapshot_lock:
+        _snapshot_checked_at = now
+        try:
+            st = os.stat(LINEAGE_SNAPSHOT_PATH)
+        except OSError:
+            return _snapshot  # Keep serving the last good snapshot
+        identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if identity != _snapshot_identity:
+            try:
+                # Requests still holding the old snapshot keep it mapped until
+                # they finish; it is unmapped when the last reference goes away.
+                _snapshot = LineageSnapshot(LINEAGE_SNAPSHOT_PATH)
+                _snapshot_identity = identity
+                print(f"Loaded lineage snapshot: {_snapshot.node_count} columns, "
+                      f"{_snapshot.edge_count} edges")
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not load lineage snapshot: {e}", file=sys.stderr)
+    return _snapshot
+
+
+# Optional background refresh of an in-process lineage graph. Each worker
+# polls OL_COLUMN_LINEAGE for rows discovered since its watermark and applies
+# them as deltas over the snapshot (or over a full load when no snapshot is
+# configured), so lineage stays current after populate runs without a re-export.
+LINEAGE_REFRESH_INTERVAL = float(os.environ.get("LINEAGE_REFRESH_INTERVAL", "0") or 0)
+
+lineage_refresher = LineageRefresher(get_db_connection, get_lineage_snapshot,
+                                     interval=LINEAGE_REFRESH_INTERVAL)
+_static_graph = None
+
+# Default fan-out above which lineage traversals summarize a column (0 disables)
+LINEAGE_COLLAPSE_THRESHOLD = int(os.environ.get("LINEAGE_COLLAPSE_THRESHOLD", "0") or 0)
+
+# Background jobs for long-running lineage requests (async=true). State and
+# results are files, so a job started by one worker can be polled on another.
+lineage_jobs = JobRunner(
+    JobStore(os.environ.get("LINEAGE_JOB_DIR") or os.path.join(tempfile.gettempdir(), "lineage-jobs"),
+             ttl=float(os.environ.get("LINEAGE_JOB_TTL", "3600") or 3600)),
+    max_workers=int(os.environ.get("LINEAGE_JOB_WORKERS", "2") or 2))
+
+# Second-level cache of computed lineage responses: a per-process LRU in front
+# of a SQLite file shared by all workers, so a graph computed by one worker (or
+# before a restart) is served by the others. Keys include lineage_version().
+API_CACHE_ENABLED = os.environ.get("API_CACHE", "on").strip().lower() not in ("off", "0", "false")
+_cache_path = os.environ.get("API_CACHE_PATH",
+                             os.path.join(tempfile.gettempdir(), "lineage-api-cache.sqlite3")).strip()
+response_cache = ResponseCache(
+    MemoryLRU(int(os.environ.get("API_CACHE_MEMORY_BYTES", "67108864") or 67108864)),
+    SqliteLRU(_cache_path, int(os.environ.get("API_CACHE_MAX_BYTES", "536870912") or 536870912))
+    if _cache_path else None,
+    ttl=float(os.environ.get("API_CACHE_TTL", "600") or 600))
+
+
+def get_lineage_graph():
+    """Return the in-process lineage graph, or None when traversals should use SQL."""
+    global _static_graph
+    if LINEAGE_REFRESH_INTERVAL > 0:
+        lineage_refresher.start()
+        if lineage_refresher.graph is not None:
+            return lineage_refresher.graph
+
+    # No refresher (or its first load is still running): serve the snapshot as is
+    snapshot = get_lineage_snapshot()
+    if snapshot is None:
+        return None
+    graph = _static_graph
+    if graph is None or graph.snapshot is not snapshot:
+        graph = _static_graph = LineageGraph(snapshot)
+    return graph
+
+
+# Without a snapshot or refresher, lineage is read from the database on each
+# request. Its version is the newest discovered_at and the active edge count
+# of OL_COLUMN_LINEAGE, read at most every LINEAGE_VERSION_INTERVAL seconds
+# per worker, so cached responses and jobs follow populate runs, clears and
+# deactivations within that interval.
+LINEAGE_VERSION_INTERVAL = float(os.environ.get("LINEAGE_VERSION_INTERVAL", "5") or 5)
+
+_db_version_lock = threading.Lock()
+_db_version = None
+_db_version_checked_at = None
+
+
+def database_lineage_version():
+    """Version of the lineage in OL_COLUMN_LINEAGE, or None if it cannot be read."""
+    global _db_version, _db_version_checked_at
+    checked_at = _db_version_checked_at
+    if checked_at is not None and time.monotonic() - checked_at < LINEAGE_VERSION_INTERVAL:
+        return _db_version
+
+    with _db_version_lock:
+        if (_db_version_checked_at is not None
+                and time.monotonic() - _db_version_checked_at < LINEAGE_VERSION_INTERVAL):
+            return _db_version
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT MAX(discovered_at), COUNT(*)
+                        FROM OL_COLUMN_LINEAGE
+                        WHERE is_active = 'Y'
+                    """)
+                    latest, count = cur.fetchone()
+            _db_version = f"db{latest.isoformat() if latest else ''}/{count}"
+        except Exception as e:
+            print(f"Warning: could not read the lineage version: {e}", file=sys.stderr)
+            _db_version = None
+        _db_version_checked_at = time.monotonic()
+    return _db_version
+
+
+def lineage_version():
+    """
+    Version of the lineage data served, for cache and job keys.
+
+    None when the database version cannot be read; responses are then
+    neither cached nor shared between jobs.
+    """
+    if LINEAGE_REFRESH_INTERVAL > 0 and lineage_refresher.graph is not None:
+        return f"r{lineage_refresher.data_version}"
+    snapshot = get_lineage_snapshot()
+    if snapshot is not None:
+        return f"s{_snapshot_identity[1]}"
+    return database_lineage_version()
+
+
+# Endpoints wrapped by cache_response; their requests are counted for warm-up
+CACHED_ENDPOINTS = set()
+
+
+def cache_response(view):
+    """
+    Serve a lineage route from the response cache, storing successful results.
+
+    Only 200 JSON bodies are cached. Stored bodies are compressed; clients
+    that accept the stored coding get the bytes as is, others get them
+    decompressed. The outcome is reported in X-Cache.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        version = lineage_version() if API_CACHE_ENABLED else None
+        if version is None:
+            return view(*args, **kwargs)
+        key = json.dumps([version, request.path,
+                          sorted(request.args.items(multi=True))])
+        entry, tier = response_cache.get(key)
+        if entry is None:
+            g.cache_status = "miss"
+            response = app.make_response(view(*args, **kwargs))
+            if (response.status_code == 200 and not response.is_streamed
+                    and response.mimetype == "application/json"):
+                response_cache.put(key, response.get_data())
+            response.headers["X-Cache"] = "miss"
+            return response
+
+        g.cache_status = f"hit-{tier}"
+        encoding, body = entry[0], entry[1]
+        if encoding in COMPRESS_ENCODINGS and request.accept_encodings.quality(encoding) > 0:
+            response = app.response_class(body, mimetype="application/json")
+            response.headers["Content-Encoding"] = encoding
+            response.vary.add("Accept-Encoding")
+        else:
+            response = app.response_class(decompress_body(body, encoding), mimetype="application/json")
+        response.headers["X-Cache"] = g.cache_status
+        return response
+
+    CACHED_ENDPOINTS.add(view.__name__)
+    return wrapper
+
+
+def warm_request(path, query_string):
+    """Compute (and so cache) the response for a recorded request; returns its status."""
+    endpoint, view_args = app.url_map.bind("localhost").match(path, method="GET")
+    with app.test_request_context(path, query_string=query_string):
+        return app.make_response(app.view_functions[endpoint](**view_args)).status_code
+
+
+# Startup warm-up: successful requests to cached routes are counted in a
+# shared SQLite file, and each worker computes the most requested ones in the
+# background when it starts, within a time and concurrency budget.
+API_WARMUP_TOP_N = int(os.environ.get("API_WARMUP_TOP_N", "0") or 0) if API_CACHE_ENABLED else 0
+hot_keys = HotKeys(os.environ.get("API_WARMUP_KEYS_PATH")
+                   or os.path.join(tempfile.gettempdir(), "lineage-api-hot-keys.sqlite3"))
+cache_warmer = CacheWarmer(hot_keys, warm_request, API_WARMUP_TOP_N,
+                           budget_seconds=float(os.environ.get("API_WARMUP_SECONDS", "120") or 120),
+                           concurrency=int(os.environ.get("API_WARMUP_CONCURRENCY", "2") or 2))
+if API_WARMUP_TOP_N > 0:
+    atexit.register(hot_keys.flush)
+
+
+def add_lineage_rows(nodes, edges, rows):
+    """
+    Add lineage rows (CTE or snapshot shaped) to node and edge maps keyed by id.
+
+    Rows must already be trimmed: the CTE queries TRIM in SQL and the snapshot
+    stores trimmed strings.
+    """
+    for row in rows:
+        source_key = f"{row[1]}.{row[2]}"
+        target_key = f"{row[4]}.{row[5]}"
+
+        # Add source node
+        if source_key not in nodes:
+            nodes[source_key] = {
+                "id": source_key,
+                "type": "field",
+                "name": row[2] or "",
+                "dataset": {
+                    "name": row[1] or "",
+                    "namespace": row[0] or ""
+                }
+            }
+
+        # Add target node
+        if target_key not in nodes:
+            nodes[target_key] = {
+                "id": target_key,
+                "type": "field",
+                "name": row[5] or "",
+                "dataset": {
+                    "name": row[4] or "",
+                    "namespace": row[3] or ""
+                }
+            }
+
+        # Add edge
+        edge_id = f"{source_key}->{target_key}"
+        if edge_id not in edges:
+            edges[edge_id] = {
+                "id": edge_id,
+                "source": source_key,
+                "target": target_key,
+                "transformationType": row[6] or "DIRECT"
+            }
+
+
+def get_traversal_limits():
+    """
+    Parse the optional traversal limits of a lineage request.
+
+    Query parameters:
+        maxNodes, maxEdges: Budgets for a breadth-first traversal
+        collapseAbove: Fan-out above which a column is summarized
+            (default: LINEAGE_COLLAPSE_THRESHOLD; 0 disables)
+        expand: Column id (datasetName.fieldName) never summarized; repeatable
+
+    Returns:
+        Dict with maxNodes, maxEdges and collapseAbove (each None when unset)
+        and expand, or None when no limit applies
+
+    Raises:
+        ValueError: if a limit is not a positive integer
+    """
+    limits = {}
+    for name in ("maxNodes", "maxEdges", "collapseAbove"):
+        value = request.args.get(name)
+        if value is None:
+            limits[name] = None
+            continue
+        try:
+            limits[name] = int(value)
+        except ValueError:
+            limits[name] = -1
+        if name == "collapseAbove" and limits[name] < 0:
+            raise ValueError("collapseAbove must be a non-negative integer")
+        if name != "collapseAbove" and limits[name] < 1:
+            raise ValueError(f"{name} must be a positive integer")
+
+    if limits["collapseAbove"] is None:
+        limits["collapseAbove"] = LINEAGE_COLLAPSE_THRESHOLD
+    limits["collapseAbove"] = limits["collapseAbove"] or None
+    limits["expand"] = [tuple(column_id.rpartition(".")[::2])
+                        for column_id in request.args.getlist("expand")]
+
+    if limits["maxNodes"] is None and limits["maxEdges"] is None and limits["collapseAbove"] is None:
+        return None
+    return limits
+
+
+def report_job_progress(**fields):
+    """Record progress (phase, depth, nodes, edges, ...) when running as a background job."""
+    progress = g.get("job_progress")
+    if progress is not None:
+        progress.update(**fields)
+
+
+def report_traversal_progress(depth, edge_count):
+    """Progress callback for lineage traversals."""
+    report_job_progress(phase="lineage", depth=depth, edges=edge_count)
+
+
+def bounded_lineage(cur, graph, starts, max_depth, limits):
+    """
+    Run a bounded breadth-first traversal from (dataset_name, field_name, direction) starts.
+
+    Uses the in-process graph when available, otherwise batched one-hop
+    queries on cur. The start columns themselves are never collapsed.
+
+    Returns:
+        (rows, members): CTE-shaped lineage rows, and response members to add:
+        "budget" (whether a budget was hit and which columns were left
+        unexpanded) when a budget was given, and "collapsed" (summarized
+        high fan-out columns) when collapsing is enabled
+    """
+    neighbors = GraphNeighbors(graph) if graph is not None else SqlNeighbors(cur)
+    keys = neighbors.resolve([(dataset_name, field_name) for dataset_name, field_name, _ in starts])
+    traversal = budget_traverse(
+        neighbors, [(key, start[2]) for key, start in zip(keys, starts)], max_depth,
+        max_nodes=limits["maxNodes"], max_edges=limits["maxEdges"],
+        collapse_above=limits["collapseAbove"],
+        expand=limits["expand"] + [(dataset_name, field_name) for dataset_name, field_name, _ in starts],
+        progress=report_traversal_progress)
+
+    members = {}
+    if limits["maxNodes"] is not None or limits["maxEdges"] is not None:
+        members["budget"] = {
+            "maxNodes": limits["maxNodes"],
+            "maxEdges": limits["maxEdges"],
+            "truncated": traversal.truncated,
+            "unexpanded": [{"nodeId": f"{key[0]}.{key[1]}", "direction": direction}
+                           for key, direction in traversal.unexpanded],
+        }
+    if limits["collapseAbove"] is not None:
+        members["collapsed"] = [
+            {
+                "nodeId": f"{key[0]}.{key[1]}",
+                "direction": direction,
+                "edgeCount": edge_count,
+                "topDatasets": [{"name": name, "edgeCount": count} for name, count in datasets],
+            }
+            for key, direction, edge_count, datasets in traversal.collapsed
+        ]
+    return traversal.rows, members
+
+
+def query_rollup_lineage(cur, zoom, scope, direction, pattern=False):
+    """
+    Fetch dataset- or database-level lineage adjacent to a scope in one query.
+
+    Reads the rollup tables maintained by populate_lineage.py, or aggregates
+    OL_COLUMN_LINEAGE on the fly when they have not been created yet.
+
+    Args:
+        zoom: "dataset" or "database"
+        scope: Dataset or database name whose lineage is returned
+        direction: upstream (edges into scope), downstream (edges out of
+            scope) or both
+        pattern: Match scope as a SQL LIKE pattern instead of exactly
+
+    Returns:
+        List of (source_namespace, source, target_namespace, target,
+        transformation_type, edge_count); namespaces are None for databases
+
+    Raises:
+        ValueError: if direction is not upstream, downstream or both
+    """
+    if zoom == "dataset":
+        source, target = "source_dataset", "target_dataset"
+        rollup = """
+            SELECT TRIM(source_namespace), TRIM(source_dataset), TRIM(target_namespace),
+                   TRIM(target_dataset), TRIM(transformation_type), edge_count
+            FROM OL_DATASET_LINEAGE
+            WHERE {condition}
+        """
+        live = """
+            SELECT MAX(TRIM(source_namespace)), TRIM(source_dataset), MAX(TRIM(target_namespace)),
+                   TRIM(target_dataset), COALESCE(TRIM(transformation_type), 'DIRECT'), COUNT(*)
+            FROM OL_COLUMN_LINEAGE
+            WHERE is_active = 'Y' AND ({condition})
+            GROUP BY 2, 4, 5
+        """
+    else:
+        source, target = "source_database", "target_database"
+        rollup = """
+            SELECT NULL, TRIM(source_database), NULL, TRIM(target_database),
+                   TRIM(transformation_type), edge_count
+            FROM OL_DATABASE_LINEAGE
+            WHERE {condition}
+        """
+        live = """
+            SELECT NULL, source_database, NULL, target_database, transformation_type, COUNT(*)
+            FROM (
+                SELECT STRTOK(source_dataset, '.', 1) AS source_database,
+                       STRTOK(target_dataset, '.', 1) AS target_database,
+                       COALESCE(TRIM(transformation_type), 'DIRECT') AS transformation_type
+                FROM OL_COLUMN_LINEAGE
+                WHERE is_active = 'Y'
+            ) cl
+            WHERE {condition}
+            GROUP BY 2, 4, 5
+        """
+
+    if direction not in ("upstream", "downstream", "both"):
+        raise ValueError("direction must be 'upstream', 'downstream' or 'both'")
+    match = "LIKE ?" if pattern else "= ?"
+    sides = []
+    if direction in ("downstream", "both"):
+        sides.append(f"{source} {match}")
+    if direction in ("upstream", "both"):
+        sides.append(f"{target} {match}")
+    condition = " OR ".join(sides)
+    params = [scope] * len(sides)
+
+    try:
+        cur.execute(rollup.format(condition=condition), params)
+    except teradatasql.DatabaseError as e:
+        if "3807" not in str(e):  # Rollup table does not exist
+            raise
+        cur.execute(live.format(condition=condition), params)
+    return cur.fetchall()
+
+
+def add_rollup_rows(nodes, edges, rows, node_type):
+    """
+    Add rollup rows (see query_rollup_lineage) to node and edge maps keyed by id.
+
+    Edges carry edgeCount (column edges between the pair) and
+    transformationTypes ({type: column edge count}).
+    """
+    for source_namespace, source, target_namespace, target, ttype, count in rows:
+        for name, namespace in ((source, source_namespace), (target, target_namespace)):
+            if name not in nodes:
+                node = {"id": name, "type": node_type, "name": name}
+                if namespace is not None:
+                    node["namespace"] = namespace
+                nodes[name] = node
+
+        edge_id = f"{source}->{target}"
+        edge = edges.get(edge_id)
+        if edge is None:
+            edge = edges[edge_id] = {
+                "id": edge_id,
+                "source": source,
+                "target": target,
+                "edgeCount": 0,
+                "transformationTypes": {}
+            }
+        edge["edgeCount"] += int(count)
+        ttype = ttype or "DIRECT"
+        edge["transformationTypes"][ttype] = edge["transformationTypes"].get(ttype, 0) + int(count)
+
+
+def get_zoom(levels):
+    """
+    Parse the zoom query parameter (default: column).
+
+    Raises:
+        ValueError: if zoom is not one of levels, is combined with
+            format=compact, or a rollup zoom has an unknown direction
+    """
+    zoom = request.args.get("zoom", "column")
+    if zoom not in levels:
+        raise ValueError("zoom must be " + " or ".join(f"'{level}'" for level in levels))
+    if zoom != "column" and request.args.get("format", "full") != "full":
+        raise ValueError("format=compact is only available at zoom=column")
+    if zoom != "column" and request.args.get("direction", "both") not in ("upstream", "downstream", "both"):
+        raise ValueError("direction must be 'upstream', 'downstream' or 'both'")
+    return zoom
+
+
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint."""
     return jsonify({"status": "ok"})
 
 
+@app.route("/ready", methods=["GET"])
+def ready():
+    """
+    Readiness check: 503 while the startup cache warm-up is running, then 200.
+
+    A warm-up that runs out of its time budget still reports ready.
+    """
+    cache_warmer.start()
+    body = {"status": "ready" if cache_warmer.ready else "warming", "warmup": cache_warmer.status()}
+    return jsonify(body), 200 if cache_warmer.ready else 503
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus-style metrics for the in-process lineage graph."""
+    lines = []
+
+    def metric(name, value, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+        lines.append(f"{name} {value}")
+
+    refresher = lineage_refresher
+    graph = refresher.graph
+    metric("lineage_refresh_enabled", int(LINEAGE_REFRESH_INTERVAL > 0),
+           "Whether the background lineage refresher is enabled")
+    if LINEAGE_REFRESH_INTERVAL > 0:
+        lag = refresher.lag_seconds()
+        metric("lineage_graph_version", refresher.version,
+               "Version of the in-process lineage graph, bumped on every change")
+        metric("lineage_refresh_lag_seconds", f"{lag:.3f}" if lag is not None else "NaN",
+               "Seconds since the last successful refresh")
+        metric("lineage_refresh_watermark_timestamp",
+               f"{refresher.watermark.timestamp():.0f}" if refresher.watermark else "NaN",
+               "Newest discovered_at applied to the graph (epoch seconds)")
+        metric("lineage_refresh_total", refresher.refreshes, "Successful refresh polls")
+        metric("lineage_refresh_full_loads_total", refresher.full_loads,
+               "Full reloads of the graph from the database")
+        metric("lineage_refresh_rows_total", refresher.rows_applied,
+               "Lineage rows read by the refresher")
+        metric("lineage_refresh_failing", int(refresher.last_error is not None),
+               "Whether the most recent refresh failed")
+        if graph is not None:
+            metric("lineage_graph_edges", graph.edge_count, "Active edges in the graph")
+            metric("lineage_graph_delta_edges", graph.delta_edges,
+                   "Edges held as in-process deltas over the snapshot")
+    metric("api_cache_enabled", int(API_CACHE_ENABLED), "Whether lineage responses are cached")
+    if API_CACHE_ENABLED:
+        cache = response_cache
+        metric("api_cache_hits_memory_total", cache.hits["memory"],
+               "Lineage responses served from the per-process cache")
+        metric("api_cache_hits_disk_total", cache.hits["disk"],
+               "Lineage responses served from the shared SQLite cache")
+        metric("api_cache_misses_total", cache.misses, "Lineage responses computed")
+        metric("api_cache_errors_total", cache.errors, "Failed SQLite cache operations")
+        metric("api_cache_memory_bytes", cache.memory.size, "Bytes held by the per-process cache")
+    return app.response_class("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
 
 # ============================================================================
 # API v2 - OpenLineage Aligned Routes
@@ -117,10 +820,10 @@ def list_namespaces():
             with conn.cursor() as cur:
                 cur.execute("""
                     SELECT
-                        namespace_id,
-                        namespace_uri,
-                        description,
-                        spec_version,
+                        TRIM(namespace_id),
+                        TRIM(namespace_uri),
+                        TRIM(description),
+                        TRIM(spec_version),
                         created_at
                     FROM OL_NAMESPACE
                     ORDER BY namespace_uri
@@ -128,10 +831,10 @@ def list_namespaces():
                 rows = cur.fetchall()
                 namespaces = [
                     {
-                        "id": row[0].strip() if row[0] else "",
-                        "uri": row[1].strip() if row[1] else "",
-                        "description": row[2].strip() if row[2] else "",
-                        "specVersion": row[3].strip() if row[3] else "2-0-2",
+                        "id": row[0] or "",
+                        "uri": row[1] or "",
+                        "description": row[2] or "",
+                        "specVersion": row[3] or "2-0-2",
                         "createdAt": row[4].isoformat() if row[4] else None
                     }
                     for row in rows
@@ -151,10 +854,10 @@ def get_namespace(namespace_id):
             with conn.cursor() as cur:
                 cur.execute("""
                     SELECT
-                        namespace_id,
-                        namespace_uri,
-                        description,
-                        spec_version,
+                        TRIM(namespace_id),
+                        TRIM(namespace_uri),
+                        TRIM(description),
+                        TRIM(spec_version),
                         created_at
                     FROM OL_NAMESPACE
                     WHERE namespace_id = ?
@@ -164,10 +867,10 @@ def get_namespace(namespace_id):
                     return jsonify({"error": "Namespace not found"}), 404
 
                 namespace = {
-                    "id": row[0].strip() if row[0] else "",
-                    "uri": row[1].strip() if row[1] else "",
-                    "description": row[2].strip() if row[2] else "",
-                    "specVersion": row[3].strip() if row[3] else "2-0-2",
+                    "id": row[0] or "",
+                    "uri": row[1] or "",
+                    "description": row[2] or "",
+                    "specVersion": row[3] or "2-0-2",
                     "createdAt": row[4].isoformat() if row[4] else None
                 }
         return jsonify(namespace)
@@ -200,12 +903,12 @@ def list_datasets(namespace_id):
                            description, source_type, created_at, updated_at
                     FROM (
                         SELECT
-                            d.dataset_id,
-                            d."name" as dataset_name,
+                            TRIM(d.dataset_id) AS dataset_id,
+                            TRIM(d."name") as dataset_name,
                             d.namespace_id,
-                            n.namespace_uri,
-                            d.description,
-                            d.source_type,
+                            TRIM(n.namespace_uri) AS namespace_uri,
+                            TRIM(d.description) AS description,
+                            TRIM(d.source_type) AS source_type,
                             d.created_at,
                             d.updated_at,
                             ROW_NUMBER() OVER (ORDER BY d."name") as rn
@@ -219,11 +922,11 @@ def list_datasets(namespace_id):
                 rows = cur.fetchall()
                 datasets = [
                     {
-                        "id": row[0].strip() if row[0] else "",
-                        "name": row[1].strip() if row[1] else "",
-                        "namespace": row[3].strip() if row[3] else "",  # namespace_uri
-                        "description": row[4].strip() if row[4] else "",
-                        "sourceType": row[5].strip() if row[5] else None,
+                        "id": row[0] or "",
+                        "name": row[1] or "",
+                        "namespace": row[3] or "",  # namespace_uri
+                        "description": row[4] or "",
+                        "sourceType": row[5] or None,
                         "createdAt": row[6].isoformat() if row[6] else None,
                         "updatedAt": row[7].isoformat() if row[7] else None
                     }
@@ -244,6 +947,15 @@ def list_datasets(namespace_id):
         return jsonify({"error": str(e)}), 500
 
 
+# JSON keys for OL_FIELD_LINEAGE_STATS columns, in table order
+LINEAGE_STAT_KEYS = (
+    "inDegree", "outDegree",
+    "upstreamColumns", "downstreamColumns",
+    "upstreamTables", "downstreamTables",
+    "upstreamDatabases", "downstreamDatabases",
+)
+
+
 @app.route("/api/v2/openlineage/datasets/<path:dataset_id>", methods=["GET"])
 def get_dataset(dataset_id):
     """Get a specific dataset with its fields."""
@@ -253,12 +965,12 @@ def get_dataset(dataset_id):
                 # Get dataset
                 cur.execute("""
                     SELECT
-                        d.dataset_id,
-                        d."name",
+                        TRIM(d.dataset_id),
+                        TRIM(d."name"),
                         d.namespace_id,
-                        n.namespace_uri,
-                        d.description,
-                        d.source_type,
+                        TRIM(n.namespace_uri),
+                        TRIM(d.description),
+                        TRIM(d.source_type),
                         d.created_at,
                         d.updated_at
                     FROM OL_DATASET d
@@ -271,11 +983,11 @@ def get_dataset(dataset_id):
                     return jsonify({"error": "Dataset not found"}), 404
 
                 dataset = {
-                    "id": row[0].strip() if row[0] else "",
-                    "name": row[1].strip() if row[1] else "",
-                    "namespace": row[3].strip() if row[3] else "",  # namespace_uri
-                    "description": row[4].strip() if row[4] else "",
-                    "sourceType": row[5].strip() if row[5] else None,
+                    "id": row[0] or "",
+                    "name": row[1] or "",
+                    "namespace": row[3] or "",  # namespace_uri
+                    "description": row[4] or "",
+                    "sourceType": row[5] or None,
                     "createdAt": row[6].isoformat() if row[6] else None,
                     "updatedAt": row[7].isoformat() if row[7] else None
                 }
@@ -283,12 +995,12 @@ def get_dataset(dataset_id):
                 # Get fields
                 cur.execute("""
                     SELECT
-                        field_id,
-                        field_name,
-                        field_type,
-                        field_description,
+                        TRIM(field_id),
+                        TRIM(field_name),
+                        TRIM(field_type),
+                        TRIM(field_description),
                         ordinal_position,
-                        nullable
+                        TRIM(nullable)
                     FROM OL_DATASET_FIELD
                     WHERE dataset_id = ?
                     ORDER BY ordinal_position, field_name
@@ -296,16 +1008,42 @@ def get_dataset(dataset_id):
 
                 fields = [
                     {
-                        "id": row[0].strip() if row[0] else "",
-                        "name": row[1].strip() if row[1] else "",
-                        "type": row[2].strip() if row[2] else None,
-                        "description": row[3].strip() if row[3] else None,
+                        "id": row[0] or "",
+                        "name": row[1] or "",
+                        "type": row[2] or None,
+                        "description": row[3] or None,
                         "ordinalPosition": row[4] if row[4] is not None else 0,
                         "nullable": row[5] == 'Y' if row[5] else True
                     }
                     for row in cur.fetchall()
                 ]
 
+                # Precomputed degree/reach counts (may be absent on older schemas)
+                lineage_stats = None
+                try:
+                    cur.execute("""
+                        SELECT
+                            TRIM(field_name),
+                            in_degree,
+                            out_degree,
+                            upstream_columns,
+                            downstream_columns,
+                            upstream_tables,
+                            downstream_tables,
+                            upstream_databases,
+                            downstream_databases
+                        FROM OL_FIELD_LINEAGE_STATS
+                        WHERE dataset_name = ?
+                    """, [dataset["name"]])
+                    lineage_stats = {row[0].upper(): row[1:] for row in cur.fetchall()}
+                except Exception:
+                    pass  # Stats table not created yet, leave lineageStats null
+
+                if lineage_stats is not None:
+                    for field in fields:
+                        counts = lineage_stats.get(field["name"].upper(), (0,) * 8)
+                        field["lineageStats"] = dict(zip(LINEAGE_STAT_KEYS, counts))
+
                 dataset["fields"] = fields
 
         return jsonify(dataset)
@@ -533,8 +1271,8 @@ def get_dataset_ddl(dataset_id):
                         ORDER BY ColumnId
                     """, [db_name, table_name])
                     for row in cur.fetchall():
-                        col_name = row[0].strip() if row[0] else ""
-                        col_comment = row[1].strip() if row[1] else ""
+                        col_name = row[0] or ""
+                        col_comment = row[1] or ""
                         if col_name and col_comment:
                             result["columnComments"][col_name] = col_comment
                 except Exception:
@@ -563,12 +1301,12 @@ def search_datasets():
             with conn.cursor() as cur:
                 cur.execute(f"""
                     SELECT TOP {limit}
-                        d.dataset_id,
-                        d."name",
+                        TRIM(d.dataset_id),
+                        TRIM(d."name"),
                         d.namespace_id,
-                        n.namespace_uri,
-                        d.description,
-                        d.source_type,
+                        TRIM(n.namespace_uri),
+                        TRIM(d.description),
+                        TRIM(d.source_type),
                         d.created_at,
                         d.updated_at
                     FROM OL_DATASET d
@@ -581,11 +1319,11 @@ def search_datasets():
                 rows = cur.fetchall()
                 datasets = [
                     {
-                        "id": row[0].strip() if row[0] else "",
-                        "name": row[1].strip() if row[1] else "",
-                        "namespace": row[3].strip() if row[3] else "",  # namespace_uri
-                        "description": row[4].strip() if row[4] else "",
-                        "sourceType": row[5].strip() if row[5] else None,
+                        "id": row[0] or "",
+                        "name": row[1] or "",
+                        "namespace": row[3] or "",  # namespace_uri
+                        "description": row[4] or "",
+                        "sourceType": row[5] or None,
                         "createdAt": row[6].isoformat() if row[6] else None,
                         "updatedAt": row[7].isoformat() if row[7] else None
                     }
@@ -620,12 +1358,12 @@ def unified_search():
                 # Search datasets
                 cur.execute(f"""
                     SELECT TOP {limit}
-                        d.dataset_id,
-                        d."name",
+                        TRIM(d.dataset_id),
+                        TRIM(d."name"),
                         d.namespace_id,
-                        n.namespace_uri,
-                        d.description,
-                        d.source_type,
+                        TRIM(n.namespace_uri),
+                        TRIM(d.description),
+                        TRIM(d.source_type),
                         d.created_at,
                         d.updated_at
                     FROM OL_DATASET d
@@ -638,11 +1376,11 @@ def unified_search():
                 dataset_rows = cur.fetchall()
                 datasets = [
                     {
-                        "id": row[0].strip() if row[0] else "",
-                        "name": row[1].strip() if row[1] else "",
-                        "namespace": row[3].strip() if row[3] else "",
-                        "description": row[4].strip() if row[4] else "",
-                        "sourceType": row[5].strip() if row[5] else None,
+                        "id": row[0] or "",
+                        "name": row[1] or "",
+                        "namespace": row[3] or "",
+                        "description": row[4] or "",
+                        "sourceType": row[5] or None,
                         "createdAt": row[6].isoformat() if row[6] else None,
                         "updatedAt": row[7].isoformat() if row[7] else None
                     }
@@ -684,20 +1422,30 @@ def unified_search():
 
 
 @app.route("/api/v2/openlineage/lineage/<path:dataset_id>/<field_name>", methods=["GET"])
+@cache_response
 def get_openlineage_lineage(dataset_id, field_name):
     """Get lineage graph for a dataset field using OpenLineage tables."""
     direction = request.args.get("direction", "both")
     max_depth = int(request.args.get("maxDepth", "5"))
+    wire_format = request.args.get("format", "full")
+    if wire_format not in LINEAGE_FORMATS:
+        return jsonify({"error": "format must be 'full' or 'compact'"}), 400
+    try:
+        limits = get_traversal_limits()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
         nodes = {}
-        edges = []
+        edges = {}  # edge_id -> edge
+        members = {}
+        graph = get_lineage_graph()
 
         with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # Get the dataset name for the requested dataset_id
                 cur.execute("""
-                    SELECT "name", namespace_id
+                    SELECT TRIM("name"), namespace_id
                     FROM OL_DATASET
                     WHERE dataset_id = ?
                 """, [dataset_id])
@@ -706,200 +1454,144 @@ def get_openlineage_lineage(dataset_id, field_name):
                 if not dataset_row:
                     return jsonify({"error": "Dataset not found"}), 404
 
-                dataset_name = dataset_row[0].strip() if dataset_row[0] else ""
+                dataset_name = dataset_row[0] or ""
 
                 # OL_COLUMN_LINEAGE uses string columns (source_dataset, source_field, etc.)
                 # not foreign key references, so we query by dataset name + field name
 
-                # Get upstream lineage if requested
-                if direction in ("upstream", "both"):
-                    cur.execute("""
-                        WITH RECURSIVE upstream_lineage AS (
-                            SELECT
-                                source_namespace,
-                                source_dataset,
-                                source_field,
-                                target_namespace,
-                                target_dataset,
-                                target_field,
-                                transformation_type,
-                                1 as depth,
-                                CAST(target_dataset || '.' || target_field || '->' || source_dataset || '.' || source_field AS VARCHAR(10000)) as path
-                            FROM OL_COLUMN_LINEAGE
-                            WHERE target_dataset = ?
-                              AND UPPER(target_field) = UPPER(?)
-                              AND is_active = 'Y'
-
-                            UNION ALL
-
-                            SELECT
-                                cl.source_namespace,
-                                cl.source_dataset,
-                                cl.source_field,
-                                cl.target_namespace,
-                                cl.target_dataset,
-                                cl.target_field,
-                                cl.transformation_type,
-                                ul.depth + 1,
-                                ul.path || '->' || cl.source_dataset || '.' || cl.source_field
-                            FROM OL_COLUMN_LINEAGE cl
-                            INNER JOIN upstream_lineage ul
-                                ON cl.target_dataset = ul.source_dataset
-                                AND cl.target_field = ul.source_field
-                            WHERE cl.is_active = 'Y'
-                              AND ul.depth < ?
-                              AND POSITION(cl.source_dataset || '.' || cl.source_field IN ul.path) = 0
-                        )
-                        SELECT DISTINCT
-                            source_namespace,
-                            source_dataset,
-                            source_field,
-                            target_namespace,
-                            target_dataset,
-                            target_field,
-                            transformation_type
-                        FROM upstream_lineage
-                    """, [dataset_name, field_name, max_depth])
+                # Bounded traversal: both directions share one breadth-first walk
+                if limits is not None:
+                    walks = ["upstream", "downstream"] if direction == "both" else [direction]
+                    rows, members = bounded_lineage(
+                        cur, graph, [(dataset_name, field_name, walk) for walk in walks],
+                        max_depth, limits)
+                    add_lineage_rows(nodes, edges, rows)
 
-                    for row in cur.fetchall():
-                        source_key = f"{row[1]}.{row[2]}"
-                        target_key = f"{row[4]}.{row[5]}"
+                # Get upstream lineage if requested
+                elif direction in ("upstream", "both"):
+                    if graph is not None:
+                        rows = traverse_graph(graph, [(dataset_name, field_name)], "upstream", max_depth)
+                    else:
+                        cur.execute("""
+                            WITH RECURSIVE upstream_lineage AS (
+                                SELECT
+                                    source_namespace,
+                                    source_dataset,
+                                    source_field,
+                                    target_namespace,
+                                    target_dataset,
+                                    target_field,
+                                    transformation_type,
+                                    1 as depth,
+                                    CAST(target_dataset || '.' || target_field || '->' || source_dataset || '.' || source_field AS VARCHAR(10000)) as path
+                                FROM OL_COLUMN_LINEAGE
+                                WHERE target_dataset = ?
+                                  AND UPPER(target_field) = UPPER(?)
+                                  AND is_active = 'Y'
 
-                        # Add source node
-                        if source_key not in nodes:
-                            nodes[source_key] = {
-                                "id": source_key,
-                                "type": "field",
-                                "name": row[2].strip() if row[2] else "",
-                                "dataset": {
-                                    "name": row[1].strip() if row[1] else "",
-                                    "namespace": row[0].strip() if row[0] else ""
-                                }
-                            }
+                                UNION ALL
 
-                        # Add target node
-                        if target_key not in nodes:
-                            nodes[target_key] = {
-                                "id": target_key,
-                                "type": "field",
-                                "name": row[5].strip() if row[5] else "",
-                                "dataset": {
-                                    "name": row[4].strip() if row[4] else "",
-                                    "namespace": row[3].strip() if row[3] else ""
-                                }
-                            }
+                                SELECT
+                                    cl.source_namespace,
+                                    cl.source_dataset,
+                                    cl.source_field,
+                                    cl.target_namespace,
+                                    cl.target_dataset,
+                                    cl.target_field,
+                                    cl.transformation_type,
+                                    ul.depth + 1,
+                                    ul.path || '->' || cl.source_dataset || '.' || cl.source_field
+                                FROM OL_COLUMN_LINEAGE cl
+                                INNER JOIN upstream_lineage ul
+                                    ON cl.target_dataset = ul.source_dataset
+                                    AND cl.target_field = ul.source_field
+                                WHERE cl.is_active = 'Y'
+                                  AND ul.depth < ?
+                                  AND POSITION(cl.source_dataset || '.' || cl.source_field IN ul.path) = 0
+                            )
+                            SELECT DISTINCT
+                                TRIM(source_namespace) AS source_namespace,
+                                TRIM(source_dataset) AS source_dataset,
+                                TRIM(source_field) AS source_field,
+                                TRIM(target_namespace) AS target_namespace,
+                                TRIM(target_dataset) AS target_dataset,
+                                TRIM(target_field) AS target_field,
+                                TRIM(transformation_type) AS transformation_type
+                            FROM upstream_lineage
+                        """, [dataset_name, field_name, max_depth])
+                        rows = cur.fetchall()
 
-                        # Add edge
-                        edge_id = f"{source_key}->{target_key}"
-                        if not any(e["id"] == edge_id for e in edges):
-                            edges.append({
-                                "id": edge_id,
-                                "source": source_key,
-                                "target": target_key,
-                                "transformationType": row[6].strip() if row[6] else "DIRECT"
-                            })
+                    add_lineage_rows(nodes, edges, rows)
 
                 # Get downstream lineage if requested
-                if direction in ("downstream", "both"):
-                    cur.execute("""
-                        WITH RECURSIVE downstream_lineage AS (
-                            SELECT
-                                source_namespace,
-                                source_dataset,
-                                source_field,
-                                target_namespace,
-                                target_dataset,
-                                target_field,
-                                transformation_type,
-                                1 as depth,
-                                CAST(source_dataset || '.' || source_field || '->' || target_dataset || '.' || target_field AS VARCHAR(10000)) as path
-                            FROM OL_COLUMN_LINEAGE
-                            WHERE source_dataset = ?
-                              AND UPPER(source_field) = UPPER(?)
-                              AND is_active = 'Y'
-
-                            UNION ALL
-
-                            SELECT
-                                cl.source_namespace,
-                                cl.source_dataset,
-                                cl.source_field,
-                                cl.target_namespace,
-                                cl.target_dataset,
-                                cl.target_field,
-                                cl.transformation_type,
-                                dl.depth + 1,
-                                dl.path || '->' || cl.target_dataset || '.' || cl.target_field
-                            FROM OL_COLUMN_LINEAGE cl
-                            INNER JOIN downstream_lineage dl
-                                ON cl.source_dataset = dl.target_dataset
-                                AND cl.source_field = dl.target_field
-                            WHERE cl.is_active = 'Y'
-                              AND dl.depth < ?
-                              AND POSITION(cl.target_dataset || '.' || cl.target_field IN dl.path) = 0
-                        )
-                        SELECT DISTINCT
-                            source_namespace,
-                            source_dataset,
-                            source_field,
-                            target_namespace,
-                            target_dataset,
-                            target_field,
-                            transformation_type
-                        FROM downstream_lineage
-                    """, [dataset_name, field_name, max_depth])
-
-                    for row in cur.fetchall():
-                        source_key = f"{row[1]}.{row[2]}"
-                        target_key = f"{row[4]}.{row[5]}"
+                if limits is None and direction in ("downstream", "both"):
+                    if graph is not None:
+                        rows = traverse_graph(graph, [(dataset_name, field_name)], "downstream", max_depth)
+                    else:
+                        cur.execute("""
+                            WITH RECURSIVE downstream_lineage AS (
+                                SELECT
+                                    source_namespace,
+                                    source_dataset,
+                                    source_field,
+                                    target_namespace,
+                                    target_dataset,
+                                    target_field,
+                                    transformation_type,
+                                    1 as depth,
+                                    CAST(source_dataset || '.' || source_field || '->' || target_dataset || '.' || target_field AS VARCHAR(10000)) as path
+                                FROM OL_COLUMN_LINEAGE
+                                WHERE source_dataset = ?
+                                  AND UPPER(source_field) = UPPER(?)
+                                  AND is_active = 'Y'
 
-                        # Add source node
-                        if source_key not in nodes:
-                            nodes[source_key] = {
-                                "id": source_key,
-                                "type": "field",
-                                "name": row[2].strip() if row[2] else "",
-                                "dataset": {
-                                    "name": row[1].strip() if row[1] else "",
-                                    "namespace": row[0].strip() if row[0] else ""
-                                }
-                            }
+                                UNION ALL
 
-                        # Add target node
-                        if target_key not in nodes:
-                            nodes[target_key] = {
-                                "id": target_key,
-                                "type": "field",
-                                "name": row[5].strip() if row[5] else "",
-                                "dataset": {
-                                    "name": row[4].strip() if row[4] else "",
-                                    "namespace": row[3].strip() if row[3] else ""
-                                }
-                            }
+                                SELECT
+                                    cl.source_namespace,
+                                    cl.source_dataset,
+                                    cl.source_field,
+                                    cl.target_namespace,
+                                    cl.target_dataset,
+                                    cl.target_field,
+                                    cl.transformation_type,
+                                    dl.depth + 1,
+                                    dl.path || '->' || cl.target_dataset || '.' || cl.target_field
+                                FROM OL_COLUMN_LINEAGE cl
+                                INNER JOIN downstream_lineage dl
+                                    ON cl.source_dataset = dl.target_dataset
+                                    AND cl.source_field = dl.target_field
+                                WHERE cl.is_active = 'Y'
+                                  AND dl.depth < ?
+                                  AND POSITION(cl.target_dataset || '.' || cl.target_field IN dl.path) = 0
+                            )
+                            SELECT DISTINCT
+                                TRIM(source_namespace) AS source_namespace,
+                                TRIM(source_dataset) AS source_dataset,
+                                TRIM(source_field) AS source_field,
+                                TRIM(target_namespace) AS target_namespace,
+                                TRIM(target_dataset) AS target_dataset,
+                                TRIM(target_field) AS target_field,
+                                TRIM(transformation_type) AS transformation_type
+                            FROM downstream_lineage
+                        """, [dataset_name, field_name, max_depth])
+                        rows = cur.fetchall()
 
-                        # Add edge
-                        edge_id = f"{source_key}->{target_key}"
-                        if not any(e["id"] == edge_id for e in edges):
-                            edges.append({
-                                "id": edge_id,
-                                "source": source_key,
-                                "target": target_key,
-                                "transformationType": row[6].strip() if row[6] else "DIRECT"
-                            })
+                    add_lineage_rows(nodes, edges, rows)
 
                 # Add the root field node if not already present
                 root_key = f"{dataset_name}.{field_name}"
                 if root_key not in nodes:
                     # Get namespace for this dataset
                     cur.execute("""
-                        SELECT n.namespace_uri
+                        SELECT TRIM(n.namespace_uri)
                         FROM OL_DATASET d
                         JOIN OL_NAMESPACE n ON d.namespace_id = n.namespace_id
                         WHERE d.dataset_id = ?
                     """, [dataset_id])
 
                     ns_row = cur.fetchone()
-                    namespace = ns_row[0].strip() if ns_row and ns_row[0] else ""
+                    namespace = (ns_row[0] or "") if ns_row else ""
 
                     nodes[root_key] = {
                         "id": root_key,
@@ -911,14 +1603,13 @@ def get_openlineage_lineage(dataset_id, field_name):
                         }
                     }
 
-        return jsonify({
+        result = {
             "datasetId": dataset_id,
             "fieldName": field_name,
-            "graph": {
-                "nodes": list(nodes.values()),
-                "edges": edges
-            }
-        })
+            "graph": encode_graph(nodes, edges, wire_format)
+        }
+        result.update(members)
+        return jsonify(result)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -926,20 +1617,36 @@ def get_openlineage_lineage(dataset_id, field_name):
 
 
 @app.route("/api/v2/openlineage/lineage/table/<path:dataset_id>", methods=["GET"])
+@cache_response
 def get_openlineage_table_lineage(dataset_id):
-    """Get lineage graph for all fields in a dataset (table-level lineage)."""
+    """
+    Get lineage graph for all fields in a dataset (table-level lineage).
+
+    With zoom=dataset, returns one-hop dataset-to-dataset lineage instead,
+    from the OL_DATASET_LINEAGE rollup.
+    """
     direction = request.args.get("direction", "both")
     max_depth = int(request.args.get("maxDepth", "5"))
+    wire_format = request.args.get("format", "full")
+    if wire_format not in LINEAGE_FORMATS:
+        return jsonify({"error": "format must be 'full' or 'compact'"}), 400
+    try:
+        limits = get_traversal_limits()
+        zoom = get_zoom(("column", "dataset"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
         nodes = {}
-        edges = []
+        edges = {}  # edge_id -> edge
+        members = {}
+        graph = get_lineage_graph()
 
         with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # Get the dataset name and namespace
                 cur.execute("""
-                    SELECT d."name", d.namespace_id, n.namespace_uri
+                    SELECT TRIM(d."name"), d.namespace_id, TRIM(n.namespace_uri)
                     FROM OL_DATASET d
                     JOIN OL_NAMESPACE n ON d.namespace_id = n.namespace_id
                     WHERE d.dataset_id = ?
@@ -949,18 +1656,30 @@ def get_openlineage_table_lineage(dataset_id):
                 if not dataset_row:
                     return jsonify({"error": "Dataset not found"}), 404
 
-                dataset_name = dataset_row[0].strip() if dataset_row[0] else ""
-                namespace_uri = dataset_row[2].strip() if dataset_row[2] else ""
+                dataset_name = dataset_row[0] or ""
+                namespace_uri = dataset_row[2] or ""
+
+                if zoom == "dataset":
+                    nodes[dataset_name] = {"id": dataset_name, "type": "dataset",
+                                           "name": dataset_name, "namespace": namespace_uri}
+                    add_rollup_rows(nodes, edges,
+                                    query_rollup_lineage(cur, "dataset", dataset_name, direction),
+                                    "dataset")
+                    return jsonify({
+                        "datasetId": dataset_id,
+                        "zoom": zoom,
+                        "graph": encode_graph(nodes, edges, "full")
+                    })
 
                 # Get all fields for this dataset
                 cur.execute("""
-                    SELECT field_name
+                    SELECT TRIM(field_name)
                     FROM OL_DATASET_FIELD
                     WHERE dataset_id = ?
                     ORDER BY ordinal_position
                 """, [dataset_id])
 
-                fields = [row[0].strip() if row[0] else "" for row in cur.fetchall()]
+                fields = [row[0] or "" for row in cur.fetchall()]
 
                 if not fields:
                     return jsonify({"error": "No fields found for dataset"}), 404
@@ -980,188 +1699,244 @@ def get_openlineage_table_lineage(dataset_id):
                             }
                         }
 
+                    # Bounded traversal runs once for all fields, below
+                    if limits is not None:
+                        continue
+
                     # Get upstream lineage if requested
                     if direction in ("upstream", "both"):
-                        cur.execute("""
-                            WITH RECURSIVE upstream_lineage AS (
-                                SELECT
-                                    source_namespace,
-                                    source_dataset,
-                                    source_field,
-                                    target_namespace,
-                                    target_dataset,
-                                    target_field,
-                                    transformation_type,
-                                    1 as depth,
-                                    CAST(target_dataset || '.' || target_field || '->' || source_dataset || '.' || source_field AS VARCHAR(10000)) as path
-                                FROM OL_COLUMN_LINEAGE
-                                WHERE target_dataset = ?
-                                  AND UPPER(target_field) = UPPER(?)
-                                  AND is_active = 'Y'
-
-                                UNION ALL
+                        if graph is not None:
+                            rows = traverse_graph(graph, [(dataset_name, field_name)], "upstream", max_depth)
+                        else:
+                            cur.execute("""
+                                WITH RECURSIVE upstream_lineage AS (
+                                    SELECT
+                                        source_namespace,
+                                        source_dataset,
+                                        source_field,
+                                        target_namespace,
+                                        target_dataset,
+                                        target_field,
+                                        transformation_type,
+                                        1 as depth,
+                                        CAST(target_dataset || '.' || target_field || '->' || source_dataset || '.' || source_field AS VARCHAR(10000)) as path
+                                    FROM OL_COLUMN_LINEAGE
+                                    WHERE target_dataset = ?
+                                      AND UPPER(target_field) = UPPER(?)
+                                      AND is_active = 'Y'
+
+                                    UNION ALL
+
+                                    SELECT
+                                        cl.source_namespace,
+                                        cl.source_dataset,
+                                        cl.source_field,
+                                        cl.target_namespace,
+                                        cl.target_dataset,
+                                        cl.target_field,
+                                        cl.transformation_type,
+                                        ul.depth + 1,
+                                        ul.path || '->' || cl.source_dataset || '.' || cl.source_field
+                                    FROM OL_COLUMN_LINEAGE cl
+                                    INNER JOIN upstream_lineage ul
+                                        ON cl.target_dataset = ul.source_dataset
+                                        AND cl.target_field = ul.source_field
+                                    WHERE cl.is_active = 'Y'
+                                      AND ul.depth < ?
+                                      AND POSITION(cl.source_dataset || '.' || cl.source_field IN ul.path) = 0
+                                )
+                                SELECT DISTINCT
+                                    TRIM(source_namespace) AS source_namespace,
+                                    TRIM(source_dataset) AS source_dataset,
+                                    TRIM(source_field) AS source_field,
+                                    TRIM(target_namespace) AS target_namespace,
+                                    TRIM(target_dataset) AS target_dataset,
+                                    TRIM(target_field) AS target_field,
+                                    TRIM(transformation_type) AS transformation_type
+                                FROM upstream_lineage
+                            """, [dataset_name, field_name, max_depth])
+                            rows = cur.fetchall()
+
+                        add_lineage_rows(nodes, edges, rows)
 
-                                SELECT
-                                    cl.source_namespace,
-                                    cl.source_dataset,
-                                    cl.source_field,
-                                    cl.target_namespace,
-                                    cl.target_dataset,
-                                    cl.target_field,
-                                    cl.transformation_type,
-                                    ul.depth + 1,
-                                    ul.path || '->' || cl.source_dataset || '.' || cl.source_field
-                                FROM OL_COLUMN_LINEAGE cl
-                                INNER JOIN upstream_lineage ul
-                                    ON cl.target_dataset = ul.source_dataset
-                                    AND cl.target_field = ul.source_field
-                                WHERE cl.is_active = 'Y'
-                                  AND ul.depth < ?
-                                  AND POSITION(cl.source_dataset || '.' || cl.source_field IN ul.path) = 0
-                            )
-                            SELECT DISTINCT
-                                source_namespace,
-                                source_dataset,
-                                source_field,
-                                target_namespace,
-                                target_dataset,
-                                target_field,
-                                transformation_type
-                            FROM upstream_lineage
-                        """, [dataset_name, field_name, max_depth])
+                    # Get downstream lineage if requested
+                    if direction in ("downstream", "both"):
+                        if graph is not None:
+                            rows = traverse_graph(graph, [(dataset_name, field_name)], "downstream", max_depth)
+                        else:
+                            cur.execute("""
+                                WITH RECURSIVE downstream_lineage AS (
+                                    SELECT
+                                        source_namespace,
+                                        source_dataset,
+                                        source_field,
+                                        target_namespace,
+                                        target_dataset,
+                                        target_field,
+                                        transformation_type,
+                                        1 as depth,
+                                        CAST(source_dataset || '.' || source_field || '->' || target_dataset || '.' || target_field AS VARCHAR(10000)) as path
+                                    FROM OL_COLUMN_LINEAGE
+                                    WHERE source_dataset = ?
+                                      AND UPPER(source_field) = UPPER(?)
+                                      AND is_active = 'Y'
+
+                                    UNION ALL
+
+                                    SELECT
+                                        cl.source_namespace,
+                                        cl.source_dataset,
+                                        cl.source_field,
+                                        cl.target_namespace,
+                                        cl.target_dataset,
+                                        cl.target_field,
+                                        cl.transformation_type,
+                                        dl.depth + 1,
+                                        dl.path || '->' || cl.target_dataset || '.' || cl.target_field
+                                    FROM OL_COLUMN_LINEAGE cl
+                                    INNER JOIN downstream_lineage dl
+                                        ON cl.source_dataset = dl.target_dataset
+                                        AND cl.source_field = dl.target_field
+                                    WHERE cl.is_active = 'Y'
+                                      AND dl.depth < ?
+                                      AND POSITION(cl.target_dataset || '.' || cl.target_field IN dl.path) = 0
+                                )
+                                SELECT DISTINCT
+                                    TRIM(source_namespace) AS source_namespace,
+                                    TRIM(source_dataset) AS source_dataset,
+                                    TRIM(source_field) AS source_field,
+                                    TRIM(target_namespace) AS target_namespace,
+                                    TRIM(target_dataset) AS target_dataset,
+                                    TRIM(target_field) AS target_field,
+                                    TRIM(transformation_type) AS transformation_type
+                                FROM downstream_lineage
+                            """, [dataset_name, field_name, max_depth])
+                            rows = cur.fetchall()
+
+                        add_lineage_rows(nodes, edges, rows)
+
+                if limits is not None:
+                    walks = ["upstream", "downstream"] if direction == "both" else [direction]
+                    rows, members = bounded_lineage(
+                        cur, graph,
+                        [(dataset_name, field_name, walk) for field_name in fields for walk in walks],
+                        max_depth, limits)
+                    add_lineage_rows(nodes, edges, rows)
+
+        result = {
+            "datasetId": dataset_id,
+            "graph": encode_graph(nodes, edges, wire_format)
+        }
+        result.update(members)
+        return jsonify(result)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
 
-                        for row in cur.fetchall():
-                            source_key = f"{row[1]}.{row[2]}"
-                            target_key = f"{row[4]}.{row[5]}"
-
-                            # Add source node
-                            if source_key not in nodes:
-                                nodes[source_key] = {
-                                    "id": source_key,
-                                    "type": "field",
-                                    "name": row[2].strip() if row[2] else "",
-                                    "dataset": {
-                                        "name": row[1].strip() if row[1] else "",
-                                        "namespace": row[0].strip() if row[0] else ""
-                                    }
-                                }
 
-                            # Add target node
-                            if target_key not in nodes:
-                                nodes[target_key] = {
-                                    "id": target_key,
-                                    "type": "field",
-                                    "name": row[5].strip() if row[5] else "",
-                                    "dataset": {
-                                        "name": row[4].strip() if row[4] else "",
-                                        "namespace": row[3].strip() if row[3] else ""
-                                    }
-                                }
+# Maximum column nodes expanded by one neighbors request
+MAX_NEIGHBOR_NODES = 200
 
-                            # Add edge
-                            edge_id = f"{source_key}->{target_key}"
-                            if not any(e["id"] == edge_id for e in edges):
-                                edges.append({
-                                    "id": edge_id,
-                                    "source": source_key,
-                                    "target": target_key,
-                                    "transformationType": row[6].strip() if row[6] else "DIRECT"
-                                })
 
-                    # Get downstream lineage if requested
-                    if direction in ("downstream", "both"):
-                        cur.execute("""
-                            WITH RECURSIVE downstream_lineage AS (
-                                SELECT
-                                    source_namespace,
-                                    source_dataset,
-                                    source_field,
-                                    target_namespace,
-                                    target_dataset,
-                                    target_field,
-                                    transformation_type,
-                                    1 as depth,
-                                    CAST(source_dataset || '.' || source_field || '->' || target_dataset || '.' || target_field AS VARCHAR(10000)) as path
-                                FROM OL_COLUMN_LINEAGE
-                                WHERE source_dataset = ?
-                                  AND UPPER(source_field) = UPPER(?)
-                                  AND is_active = 'Y'
+@app.route("/api/v2/openlineage/lineage/neighbors", methods=["GET"])
+@cache_response
+def get_openlineage_neighbors():
+    """
+    Get the one-hop neighbors of one or more column nodes.
 
-                                UNION ALL
+    Query parameters:
+        node: Column id (datasetName.fieldName); repeat for several columns
+        direction: upstream, downstream or both (default)
+        format: full (default) or compact
 
-                                SELECT
-                                    cl.source_namespace,
-                                    cl.source_dataset,
-                                    cl.source_field,
-                                    cl.target_namespace,
-                                    cl.target_dataset,
-                                    cl.target_field,
-                                    cl.transformation_type,
-                                    dl.depth + 1,
-                                    dl.path || '->' || cl.target_dataset || '.' || cl.target_field
-                                FROM OL_COLUMN_LINEAGE cl
-                                INNER JOIN downstream_lineage dl
-                                    ON cl.source_dataset = dl.target_dataset
-                                    AND cl.source_field = dl.target_field
-                                WHERE cl.is_active = 'Y'
-                                  AND dl.depth < ?
-                                  AND POSITION(cl.target_dataset || '.' || cl.target_field IN dl.path) = 0
-                            )
-                            SELECT DISTINCT
-                                source_namespace,
-                                source_dataset,
-                                source_field,
-                                target_namespace,
-                                target_dataset,
-                                target_field,
-                                transformation_type
-                            FROM downstream_lineage
-                        """, [dataset_name, field_name, max_depth])
+    Every returned node carries inDegree, outDegree and hasMore (edges in the
+    requested direction that are not part of this response), so the UI can
+    expand the graph on demand.
+    """
+    direction = request.args.get("direction", "both")
+    if direction not in ("upstream", "downstream", "both"):
+        return jsonify({"error": "direction must be 'upstream', 'downstream' or 'both'"}), 400
+    wire_format = request.args.get("format", "full")
+    if wire_format not in LINEAGE_FORMATS:
+        return jsonify({"error": "format must be 'full' or 'compact'"}), 400
+
+    column_ids = request.args.getlist("node")
+    if not column_ids:
+        return jsonify({"error": "At least one node parameter is required"}), 400
+    if len(column_ids) > MAX_NEIGHBOR_NODES:
+        return jsonify({"error": f"At most {MAX_NEIGHBOR_NODES} nodes per request"}), 400
+    columns = []
+    for column_id in column_ids:
+        dataset_name, _, field_name = column_id.rpartition(".")
+        if not dataset_name or not field_name:
+            return jsonify({"error": f"Invalid node id '{column_id}' (expected dataset.field)"}), 400
+        columns.append((dataset_name, field_name))
 
-                        for row in cur.fetchall():
-                            source_key = f"{row[1]}.{row[2]}"
-                            target_key = f"{row[4]}.{row[5]}"
-
-                            # Add source node
-                            if source_key not in nodes:
-                                nodes[source_key] = {
-                                    "id": source_key,
-                                    "type": "field",
-                                    "name": row[2].strip() if row[2] else "",
-                                    "dataset": {
-                                        "name": row[1].strip() if row[1] else "",
-                                        "namespace": row[0].strip() if row[0] else ""
-                                    }
-                                }
+    try:
+        nodes = {}
+        edges = {}
+        graph = get_lineage_graph()
 
-                            # Add target node
-                            if target_key not in nodes:
-                                nodes[target_key] = {
-                                    "id": target_key,
-                                    "type": "field",
-                                    "name": row[5].strip() if row[5] else "",
-                                    "dataset": {
-                                        "name": row[4].strip() if row[4] else "",
-                                        "namespace": row[3].strip() if row[3] else ""
-                                    }
-                                }
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                neighbors = GraphNeighbors(graph) if graph is not None else SqlNeighbors(cur)
+                roots = neighbors.resolve(columns)
+                add_lineage_rows(nodes, edges, neighbors.expand(roots, direction))
+
+                # Requested columns take the spelling stored with their edges
+                spelling = {(node["dataset"]["name"], node["name"].upper()): node["name"]
+                            for node in nodes.values()}
+                missing = []
+                for dataset_name, field_name in roots:
+                    field_name = spelling.get((dataset_name, field_name.upper()), field_name)
+                    key = f"{dataset_name}.{field_name}"
+                    if key not in nodes:
+                        nodes[key] = {
+                            "id": key,
+                            "type": "field",
+                            "name": field_name,
+                            "dataset": {"name": dataset_name, "namespace": ""}
+                        }
+                        missing.append(nodes[key])
 
-                            # Add edge
-                            edge_id = f"{source_key}->{target_key}"
-                            if not any(e["id"] == edge_id for e in edges):
-                                edges.append({
-                                    "id": edge_id,
-                                    "source": source_key,
-                                    "target": target_key,
-                                    "transformationType": row[6].strip() if row[6] else "DIRECT"
-                                })
+                if missing:
+                    # Columns without edges: look up their namespace
+                    dataset_names = sorted({node["dataset"]["name"] for node in missing})
+                    cur.execute(f"""
+                        SELECT TRIM(d."name"), TRIM(n.namespace_uri)
+                        FROM OL_DATASET d
+                        JOIN OL_NAMESPACE n ON d.namespace_id = n.namespace_id
+                        WHERE d."name" IN ({",".join("?" * len(dataset_names))})
+                    """, dataset_names)
+                    namespaces = dict(cur.fetchall())
+                    for node in missing:
+                        node["dataset"]["namespace"] = namespaces.get(node["dataset"]["name"], "")
+
+                degrees = neighbors.degrees([(node["dataset"]["name"], node["name"])
+                                             for node in nodes.values()])
+
+        # Count the edges of each node already in this response
+        included_in, included_out = {}, {}
+        for edge in edges.values():
+            included_out[edge["source"]] = included_out.get(edge["source"], 0) + 1
+            included_in[edge["target"]] = included_in.get(edge["target"], 0) + 1
+
+        for key, node in nodes.items():
+            in_degree, out_degree = degrees.get((node["dataset"]["name"], node["name"]), (0, 0))
+            remaining = 0
+            if direction in ("downstream", "both"):
+                remaining += out_degree - included_out.get(key, 0)
+            if direction in ("upstream", "both"):
+                remaining += in_degree - included_in.get(key, 0)
+            node["inDegree"] = in_degree
+            node["outDegree"] = out_degree
+            node["hasMore"] = remaining > 0
 
         return jsonify({
-            "datasetId": dataset_id,
-            "graph": {
-                "nodes": list(nodes.values()),
-                "edges": edges
-            }
+            "nodeIds": column_ids,
+            "direction": direction,
+            "graph": encode_graph(nodes, edges, wire_format)
         })
     except Exception as e:
         import traceback
@@ -1169,15 +1944,146 @@ def get_openlineage_table_lineage(dataset_id):
         return jsonify({"error": str(e)}), 500
 
 
+def job_status(state):
+    """JSON representation of a background job's state."""
+    def timestamp(value):
+        return datetime.fromtimestamp(value, timezone.utc).isoformat() if value else None
+
+    return {
+        "jobId": state["id"],
+        "status": state["status"],
+        "description": state.get("description"),
+        "progress": state.get("progress", {}),
+        "createdAt": timestamp(state.get("createdAt")),
+        "startedAt": timestamp(state.get("startedAt")),
+        "finishedAt": timestamp(state.get("finishedAt")),
+        "expiresAt": timestamp(state.get("expiresAt")),
+        "error": state.get("error"),
+        "statusUrl": f"/api/v2/openlineage/jobs/{state['id']}",
+        "resultUrl": f"/api/v2/openlineage/jobs/{state['id']}/result",
+    }
+
+
+def submit_lineage_job(endpoint, view_args):
+    """
+    Run the current request's view in the background and return 202 with the job.
+
+    Identical requests (same path, query and lineage version) share one job;
+    without a readable lineage version every request gets a job of its own.
+    """
+    args = [(name, value) for name, value in request.args.items(multi=True) if name != "async"]
+    path = request.path
+    query_string = urlencode(args)
+    version = lineage_version()
+    key = json.dumps([path, sorted(args), version if version is not None else time.time_ns()])
+
+    def run(progress):
+        with app.test_request_context(path, query_string=query_string):
+            g.job_progress = progress
+            response = app.make_response(app.view_functions[endpoint](**view_args))
+            return response.status_code, response.get_data()
+
+    try:
+        state = lineage_jobs.submit(key, run, description=f"{path}?{query_string}".rstrip("?"))
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "30"}
+    return jsonify(job_status(state)), 202
+
+
+def load_lineage_job(job_id):
+    """Return a job's state, marking jobs whose worker exited as failed; None if unknown."""
+    if not re.fullmatch(r"[0-9a-f]{24}", job_id):
+        return None
+    state = lineage_jobs.store.load(job_id)
+    if (state is not None and state["status"] in ("queued", "running")
+            and not lineage_jobs.store.owner_alive(job_id)):
+        state["status"] = "failed"
+        state["error"] = "Job was interrupted (worker exited)"
+    return state
+
+
+@app.route("/api/v2/openlineage/jobs/<job_id>", methods=["GET"])
+def get_lineage_job(job_id):
+    """Get the status and progress of a background lineage job."""
+    state = load_lineage_job(job_id)
+    if state is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job_status(state))
+
+
+@app.route("/api/v2/openlineage/jobs/<job_id>/result", methods=["GET"])
+def get_lineage_job_result(job_id):
+    """
+    Get the result of a background lineage job.
+
+    Returns the response the synchronous request would have returned, 202 with
+    the job status while it is still running, or 500 if it failed.
+    """
+    state = load_lineage_job(job_id)
+    if state is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    if state["status"] == "failed":
+        return jsonify({"jobId": job_id, "error": state["error"]}), 500
+    if state["status"] != "done":
+        return jsonify(job_status(state)), 202
+    try:
+        body = lineage_jobs.store.read_body(job_id)
+    except OSError:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return app.response_class(body, status=state["statusCode"], mimetype="application/json")
+
+
 @app.route("/api/v2/openlineage/lineage/database/<database_name>", methods=["GET"])
+@cache_response
 def get_openlineage_database_lineage(database_name):
-    """Get column-level lineage graph for all tables/views in a database."""
+    """
+    Get column-level lineage graph for all tables/views in a database.
+
+    With zoom=dataset or zoom=database, returns one-hop dataset-to-dataset or
+    database-to-database lineage instead, from the rollup tables.
+
+    With async=true, returns 202 with a background job (see /jobs/<jobId>).
+    """
     direction = request.args.get("direction", "both")
     max_depth = int(request.args.get("maxDepth", "3"))  # Default to 3 for database-level
+    wire_format = request.args.get("format", "full")
+    if wire_format not in LINEAGE_FORMATS:
+        return jsonify({"error": "format must be 'full' or 'compact'"}), 400
+    try:
+        limits = get_traversal_limits()
+        zoom = get_zoom(("column", "dataset", "database"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if request.args.get("async", "").lower() in ("1", "true"):
+        return submit_lineage_job("get_openlineage_database_lineage", {"database_name": database_name})
+
+    if zoom != "column":
+        try:
+            nodes, edges = {}, {}
+            scope = database_name if zoom == "database" else f"{database_name}.%"
+            if zoom == "database":
+                nodes[database_name] = {"id": database_name, "type": "database", "name": database_name}
+            with get_db_connection() as conn:
+                with conn.cursor() as cur:
+                    rows = query_rollup_lineage(cur, zoom, scope, direction, pattern=zoom == "dataset")
+                    add_rollup_rows(nodes, edges, rows, zoom)
+            return jsonify({
+                "databaseName": database_name,
+                "direction": direction,
+                "zoom": zoom,
+                "graph": encode_graph(nodes, edges, "full")
+            })
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 500
 
     try:
         nodes = {}  # column_key -> node info
-        edges = []  # list of edges
+        edges = {}  # edge_id -> edge
+        members = {}
+        graph = get_lineage_graph()
 
         with get_db_connection() as conn:
             with conn.cursor() as cur:
@@ -1186,11 +2092,11 @@ def get_openlineage_database_lineage(database_name):
 
                 cur.execute("""
                     SELECT
-                        d.dataset_id,
-                        d."name",
-                        d.source_type,
-                        n.namespace_uri,
-                        d.description
+                        TRIM(d.dataset_id),
+                        TRIM(d."name"),
+                        TRIM(d.source_type),
+                        TRIM(n.namespace_uri),
+                        TRIM(d.description)
                     FROM OL_DATASET d
                     JOIN OL_NAMESPACE n ON d.namespace_id = n.namespace_id
                     WHERE d."name" LIKE ?
@@ -1201,15 +2107,17 @@ def get_openlineage_database_lineage(database_name):
                 dataset_names = set()
                 for row in cur.fetchall():
                     dataset = {
-                        "id": row[0].strip() if row[0] else "",
-                        "name": row[1].strip() if row[1] else "",
-                        "sourceType": row[2].strip() if row[2] else "TABLE",
-                        "namespace": row[3].strip() if row[3] else "",
-                        "description": row[4].strip() if row[4] else ""
+                        "id": row[0] or "",
+                        "name": row[1] or "",
+                        "sourceType": row[2] or "TABLE",
+                        "namespace": row[3] or "",
+                        "description": row[4] or ""
                     }
                     datasets.append(dataset)
                     dataset_names.add(dataset["name"])
 
+                report_job_progress(phase="fields", datasets=len(datasets))
+
                 if not datasets:
                     return jsonify({"error": f"No tables found in database '{database_name}'"}), 404
 
@@ -1225,16 +2133,16 @@ def get_openlineage_database_lineage(database_name):
                 # First, add ALL fields from ALL tables in the database as nodes
                 for dataset in datasets:
                     cur.execute("""
-                        SELECT field_name, field_type, nullable
+                        SELECT TRIM(field_name), TRIM(field_type), TRIM(nullable)
                         FROM OL_DATASET_FIELD
                         WHERE dataset_id = ?
                         ORDER BY ordinal_position
                     """, [dataset["id"]])
 
                     for field_row in cur.fetchall():
-                        field_name = field_row[0].strip() if field_row[0] else ""
-                        field_type = field_row[1].strip() if field_row[1] else None
-                        nullable = field_row[2].strip() if field_row[2] else None
+                        field_name = field_row[0] or ""
+                        field_type = field_row[1] or None
+                        nullable = field_row[2] or None
                         field_key = f"{dataset['name']}.{field_name}"
 
                         if field_key not in nodes:
@@ -1253,6 +2161,8 @@ def get_openlineage_database_lineage(database_name):
                                 }
                             }
 
+                report_job_progress(phase="lineage", depth=0, nodes=len(nodes))
+
                 # Now get all column lineage where source OR target is in this database
                 # This captures both internal database lineage and cross-database lineage
                 placeholders = ",".join("?" * len(dataset_names))
@@ -1300,30 +2210,47 @@ def get_openlineage_database_lineage(database_name):
                           AND POSITION(cl.target_dataset || '.' || cl.target_field IN lc.path) = 0
                     )
                     SELECT DISTINCT
-                        source_namespace,
-                        source_dataset,
-                        source_field,
-                        target_namespace,
-                        target_dataset,
-                        target_field,
-                        transformation_type
+                        TRIM(source_namespace) AS source_namespace,
+                        TRIM(source_dataset) AS source_dataset,
+                        TRIM(source_field) AS source_field,
+                        TRIM(target_namespace) AS target_namespace,
+                        TRIM(target_dataset) AS target_dataset,
+                        TRIM(target_field) AS target_field,
+                        TRIM(transformation_type) AS transformation_type
                     FROM lineage_cte
                 """
 
-                # Execute with dataset names repeated for placeholders
-                params = dataset_list + dataset_list + [max_depth]
-                cur.execute(lineage_query, params)
+                if limits is not None:
+                    # Bounded breadth-first walk from every column of the database
+                    roots = [(node["dataset"]["name"], node["name"], direction) for node in nodes.values()]
+                    lineage_rows, members = bounded_lineage(cur, graph, roots, max_depth, limits)
+                elif graph is not None:
+                    # Snapshot traversal from every column of the database. With
+                    # direction=both, edges are followed both ways like the CTE.
+                    roots = [(node["dataset"]["name"], node["name"]) for node in nodes.values()]
+                    walk = "any" if direction == "both" else direction
+                    lineage_rows = traverse_graph(graph, roots, walk, max_depth,
+                                                  progress=report_traversal_progress)
+                else:
+                    # Execute with dataset names repeated for placeholders
+                    params = dataset_list + dataset_list + [max_depth]
+                    cur.execute(lineage_query, params)
+                    lineage_rows = cur.fetchall()
 
                 # Process lineage results - add any nodes that weren't already added
                 # and create edges
-                for row in cur.fetchall():
-                    source_namespace = row[0].strip() if row[0] else ""
-                    source_dataset = row[1].strip() if row[1] else ""
-                    source_field = row[2].strip() if row[2] else ""
-                    target_namespace = row[3].strip() if row[3] else ""
-                    target_dataset = row[4].strip() if row[4] else ""
-                    target_field = row[5].strip() if row[5] else ""
-                    transformation_type = row[6].strip() if row[6] else "DIRECT"
+                for i, row in enumerate(lineage_rows):
+                    if i % 1000 == 0:
+                        report_job_progress(phase="metadata", nodes=len(nodes), edges=len(edges),
+                                            lineageRows=len(lineage_rows))
+                    # Lineage rows are trimmed by the query (or the snapshot)
+                    source_namespace = row[0] or ""
+                    source_dataset = row[1] or ""
+                    source_field = row[2] or ""
+                    target_namespace = row[3] or ""
+                    target_dataset = row[4] or ""
+                    target_field = row[5] or ""
+                    transformation_type = row[6] or "DIRECT"
 
                     source_key = f"{source_dataset}.{source_field}"
                     target_key = f"{target_dataset}.{target_field}"
@@ -1335,7 +2262,7 @@ def get_openlineage_database_lineage(database_name):
                         if not source_meta:
                             # External dataset - try to fetch sourceType
                             cur.execute("""
-                                SELECT d.source_type, n.namespace_uri
+                                SELECT TRIM(d.source_type), TRIM(n.namespace_uri)
                                 FROM OL_DATASET d
                                 JOIN OL_NAMESPACE n ON d.namespace_id = n.namespace_id
                                 WHERE d."name" = ?
@@ -1343,22 +2270,22 @@ def get_openlineage_database_lineage(database_name):
                             ext_row = cur.fetchone()
                             if ext_row:
                                 source_meta = {
-                                    "namespace": ext_row[1].strip() if ext_row[1] else source_namespace,
-                                    "sourceType": ext_row[0].strip() if ext_row[0] else "TABLE"
+                                    "namespace": ext_row[1] or source_namespace,
+                                    "sourceType": ext_row[0] or "TABLE"
                                 }
                             else:
                                 source_meta = {"namespace": source_namespace, "sourceType": "TABLE"}
 
                         # Fetch field metadata
                         cur.execute("""
-                            SELECT f.field_type, f.nullable
+                            SELECT TRIM(f.field_type), TRIM(f.nullable)
                             FROM OL_DATASET_FIELD f
                             JOIN OL_DATASET d ON f.dataset_id = d.dataset_id
                             WHERE d."name" = ? AND UPPER(f.field_name) = UPPER(?)
                         """, [source_dataset, source_field])
                         field_row = cur.fetchone()
-                        field_type = field_row[0].strip() if field_row and field_row[0] else None
-                        nullable = field_row[1].strip() if field_row and field_row[1] else None
+                        field_type = (field_row[0] or None) if field_row else None
+                        nullable = (field_row[1] or None) if field_row else None
 
                         nodes[source_key] = {
                             "id": source_key,
@@ -1382,7 +2309,7 @@ def get_openlineage_database_lineage(database_name):
                         if not target_meta:
                             # External dataset - try to fetch sourceType
                             cur.execute("""
-                                SELECT d.source_type, n.namespace_uri
+                                SELECT TRIM(d.source_type), TRIM(n.namespace_uri)
                                 FROM OL_DATASET d
                                 JOIN OL_NAMESPACE n ON d.namespace_id = n.namespace_id
                                 WHERE d."name" = ?
@@ -1390,22 +2317,22 @@ def get_openlineage_database_lineage(database_name):
                             ext_row = cur.fetchone()
                             if ext_row:
                                 target_meta = {
-                                    "namespace": ext_row[1].strip() if ext_row[1] else target_namespace,
-                                    "sourceType": ext_row[0].strip() if ext_row[0] else "TABLE"
+                                    "namespace": ext_row[1] or target_namespace,
+                                    "sourceType": ext_row[0] or "TABLE"
                                 }
                             else:
                                 target_meta = {"namespace": target_namespace, "sourceType": "TABLE"}
 
                         # Fetch field metadata
                         cur.execute("""
-                            SELECT f.field_type, f.nullable
+                            SELECT TRIM(f.field_type), TRIM(f.nullable)
                             FROM OL_DATASET_FIELD f
                             JOIN OL_DATASET d ON f.dataset_id = d.dataset_id
                             WHERE d."name" = ? AND UPPER(f.field_name) = UPPER(?)
                         """, [target_dataset, target_field])
                         field_row = cur.fetchone()
-                        field_type = field_row[0].strip() if field_row and field_row[0] else None
-                        nullable = field_row[1].strip() if field_row and field_row[1] else None
+                        field_type = (field_row[0] or None) if field_row else None
+                        nullable = (field_row[1] or None) if field_row else None
 
                         nodes[target_key] = {
                             "id": target_key,
@@ -1424,31 +2351,91 @@ def get_openlineage_database_lineage(database_name):
 
                     # Add edge
                     edge_id = f"{source_key}->{target_key}"
-                    if not any(e["id"] == edge_id for e in edges):
-                        edges.append({
+                    if edge_id not in edges:
+                        edges[edge_id] = {
                             "id": edge_id,
                             "source": source_key,
                             "target": target_key,
                             "transformationType": transformation_type
-                        })
+                        }
 
-        return jsonify({
+        result = {
             "databaseName": database_name,
             "direction": direction,
             "maxDepth": max_depth,
-            "graph": {
-                "nodes": list(nodes.values()),
-                "edges": edges
-            }
-        })
+            "graph": encode_graph(nodes, edges, wire_format)
+        }
+        result.update(members)
+        return jsonify(result)
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
+def run_workers(host, port, workers):
+    """
+    Serve the API from several pre-forked worker processes.
+
+    All workers accept connections from one listening socket. Each worker maps
+    the lineage snapshot read-only, so the graph is held once in the page cache
+    no matter how many workers run. POSIX only (uses os.fork).
+    """
+    import signal
+    import socket
+    from werkzeug.serving import make_server
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+            cache_warmer.start()
+            try:
+                server.serve_forever()
+            finally:
+                hot_keys.flush()
+                os._exit(0)
+        children.append(pid)
+    print(f"Started {workers} workers: {children}")
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("API_PORT") or os.environ.get("PORT", "8080"))
+    workers = int(os.environ.get("API_WORKERS", "1"))
     print(f"Starting Python Lineage API on port {port}")
     print(f"Database: {DB_CONFIG['host']}")
-    app.run(host="0.0.0.0", port=port, debug=False)
+    if LINEAGE_SNAPSHOT_PATH:
+        print(f"Lineage snapshot: {LINEAGE_SNAPSHOT_PATH}")
+    if LINEAGE_REFRESH_INTERVAL > 0:
+        print(f"Lineage refresh every {LINEAGE_REFRESH_INTERVAL:g}s")
+    if API_WARMUP_TOP_N > 0:
+        print(f"Cache warm-up: top {API_WARMUP_TOP_N} keys")
+    if workers > 1:
+        run_workers("0.0.0.0", port, workers)
+    else:
+        cache_warmer.start()
+        app.run(host="0.0.0.0", port=port, debug=False)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Access Log Replay Tool for Lineage API Performance Regression
+
+Replays a JSON-lines access log captured by python_server.py (API_ACCESS_LOG)
+against a target server and compares per-route latency between two builds.
+
+Replay preserves the original inter-arrival times of the captured traffic,
+optionally scaled by --speed, so hot-table skew and bursts of deep traversals
+hit the target the same way they hit production.
+
+Usage:
+  # Capture: run the server with an access log
+  API_ACCESS_LOG=access.jsonl python python_server.py
+
+  # Replay against two builds
+  python replay_access_log.py replay access.jsonl --target http://old:8080 --output old.jsonl
+  python replay_access_log.py replay access.jsonl --target http://new:8080 --output new.jsonl
+
+  # Per-route latency diff (baseline first)
+  python replay_access_log.py diff old.jsonl new.jsonl
+
+Options:
+  --speed 2.0      Replay twice as fast as captured (0 = no pacing, as fast as possible)
+  --concurrency N  Maximum in-flight requests (default: 16)
+  --limit N        Replay only the first N records
+"""
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+
+def read_access_log(path: str, limit: Optional[int] = None) -> List[Dict]:
+    """Load access log records, skipping blank or malformed lines."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+            if limit and len(records) >= limit:
+                break
+    return records
+
+
+def build_url(target: str, record: Dict) -> str:
+    """Build the replay URL for a captured record."""
+    url = target.rstrip("/") + record["path"]
+    if record.get("query"):
+        url += "?" + record["query"]
+    return url
+
+
+def replay_schedule(records: List[Dict], speed: float) -> Iterator[tuple]:
+    """Yield (delay_seconds, record) pairs relative to the first request."""
+    if not records:
+        return
+    first_ts = records[0].get("ts", 0)
+    for record in records:
+        offset = (record.get("ts", first_ts) - first_ts)
+        yield (offset / speed if speed > 0 else 0.0), record
+
+
+def replay(records: List[Dict], target: str, speed: float = 1.0,
+           concurrency: int = 16, timeout: float = 300.0) -> List[Dict]:
+    """
+    Replay captured requests against a target server.
+
+    Returns:
+        List of result records (route, path, status, latencyMs, bytes)
+    """
+    results: List[Dict] = []
+    results_lock = threading.Lock()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def send(record: Dict):
+        start = time.perf_counter()
+        try:
+            response = session.request(record.get("method", "GET"),
+                                       build_url(target, record), timeout=timeout)
+            status = response.status_code
+            size = len(response.content)
+            error = None
+        except requests.RequestException as e:
+            status, size, error = None, None, str(e)[:200]
+        result = {
+            "route": record.get("route") or record.get("path"),
+            "path": record.get("path"),
+            "status": status,
+            "latencyMs": round((time.perf_counter() - start) * 1000, 2),
+            "bytes": size,
+            "originalLatencyMs": record.get("latencyMs"),
+        }
+        if error:
+            result["error"] = error
+        with results_lock:
+            results.append(result)
+
+    replay_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i, (delay, record) in enumerate(replay_schedule(records, speed)):
+            wait = delay - (time.perf_counter() - replay_start)
+            if wait > 0:
+                time.sleep(wait)
+            pool.submit(send, record)
+            if (i + 1) % 1000 == 0:
+                print(f"  Dispatched {i + 1}/{len(records)} requests")
+
+    return results
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def summarize_by_route(results: List[Dict]) -> Dict[str, Dict]:
+    """Aggregate result records into per-route latency statistics."""
+    by_route: Dict[str, List[Dict]] = {}
+    for r in results:
+        by_route.setdefault(r.get("route") or r.get("path") or "?", []).append(r)
+
+    summary = {}
+    for route, rows in by_route.items():
+        latencies = [r["latencyMs"] for r in rows if r.get("latencyMs") is not None]
+        errors = sum(1 for r in rows if r.get("status") is None or r["status"] >= 500)
+        summary[route] = {
+            "count": len(rows),
+            "errors": errors,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "bytes": sum(r.get("bytes") or 0 for r in rows),
+        }
+    return summary
+
+
+def diff_summaries(baseline: Dict[str, Dict], candidate: Dict[str, Dict]) -> List[Dict]:
+    """Compare per-route statistics; positive deltas mean the candidate is slower."""
+    rows = []
+    for route in sorted(set(baseline) | set(candidate)):
+        base = baseline.get(route)
+        cand = candidate.get(route)
+        row = {"route": route, "baseline": base, "candidate": cand}
+        if base and cand:
+            for key in ("p50", "p95", "p99"):
+                row[f"{key}Delta"] = (
+                    (cand[key] - base[key]) / base[key] * 100.0 if base[key] else 0.0
+                )
+        rows.append(row)
+    return rows
+
+
+def print_diff(rows: List[Dict]):
+    """Print a per-route latency diff table."""
+    print(f"{'Route':<60} {'N':>6} {'p50 ms':>16} {'p95 ms':>16} {'p95 Δ%':>8}")
+    print("-" * 110)
+    for row in rows:
+        base, cand = row["baseline"], row["candidate"]
+        if not base or not cand:
+            side = "candidate only" if cand else "baseline only"
+            print(f"{row['route'][:60]:<60} {'':>6} {side:>16}")
+            continue
+        p50 = f"{base['p50']:.1f}->{cand['p50']:.1f}"
+        p95 = f"{base['p95']:.1f}->{cand['p95']:.1f}"
+        print(f"{row['route'][:60]:<60} {cand['count']:>6} {p50:>16} {p95:>16} "
+              f"{row['p95Delta']:>+8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a lineage API access log and compare builds",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = sub.add_parser("replay", help="Replay an access log against a server")
+    replay_parser.add_argument("log", help="Access log captured with API_ACCESS_LOG")
+    replay_parser.add_argument("--target", default="http://localhost:8080",
+                               help="Target server base URL")
+    replay_parser.add_argument("--output", "-o", required=True,
+                               help="Write per-request results (JSON lines) to this file")
+    replay_parser.add_argument("--speed", type=float, default=1.0,
+                               help="Speed multiplier (0 = no pacing)")
+    replay_parser.add_argument("--concurrency", type=int, default=16,
+                               help="Maximum in-flight requests")
+    replay_parser.add_argument("--limit", type=int, help="Replay only the first N records")
+
+    diff_parser = sub.add_parser("diff", help="Per-route latency diff between two replays")
+    diff_parser.add_argument("baseline", help="Results file from the baseline build")
+    diff_parser.add_argument("candidate", help="Results file from the candidate build")
+    diff_parser.add_argument("--json", action="store_true", help="Print the diff as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        records = read_access_log(args.log, args.limit)
+        print(f"Replaying {len(records)} requests against {args.target} "
+              f"(speed={args.speed}, concurrency={args.concurrency})")
+        results = replay(records, args.target, speed=args.speed,
+                         concurrency=args.concurrency)
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result, separators=(",", ":")) + "\n")
+        failed = sum(1 for r in results if r.get("status") is None or r["status"] >= 500)
+        print(f"Wrote {len(results)} results to {args.output} ({failed} failed)")
+        return 0
+
+    rows = diff_summaries(
+        summarize_by_route(read_access_log(args.baseline)),
+        summarize_by_route(read_access_log(args.candidate)),
+    )
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_diff(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
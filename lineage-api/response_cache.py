@@ -0,0 +1,223 @@
+"""
+Two-tier cache for computed lineage responses.
+
+Bodies are stored compressed (brotli when installed, otherwise gzip), keyed by
+the request and the lineage data version:
+
+    L1  MemoryLRU  Per-process LRU bounded by stored bytes
+    L2  SqliteLRU  SQLite file shared by all worker processes and kept across
+                   restarts; LRU eviction bounded by stored bytes
+
+A response found in L2 is promoted to L1. Entries older than the TTL are
+treated as misses in both tiers, which bounds staleness when the data version
+cannot tell (lineage served by recursive CTEs against the database).
+
+Cache failures (locked or corrupt database, full disk) are logged and served
+as misses: the cache never fails a request.
+"""
+
+import gzip
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from compression import brotli
+
+
+def compress_body(body, encoding):
+    """Compress a response body for storage."""
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def decompress_body(data, encoding):
+    if encoding == "br":
+        return brotli.decompress(data)
+    return gzip.decompress(data)
+
+
+def storage_encoding():
+    """Content coding used for stored bodies."""
+    return "br" if brotli is not None else "gzip"
+
+
+class MemoryLRU:
+    """In-process LRU of (encoding, body, created_at) entries, bounded by body bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self._entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[1])
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteLRU:
+    """
+    LRU of (encoding, body, created_at) entries in a SQLite file.
+
+    Safe for concurrent use by threads and pre-forked processes: each
+    (process, thread) opens its own connection, and WAL mode lets readers
+    proceed while another process writes.
+    """
+
+    # Access times are only rewritten when older than this, so hot keys do
+    # not turn every hit into a write
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                encoding TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT encoding, body, created_at, accessed_at FROM responses WHERE key = ?",
+            (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[3] > self.TOUCH_INTERVAL:
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0], row[1], row[2]
+
+    def put(self, key, entry):
+        encoding, body, created_at = entry
+        if len(body) > self.max_bytes:
+            return
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, encoding, body, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, encoding, body, len(body), created_at, time.time()))
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the file is under max_bytes."""
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        # Evict down to 90% so that eviction does not run on every insert
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        return len(victims)
+
+    def stats(self):
+        """Return (entries, stored bytes)."""
+        row = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return row[0], row[1]
+
+
+class ResponseCache:
+    """L1 memory and optional L2 SQLite tiers with a shared TTL and hit counters."""
+
+    def __init__(self, memory, disk=None, ttl=600.0):
+        self.memory = memory
+        self.disk = disk
+        self.ttl = ttl
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.errors = 0
+
+    def _fresh(self, entry):
+        return entry is not None and time.time() - entry[2] <= self.ttl
+
+    def get(self, key):
+        """
+        Look a response up.
+
+        Returns:
+            ((encoding, body, created_at), tier) with tier "memory" or "disk",
+            or (None, None) on a miss
+        """
+        entry = self.memory.get(key)
+        if self._fresh(entry):
+            self.hits["memory"] += 1
+            return entry, "memory"
+        if self.disk is not None:
+            try:
+                entry = self.disk.get(key)
+            except sqlite3.Error as e:
+                self._failed(e)
+                entry = None
+            if self._fresh(entry):
+                self.memory.put(key, entry)
+                self.hits["disk"] += 1
+                return entry, "disk"
+        self.misses += 1
+        return None, None
+
+    def put(self, key, body):
+        """Compress and store an uncompressed response body. Returns the stored entry."""
+        encoding = storage_encoding()
+        entry = (encoding, compress_body(body, encoding), time.time())
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, entry)
+            except sqlite3.Error as e:
+                self._failed(e)
+        return entry
+
+    def _failed(self, error):
+        self.errors += 1
+        print(f"Warning: response cache: {error}", file=sys.stderr)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the startup cache warm-up (cache_warmup.py).
+
+Covers request counting across processes, the top-N order, the warm-up time
+and concurrency budgets and readiness. No server or database is required.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import threading
+import time
+
+from cache_warmup import CacheWarmer, HotKeys
+
+
+def wait_ready(warmer, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not warmer.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert warmer.ready
+
+
+def recorded(tmp_path, counts):
+    hot_keys = HotKeys(str(tmp_path / "hot.sqlite3"))
+    for key, hits in counts.items():
+        for _ in range(hits):
+            hot_keys.record(key, "direction=both")
+    hot_keys.flush()
+    return hot_keys
+
+
+def test_counts_are_merged_and_ranked(tmp_path):
+    path = str(tmp_path / "hot.sqlite3")
+    first, second = HotKeys(path), HotKeys(path)
+    for _ in range(3):
+        first.record("/a", "")
+    first.record("/b", "maxDepth=2")
+    for _ in range(3):
+        second.record("/b", "maxDepth=2")
+    first.flush()
+    second.flush()
+    assert first.top(5) == [("/b", "maxDepth=2"), ("/a", "")]
+    assert first.top(1) == [("/b", "maxDepth=2")]
+
+
+def test_records_are_buffered_until_flush_interval(tmp_path):
+    hot_keys = HotKeys(str(tmp_path / "hot.sqlite3"), flush_interval=3600)
+    hot_keys.record("/a", "")
+    assert hot_keys.top(5) == []
+    hot_keys.flush()
+    assert hot_keys.top(5) == [("/a", "")]
+
+
+def test_warms_top_keys(tmp_path):
+    hot_keys = recorded(tmp_path, {"/a": 3, "/b": 2, "/c": 1})
+    warmed = []
+    warmer = CacheWarmer(hot_keys, lambda path, query: warmed.append(path) or 200, top_n=2)
+    assert not warmer.ready
+    warmer.start()
+    wait_ready(warmer)
+    assert sorted(warmed) == ["/a", "/b"]
+    assert warmer.status()["state"] == "done"
+    assert warmer.status()["completed"] == 2
+
+
+def test_failures_are_counted(tmp_path):
+    hot_keys = recorded(tmp_path, {"/a": 2, "/b": 1})
+
+    def run(path, query):
+        if path == "/b":
+            raise RuntimeError("connection lost")
+        return 200
+
+    warmer = CacheWarmer(hot_keys, run, top_n=5)
+    warmer.start()
+    wait_ready(warmer)
+    assert (warmer.completed, warmer.failed) == (1, 1)
+
+
+def test_time_and_concurrency_budget(tmp_path):
+    hot_keys = recorded(tmp_path, {"/a": 4, "/b": 3, "/c": 2, "/d": 1})
+    release = threading.Event()
+    running = []
+
+    def run(path, query):
+        running.append(path)
+        release.wait(5)
+        return 200
+
+    warmer = CacheWarmer(hot_keys, run, top_n=4, budget_seconds=0.2, concurrency=2)
+    warmer.start()
+    wait_ready(warmer)
+    release.set()
+    assert warmer.state == "timeout"
+    assert sorted(running) == ["/a", "/b"]
+
+
+def test_disabled_warmer_is_ready(tmp_path):
+    warmer = CacheWarmer(HotKeys(str(tmp_path / "hot.sqlite3")), lambda path, query: 200, top_n=0)
+    warmer.start()
+    assert warmer.ready
+    assert warmer.status()["state"] == "disabled"
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for response compression (compression.py).
+
+Covers Accept-Encoding negotiation, the size threshold, clamping of
+compression levels, and whole-body and streamed compression of Flask
+responses. No server or database is required.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gzip
+import json
+
+import pytest
+from flask import Response
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+import compression
+from compression import clamp_level, compress_response, negotiate_encoding
+
+LEVELS = {"gzip": 6, "br": 5}
+BODY = json.dumps({"edges": [{"id": f"db.T.c{i}->db.U.c{i}"} for i in range(500)]})
+
+
+def accept(header):
+    return parse_accept_header(header, Accept)
+
+
+class TestNegotiation:
+    """Choosing a content coding."""
+
+    def test_prefers_server_order_on_ties(self):
+        assert negotiate_encoding(accept("gzip, br"), ["br", "gzip"]) == "br"
+
+    def test_respects_quality(self):
+        assert negotiate_encoding(accept("br;q=0.2, gzip"), ["br", "gzip"]) == "gzip"
+
+    def test_wildcard_and_refusal(self):
+        assert negotiate_encoding(accept("*"), ["gzip"]) == "gzip"
+        assert negotiate_encoding(accept("gzip;q=0"), ["gzip"]) is None
+        assert negotiate_encoding(accept(""), ["gzip"]) is None
+
+
+class TestCompressResponse:
+    """Compressing Flask responses in place."""
+
+    def test_gzip_body_round_trips(self):
+        response = Response(BODY, mimetype="application/json")
+        stats = compress_response(response, accept("gzip"), ["gzip"], LEVELS, 1024)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.vary
+        assert gzip.decompress(response.get_data()).decode() == BODY
+        assert stats.bytes_in == len(BODY)
+        assert stats.bytes_out == len(response.get_data())
+        assert stats.ratio > 5
+        assert stats.server_timing().startswith("compress;dur=")
+
+    def test_small_bodies_are_not_compressed(self):
+        response = Response('{"status":"ok"}', mimetype="application/json")
+        assert compress_response(response, accept("gzip"), ["gzip"], LEVELS, 1024) is None
+        assert "Content-Encoding" not in response.headers
+
+    def test_out_of_range_levels_are_clamped(self):
+        assert clamp_level("gzip", 0) == 1
+        assert clamp_level("gzip", 12) == 9
+        assert clamp_level("br", -1) == 0
+        assert clamp_level("br", 11) == 11
+        response = Response(BODY, mimetype="application/json")
+        compress_response(response, accept("gzip"), ["gzip"], {"gzip": clamp_level("gzip", 99)}, 1024)
+        assert gzip.decompress(response.get_data()).decode() == BODY
+
+    def test_streamed_body_round_trips(self):
+        lines = [json.dumps({"i": i}) + "\n" for i in range(2000)]
+        response = Response(iter(lines), mimetype="application/x-ndjson")
+        stats = compress_response(response, accept("gzip"), ["gzip"], LEVELS, 1024)
+        body = b"".join(response.response)
+        assert "Content-Length" not in response.headers
+        assert gzip.decompress(body).decode() == "".join(lines)
+        assert stats.bytes_out == len(body)
+
+    @pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+    def test_brotli_body_round_trips(self):
+        response = Response(BODY, mimetype="application/json")
+        compress_response(response, accept("br"), ["br", "gzip"], LEVELS, 1024)
+        assert response.headers["Content-Encoding"] == "br"
+        assert compression.brotli.decompress(response.get_data()).decode() == BODY
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for lineage graph wire formats (graph_format.py).
+
+No server or database connection is required.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+
+from graph_format import compact_graph, encode_graph, expand_compact_graph
+
+NS = "teradata://host:1025"
+
+
+def field_node(dataset, field, **extra):
+    node = {"id": f"{dataset}.{field}", "type": "field", "name": field,
+            "dataset": {"name": dataset, "namespace": NS}}
+    node.update(extra)
+    return node
+
+
+def edge(source, target, ttype="DIRECT"):
+    return {"id": f"{source}->{target}", "source": source, "target": target,
+            "transformationType": ttype}
+
+
+def build_graph():
+    nodes = {n["id"]: n for n in [field_node("db.SRC", "a"), field_node("db.SRC", "b"),
+                                  field_node("db.TGT", "x")]}
+    edges = {e["id"]: e for e in [edge("db.SRC.a", "db.TGT.x"),
+                                  edge("db.SRC.b", "db.TGT.x", "INDIRECT")]}
+    return nodes, edges
+
+
+def test_full_format_lists_nodes_and_edges():
+    nodes, edges = build_graph()
+    graph = encode_graph(nodes, edges, "full")
+    assert graph == {"nodes": list(nodes.values()), "edges": list(edges.values())}
+
+
+def test_compact_interns_datasets_and_types():
+    nodes, edges = build_graph()
+    graph = encode_graph(nodes, edges, "compact")
+    assert graph["datasets"] == [{"name": "db.SRC", "namespace": NS},
+                                 {"name": "db.TGT", "namespace": NS}]
+    assert graph["nodes"] == [[0, "a"], [0, "b"], [1, "x"]]
+    assert graph["transformationTypes"] == ["DIRECT", "INDIRECT"]
+    assert graph["edges"] == [[0, 2, 0], [1, 2, 1]]
+
+
+def test_compact_round_trips_with_metadata():
+    nodes = {n["id"]: n for n in [
+        field_node("db.SRC", "a", metadata={"columnType": "INTEGER", "nullable": False}),
+        field_node("db.TGT", "x", metadata={"columnType": None, "nullable": True}),
+    ]}
+    for n in nodes.values():
+        n["dataset"]["sourceType"] = "TABLE"
+    edges = {e["id"]: e for e in [edge("db.SRC.a", "db.TGT.x")]}
+    expanded = expand_compact_graph(compact_graph(nodes.values(), edges.values()))
+    assert expanded == {"nodes": list(nodes.values()), "edges": list(edges.values())}
+
+
+def test_compact_is_smaller():
+    nodes = {}
+    edges = {}
+    for i in range(200):
+        source = field_node(f"db.T{i // 20}", f"c{i}")
+        target = field_node(f"db.T{i // 20 + 10}", f"c{i}")
+        nodes[source["id"]], nodes[target["id"]] = source, target
+        e = edge(source["id"], target["id"])
+        edges[e["id"]] = e
+    full = json.dumps(encode_graph(nodes, edges, "full"), separators=(",", ":"))
+    compact = json.dumps(encode_graph(nodes, edges, "compact"), separators=(",", ":"))
+    assert len(full) > 4 * len(compact)
+
+
+def test_compact_carries_node_stats():
+    nodes, edges = build_graph()
+    for i, node in enumerate(nodes.values()):
+        node.update(inDegree=i, outDegree=1, hasMore=i == 0)
+    graph = compact_graph(nodes.values(), edges.values())
+    assert graph["nodeStats"] == [[0, 1, True], [1, 1, False], [2, 1, False]]
+    assert expand_compact_graph(graph)["nodes"] == list(nodes.values())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the fast JSON response provider (json_provider.py).
+
+Every payload must serialize to exactly the bytes Flask's default provider
+produces. No server or database connection is required.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import FastJSONProvider
+
+
+def encode(provider_class, payload):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    with app.app_context():
+        return app.json.response(payload).get_data()
+
+
+PAYLOADS = [
+    {"graph": {"nodes": [{"id": "db.T.c", "dataset": {"name": "db.T"}}], "edges": []}},
+    [{"b": 1, "a": [True, False, None]}, "x"],
+    {"createdAt": datetime(2026, 3, 4, 5, 6, 7), "day": date(2026, 1, 2)},
+    {"rowCount": Decimal("12345.67"), "confidence": 0.85},
+    {"tiny": 1e-05, "huge": 1e16, "small": 0.0001, "negative": -2.5e-9},
+    {"name": "Straße → Zürich"},
+    {"big": 2 ** 70},
+    {"error": "Dataset not found"},
+]
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_byte_identical_to_default_provider(payload):
+    assert encode(FastJSONProvider, payload) == encode(DefaultJSONProvider, payload)
+
+
+@pytest.mark.skipif(json_provider.orjson is None, reason="orjson not installed")
+def test_fast_path_used_for_plain_graphs():
+    app = Flask(__name__)
+    provider = FastJSONProvider(app)
+    assert provider.dumps_bytes(PAYLOADS[0]) is not None
+    assert provider.dumps_bytes({"name": "Zürich"}) is None
+    assert provider.dumps_bytes({"tiny": 1e-05}) is None
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process lineage graph and its refresher (lineage_graph.py).
+
+Covers delta application over a snapshot, traversal (plain and budgeted), and
+refresher polling against a fake OL_COLUMN_LINEAGE table. No database connection is required.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database" / "scripts" / "populate"))
+
+from datetime import datetime
+
+import pytest
+
+from export_lineage_snapshot import LineageSnapshot, write_snapshot
+from lineage_graph import (GraphNeighbors, LineageGraph, LineageRefresher, SqlNeighbors,
+                           budget_traverse, traverse_graph)
+from response_cache import MemoryLRU, ResponseCache, SqliteLRU
+
+
+NS = "teradata://host:1025"
+EDGES = [
+    (NS, "db.SRC", "a", NS, "db.STG", "a", "DIRECT", 1.0),
+    (NS, "db.STG", "a", NS, "db.FACT", "x", "DIRECT", 1.0),
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "lineage.olsnap"
+    write_snapshot(str(path), EDGES, max_discovered_at=datetime(2026, 1, 1).timestamp())
+    snap = LineageSnapshot(str(path))
+    yield snap
+    snap.close()
+
+
+class FakeTable:
+    """OL_COLUMN_LINEAGE rows served to the refresher through a DB-API shaped connection."""
+
+    def __init__(self, rows):
+        self.rows = rows  # (src_ds, src_field, tgt_ds, tgt_field, is_active, discovered_at)
+
+    def connect(self):
+        return _FakeConnection(self)
+
+    def query(self, sql, params):
+        if "COUNT(*)" in sql:
+            return [(sum(1 for r in self.rows if r[4] == "Y"),)]
+        rows = self.rows
+        if "discovered_at >= ?" in sql:
+            rows = [r for r in rows if r[5] >= params[0]]
+        elif "is_active <> 'Y'" in sql:
+            rows = [r for r in rows if r[4] != "Y"]
+        elif "is_active = 'Y'" in sql:
+            rows = [r for r in rows if r[4] == "Y"]
+        return [(NS, r[0], r[1], NS, r[2], r[3], "DIRECT", r[4], r[5]) for r in rows]
+
+
+class _FakeConnection:
+    def __init__(self, table):
+        self.table = table
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        self.rows = self.table.query(sql, params)
+
+    def fetchone(self):
+        return self.rows.pop(0)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+class TestLineageGraph:
+    """Deltas over a snapshot base."""
+
+    def test_snapshot_only(self, snapshot):
+        graph = LineageGraph(snapshot)
+        assert graph.successors(("db.SRC", "a")) == [(("db.STG", "a"), "DIRECT")]
+        assert graph.namespace("db.FACT") == NS
+        assert graph.resolve("db.STG", "A") == ("db.STG", "a")
+
+    def test_added_and_removed_edges(self, snapshot):
+        graph = LineageGraph(snapshot)
+        assert graph.apply(NS, ("db.FACT", "x"), NS, ("rpt.R", "t"), "DIRECT", True)
+        assert graph.apply(NS, ("db.SRC", "a"), NS, ("db.STG", "a"), "DIRECT", False)
+        assert graph.edge_count == 2
+        assert graph.successors(("db.SRC", "a")) == []
+        assert graph.predecessors(("rpt.R", "t")) == [(("db.FACT", "x"), "DIRECT")]
+
+    def test_apply_is_idempotent(self, snapshot):
+        graph = LineageGraph(snapshot)
+        assert not graph.apply(NS, ("db.SRC", "a"), NS, ("db.STG", "a"), "DIRECT", True)
+        assert graph.apply(NS, ("db.SRC", "a"), NS, ("db.STG", "a"), "DIRECT", False)
+        assert not graph.apply(NS, ("db.SRC", "a"), NS, ("db.STG", "a"), "DIRECT", False)
+        assert graph.apply(NS, ("db.SRC", "a"), NS, ("db.STG", "a"), "DIRECT", True)
+        assert graph.edge_count == 2
+
+    def test_traverse_follows_deltas(self, snapshot):
+        graph = LineageGraph(snapshot)
+        graph.apply(NS, ("db.FACT", "x"), NS, ("rpt.R", "t"), "DIRECT", True)
+        rows = traverse_graph(graph, [("db.SRC", "a")], "downstream", 10)
+        assert [(r[1], r[2], r[4], r[5]) for r in rows] == [
+            ("db.SRC", "a", "db.STG", "a"),
+            ("db.STG", "a", "db.FACT", "x"),
+            ("db.FACT", "x", "rpt.R", "t"),
+        ]
+        assert len(traverse_graph(graph, [("rpt.R", "t")], "upstream", 1)) == 1
+
+
+class TestLineageRefresher:
+    """Polling OL_COLUMN_LINEAGE for deltas."""
+
+    def test_applies_new_rows_and_bumps_version(self, snapshot):
+        old, new = datetime(2025, 12, 1), datetime(2026, 2, 1)
+        table = FakeTable([
+            ("db.SRC", "a", "db.STG", "a", "Y", old),
+            ("db.STG", "a", "db.FACT", "x", "Y", old),
+        ])
+        refresher = LineageRefresher(table.connect, lambda: snapshot)
+        refresher.refresh_once()
+        assert refresher.version == 1
+        assert refresher.graph.snapshot is snapshot
+
+        assert not refresher.refresh_once()
+        assert refresher.version == 1
+
+        table.rows.append(("db.FACT", "x", "rpt.R", "t", "Y", new))
+        assert refresher.refresh_once()
+        assert refresher.version == 2
+        assert refresher.watermark == new
+        assert refresher.graph.successors(("db.FACT", "x")) == [(("rpt.R", "t"), "DIRECT")]
+
+    def test_detects_deactivation_without_new_timestamp(self, snapshot):
+        old = datetime(2025, 12, 1)
+        table = FakeTable([
+            ("db.SRC", "a", "db.STG", "a", "Y", old),
+            ("db.STG", "a", "db.FACT", "x", "Y", old),
+        ])
+        refresher = LineageRefresher(table.connect, lambda: snapshot)
+        refresher.refresh_once()
+        table.rows[0] = ("db.SRC", "a", "db.STG", "a", "N", old)
+        assert refresher.refresh_once()
+        assert refresher.graph.successors(("db.SRC", "a")) == []
+        assert refresher.full_loads == 0
+
+    def test_full_load_without_snapshot_and_after_delete(self, snapshot):
+        old = datetime(2025, 12, 1)
+        table = FakeTable([("db.SRC", "a", "db.STG", "a", "Y", old),
+                           ("db.STG", "a", "db.FACT", "x", "Y", old)])
+        refresher = LineageRefresher(table.connect, lambda: None)
+        refresher.refresh_once()
+        assert refresher.full_loads == 1
+        assert refresher.graph.edge_count == 2
+
+        del table.rows[1]
+        refresher.refresh_once()
+        assert refresher.full_loads == 2
+        assert refresher.graph.successors(("db.STG", "a")) == []
+
+
+    def test_data_version_identifies_data_across_processes(self, tmp_path):
+        old, new = datetime(2025, 12, 1), datetime(2026, 2, 1)
+        rows = [("db.SRC", "a", "db.STG", "a", "Y", old)]
+        first = LineageRefresher(FakeTable(list(rows)).connect, lambda: None)
+        newer = LineageRefresher(FakeTable(rows + [("db.STG", "a", "db.FACT", "x", "Y", new)]).connect,
+                                 lambda: None)
+        first.refresh_once()
+        newer.refresh_once()
+        # Both counters stand at 1, for different data
+        assert first.version == newer.version == 1
+        assert first.data_version != newer.data_version
+
+        same = LineageRefresher(FakeTable(list(rows)).connect, lambda: None)
+        same.refresh_once()
+        same.refresh_once()
+        assert same.data_version == first.data_version
+
+        # Workers sharing one cache file only see entries for their own data
+        path = str(tmp_path / "cache.sqlite3")
+        worker_a = ResponseCache(MemoryLRU(1 << 20), SqliteLRU(path, 1 << 20))
+        worker_b = ResponseCache(MemoryLRU(1 << 20), SqliteLRU(path, 1 << 20))
+        worker_a.put(f"r{first.data_version}/lineage", b'{"edges": 1}')
+        assert worker_b.get(f"r{newer.data_version}/lineage") == (None, None)
+        assert worker_b.get(f"r{same.data_version}/lineage")[1] == "disk"
+
+
+class TestNeighbors:
+    """One-hop neighbor expansion."""
+
+    def test_graph_neighbors_expand_and_degrees(self, snapshot):
+        neighbors = GraphNeighbors(LineageGraph(snapshot))
+        roots = neighbors.resolve([("db.STG", "A"), ("db.NONE", "z")])
+        assert roots == [("db.STG", "a"), ("db.NONE", "z")]
+        rows = neighbors.expand(roots, "both")
+        assert sorted((r[1], r[2], r[4], r[5]) for r in rows) == [
+            ("db.SRC", "a", "db.STG", "a"),
+            ("db.STG", "a", "db.FACT", "x"),
+        ]
+        assert neighbors.expand(roots, "upstream")[0][1:3] == ("db.SRC", "a")
+        assert neighbors.degrees([("db.STG", "a"), ("db.NONE", "z")]) == {
+            ("db.STG", "a"): (1, 1), ("db.NONE", "z"): (0, 0)}
+
+    def test_sql_neighbors_batches_queries(self):
+        executed = []
+
+        class Cursor:
+            def execute(self, sql, params):
+                executed.append((" ".join(sql.split()), params))
+
+            def fetchall(self):
+                return [("ns", "db.T", "c", "ns", "db.U", "c", "DIRECT")]
+
+        neighbors = SqlNeighbors(Cursor(), batch_size=2)
+        rows = neighbors.expand([("db.T", "c"), ("db.T", "d"), ("db.T", "e")], "downstream")
+        assert rows == [("ns", "db.T", "c", "ns", "db.U", "c", "DIRECT")]
+        assert len(executed) == 2
+        assert executed[0][1] == ["db.T", "c", "db.T", "d"]
+        assert "UPPER(source_field) = UPPER(?)" in executed[0][0]
+
+    def test_sql_neighbors_degrees_fold_field_case(self):
+        class Cursor:
+            def execute(self, sql, params):
+                self.sql = " ".join(sql.split())
+
+            def fetchall(self):
+                return [("db.T", "CUSTOMER_ID", 2, 3)]
+
+        cursor = Cursor()
+        degrees = SqlNeighbors(cursor).degrees([("db.T", "Customer_Id"), ("db.T", "other")])
+        assert degrees == {("db.T", "Customer_Id"): (2, 3), ("db.T", "other"): (0, 0)}
+        assert "UPPER(target_field) = UPPER(?)" in cursor.sql
+        assert "UPPER(TRIM(field_name))" in cursor.sql
+
+
+class TestBudgetTraversal:
+    """Breadth-first traversal bounded by node and edge budgets and fan-out."""
+
+    @pytest.fixture
+    def neighbors(self, snapshot):
+        graph = LineageGraph(snapshot)
+        graph.apply(NS, ("db.FACT", "x"), NS, ("rpt.R", "t"), "DIRECT", True)
+        graph.apply(NS, ("db.FACT", "x"), NS, ("rpt.R", "u"), "DIRECT", True)
+        return GraphNeighbors(graph)
+
+    def test_unbounded_matches_traverse_graph(self, neighbors):
+        rows, unexpanded, truncated, _ = budget_traverse(
+            neighbors, [(("db.SRC", "a"), "downstream")], 10)
+        assert rows == traverse_graph(neighbors.graph, [("db.SRC", "a")], "downstream", 10)
+        assert unexpanded == [] and truncated is None
+
+    def test_edge_budget_reports_frontier(self, neighbors):
+        rows, unexpanded, truncated, _ = budget_traverse(
+            neighbors, [(("db.SRC", "a"), "downstream")], 10, max_edges=3)
+        assert [(r[4], r[5]) for r in rows] == [("db.STG", "a"), ("db.FACT", "x"), ("rpt.R", "t")]
+        assert truncated == "maxEdges"
+        # Partly expanded FACT.x, then the column discovered but not yet expanded
+        assert unexpanded == [(("db.FACT", "x"), "downstream"), (("rpt.R", "t"), "downstream")]
+
+    def test_node_budget_counts_start_columns(self, neighbors):
+        rows, unexpanded, truncated, _ = budget_traverse(
+            neighbors, [(("db.FACT", "x"), "upstream"), (("db.FACT", "x"), "downstream")],
+            10, max_nodes=3)
+        assert len(rows) == 2
+        assert truncated == "maxNodes"
+        assert unexpanded[0] == (("db.FACT", "x"), "downstream")
+
+    def test_depth_limit_is_not_truncation(self, neighbors):
+        rows, unexpanded, truncated, _ = budget_traverse(
+            neighbors, [(("db.SRC", "a"), "downstream")], 1, max_edges=1)
+        assert len(rows) == 1 and unexpanded == [] and truncated is None
+
+    def test_sql_neighbors_stop_querying_at_budget(self):
+        executed = []
+
+        class Cursor:
+            def execute(self, sql, params):
+                executed.append(params)
+                self.rows = [("ns", params[0], params[1], "ns", "db.U", f"{params[1]}{i}", "DIRECT")
+                             for i in range(5)]
+
+            def fetchall(self):
+                return self.rows
+
+        rows, unexpanded, truncated, _ = budget_traverse(
+            SqlNeighbors(Cursor()), [(("db.T", "c"), "downstream")], 10, max_edges=4)
+        assert len(rows) == 4
+        assert truncated == "maxEdges"
+        assert unexpanded[0] == (("db.T", "c"), "downstream")
+        assert len(unexpanded) == 5
+        assert len(executed) == 1
+
+    def test_high_fanout_columns_are_collapsed(self, neighbors):
+        traversal = budget_traverse(neighbors, [(("db.SRC", "a"), "downstream")], 10,
+                                    collapse_above=1)
+        assert [(r[4], r[5]) for r in traversal.rows] == [("db.STG", "a"), ("db.FACT", "x")]
+        assert traversal.collapsed == [(("db.FACT", "x"), "downstream", 2, [("rpt.R", 2)])]
+
+        expanded = budget_traverse(neighbors, [(("db.SRC", "a"), "downstream")], 10,
+                                   collapse_above=1, expand=[("db.FACT", "X")])
+        assert len(expanded.rows) == 4 and expanded.collapsed == []
+
+    def test_sql_neighbor_datasets(self):
+        class Cursor:
+            def execute(self, sql, params):
+                self.rows = [("db.U", 3), ("db.V", 5)] if "source_dataset = ?" in sql else [("db.U", 1)]
+
+            def fetchall(self):
+                return self.rows
+
+        neighbors = SqlNeighbors(Cursor())
+        assert neighbors.neighbor_datasets(("db.T", "c"), "both", 5) == [("db.V", 5), ("db.U", 4)]
+        assert neighbors.neighbor_datasets(("db.T", "c"), "upstream", 1) == [("db.U", 1)]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for background lineage jobs (lineage_jobs.py).
+
+Covers job reuse, progress, results on disk, expiry, failures and the queue
+bound. No server or database is required.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+import threading
+import time
+
+import pytest
+
+from lineage_jobs import JobQueueFull, JobRunner, JobStore
+
+
+def wait_for(store, job_id, status="done", timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = store.load(job_id)
+        if state is not None and state["status"] == status:
+            return state
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not reach {status}")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path), ttl=60)
+
+
+def test_runs_job_and_stores_body(store):
+    runner = JobRunner(store)
+
+    def job(progress):
+        progress.update(phase="lineage", depth=3)
+        return 200, b'{"graph": {}}'
+
+    state = runner.submit("db-lineage", job, description="demo")
+    done = wait_for(store, state["id"])
+    assert done["statusCode"] == 200
+    assert done["progress"] == {"phase": "lineage", "depth": 3}
+    assert done["expiresAt"] == pytest.approx(done["finishedAt"] + 60)
+    assert store.read_body(state["id"]) == b'{"graph": {}}'
+
+
+def test_identical_requests_share_a_job(store):
+    runner = JobRunner(store)
+    release = threading.Event()
+    calls = []
+
+    def job(progress):
+        calls.append(1)
+        release.wait(5)
+        return 200, b"{}"
+
+    first = runner.submit("same", job)
+    second = runner.submit("same", job)
+    assert second["id"] == first["id"]
+    release.set()
+    wait_for(store, first["id"])
+    assert runner.submit("same", job)["status"] == "done"
+    assert len(calls) == 1
+    assert runner.submit("other", job)["id"] != first["id"]
+
+
+def test_failed_job_reports_error_and_reruns(store):
+    runner = JobRunner(store)
+    attempts = []
+
+    def job(progress):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("connection lost")
+        return 200, b"{}"
+
+    job_id = runner.submit("flaky", job)["id"]
+    assert wait_for(store, job_id, "failed")["error"] == "connection lost"
+    runner.submit("flaky", job)
+    wait_for(store, job_id)
+    assert len(attempts) == 2
+
+
+def test_expired_jobs_are_removed(tmp_path):
+    store = JobStore(str(tmp_path), ttl=0)
+    runner = JobRunner(store)
+    job_id = runner.submit("short", lambda progress: (200, b"{}"))["id"]
+    deadline = time.monotonic() + 5
+    while os.path.exists(tmp_path / f"{job_id}.lock") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.01)
+    assert store.load(job_id) is None
+    assert not os.path.exists(tmp_path / f"{job_id}.body")
+
+
+def test_queue_is_bounded(store):
+    runner = JobRunner(store, max_workers=1, max_queued=1)
+    release = threading.Event()
+    runner.submit("a", lambda progress: (release.wait(5), (200, b"{}"))[1])
+    with pytest.raises(JobQueueFull):
+        runner.submit("b", lambda progress: (200, b"{}"))
+    release.set()
+
+
+def test_stale_lock_is_taken_over(store, tmp_path):
+    job_id = store.job_id("orphan")
+    (tmp_path / f"{job_id}.lock").write_text("999999999")
+    assert store.claim(job_id)
+    assert not store.claim(job_id)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the access log replay tool (replay_access_log.py).
+
+Covers log parsing, replay scheduling and the per-route latency diff.
+No server or database connection is required.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import pytest
+
+from replay_access_log import (
+    build_url,
+    diff_summaries,
+    percentile,
+    read_access_log,
+    replay_schedule,
+    summarize_by_route,
+)
+
+
+ROUTE = "/api/v2/openlineage/lineage/<path:dataset_id>/<field_name>"
+
+
+class TestReadAccessLog:
+    """Access log parsing."""
+
+    def test_skips_blank_and_malformed_lines(self, tmp_path):
+        log = tmp_path / "access.jsonl"
+        log.write_text('{"path": "/a"}\n\nnot json\n{"path": "/b"}\n')
+        records = read_access_log(str(log))
+        assert [r["path"] for r in records] == ["/a", "/b"]
+
+    def test_limit(self, tmp_path):
+        log = tmp_path / "access.jsonl"
+        log.write_text("".join(json.dumps({"path": f"/{i}"}) + "\n" for i in range(10)))
+        assert len(read_access_log(str(log), limit=3)) == 3
+
+
+class TestReplayScheduling:
+    """URL building and pacing."""
+
+    def test_build_url_with_query(self):
+        record = {"path": "/api/v2/openlineage/lineage/ns/db.t/col", "query": "maxDepth=3"}
+        assert build_url("http://host:8080/", record) == \
+            "http://host:8080/api/v2/openlineage/lineage/ns/db.t/col?maxDepth=3"
+
+    def test_build_url_without_query(self):
+        assert build_url("http://host", {"path": "/health", "query": ""}) == "http://host/health"
+
+    def test_schedule_scales_offsets(self):
+        records = [{"ts": 100.0}, {"ts": 101.0}, {"ts": 104.0}]
+        delays = [d for d, _ in replay_schedule(records, speed=2.0)]
+        assert delays == [0.0, 0.5, 2.0]
+
+    def test_schedule_speed_zero_disables_pacing(self):
+        records = [{"ts": 100.0}, {"ts": 200.0}]
+        assert [d for d, _ in replay_schedule(records, speed=0)] == [0.0, 0.0]
+
+
+class TestLatencyDiff:
+    """Per-route summaries and build comparison."""
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 100) == 100
+        assert percentile([], 95) == 0.0
+
+    def test_summarize_groups_by_route_and_counts_errors(self):
+        results = [
+            {"route": ROUTE, "status": 200, "latencyMs": 10.0, "bytes": 100},
+            {"route": ROUTE, "status": 500, "latencyMs": 30.0, "bytes": 20},
+            {"route": "/health", "status": None, "latencyMs": 1.0, "bytes": None},
+        ]
+        summary = summarize_by_route(results)
+        assert summary[ROUTE]["count"] == 2
+        assert summary[ROUTE]["errors"] == 1
+        assert summary[ROUTE]["bytes"] == 120
+        assert summary["/health"]["errors"] == 1
+
+    def test_diff_reports_relative_change(self):
+        baseline = {ROUTE: {"count": 2, "p50": 10.0, "p95": 20.0, "p99": 40.0}}
+        candidate = {ROUTE: {"count": 2, "p50": 5.0, "p95": 30.0, "p99": 40.0}}
+        row = diff_summaries(baseline, candidate)[0]
+        assert row["p50Delta"] == pytest.approx(-50.0)
+        assert row["p95Delta"] == pytest.approx(50.0)
+        assert row["p99Delta"] == pytest.approx(0.0)
+
+    def test_diff_keeps_routes_seen_in_one_build_only(self):
+        rows = diff_summaries({"/a": {"p50": 1, "p95": 1, "p99": 1}}, {})
+        assert rows[0]["candidate"] is None
+        assert "p95Delta" not in rows[0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the lineage response cache (response_cache.py).
+
+Covers both tiers, promotion from disk to memory, size-bounded LRU eviction,
+the TTL and sharing the SQLite file between cache instances. No server or
+database is required.
+"""
+
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import sqlite3
+import time
+
+from response_cache import MemoryLRU, ResponseCache, SqliteLRU, decompress_body
+
+
+def entry(size, created_at=None):
+    return ("gzip", b"x" * size, time.time() if created_at is None else created_at)
+
+
+def test_memory_lru_evicts_least_recently_used():
+    lru = MemoryLRU(max_bytes=30)
+    lru.put("a", entry(10))
+    lru.put("b", entry(10))
+    lru.put("c", entry(10))
+    lru.get("a")
+    lru.put("d", entry(10))
+    assert lru.get("b") is None
+    assert lru.get("a") is not None
+    assert lru.size == 30
+    lru.put("huge", entry(31))
+    assert lru.get("huge") is None
+
+
+def test_sqlite_lru_evicts_by_access_time(tmp_path):
+    disk = SqliteLRU(str(tmp_path / "cache.sqlite3"), max_bytes=100)
+    for i, key in enumerate("abcd"):
+        disk.put(key, entry(30))
+        disk._connect().execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (i, key))
+    # 120 bytes > 100: oldest rows go until the file is at or under 90 bytes
+    disk.evict()
+    assert disk.get("a") is None
+    assert disk.get("d") is not None
+    assert disk.stats() == (3, 90)
+
+
+def test_round_trip_and_promotion(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = ResponseCache(MemoryLRU(1 << 20), SqliteLRU(path, 1 << 20))
+    stored = writer.put("k", b'{"graph": {}}')
+    assert decompress_body(stored[1], stored[0]) == b'{"graph": {}}'
+
+    # Another process (or a restart) sees the entry on disk, then in memory
+    reader = ResponseCache(MemoryLRU(1 << 20), SqliteLRU(path, 1 << 20))
+    assert reader.get("k")[1] == "disk"
+    assert reader.get("k")[1] == "memory"
+    assert reader.get("other") == (None, None)
+    assert reader.hits == {"memory": 1, "disk": 1}
+    assert reader.misses == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(MemoryLRU(1 << 20), SqliteLRU(str(tmp_path / "c.sqlite3"), 1 << 20), ttl=60)
+    cache.memory.put("k", entry(5, created_at=time.time() - 61))
+    cache.disk.put("k", entry(5, created_at=time.time() - 61))
+    assert cache.get("k") == (None, None)
+
+
+def test_disk_errors_are_misses(tmp_path):
+    class BrokenDisk:
+        def get(self, key):
+            raise sqlite3.OperationalError("database is locked")
+
+        def put(self, key, entry):
+            raise sqlite3.OperationalError("disk I/O error")
+
+    cache = ResponseCache(MemoryLRU(1 << 20), BrokenDisk())
+    cache.put("k", b"{}")
+    assert cache.get("k")[1] == "memory"
+    assert cache.get("other") == (None, None)
+    assert cache.errors == 2